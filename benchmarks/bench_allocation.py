@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк ранкового розподілу залишків між схваленими заявками.
+
+Порівнюється видача по одній позиції (process_requisition_item_execution:
+власна перевірка залишку та коміт на кожну позицію) з пакетним розподілом
+allocation.allocate_stock (один запит на читання, одна транзакція запису).
+Ресурсів свідомо менше, ніж просять заявки, тож частина позицій лишається
+з нестачею. Окремо вимірюється dry_run (лише план).
+
+Запуск:
+    python benchmarks/bench_allocation.py [--requisitions 500] [--items 5]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'military_resource_app')))
+from logic.allocation import allocate_stock, load_open_items, plan_allocation
+from logic.db_manager import create_connection, create_tables
+from logic import requisition_handler
+
+URGENCIES = ["планова", "термінова", "критична"]
+DEPARTMENTS = ["1-й батальйон", "2-й батальйон", "3-й батальйон", "Рота зв'язку",
+               "Інженерна рота", "Медична рота"]
+
+def populate(conn, requisitions: int, items: int, resources: int):
+    """Схвалені заявки за тиждень та ресурси із залишком близько половини попиту."""
+    rng = random.Random(42)
+    category_id = conn.execute("SELECT id FROM categories ORDER BY id LIMIT 1").fetchone()["id"]
+    conn.executemany(
+        "INSERT INTO resources (name, category_id, quantity, unit_of_measure) VALUES (?, ?, 0, 'шт')",
+        ((f"Ресурс {i}", category_id) for i in range(resources))
+    )
+    resource_ids = [row["id"] for row in conn.execute("SELECT id FROM resources")]
+    start = datetime.now() - timedelta(days=7)
+    for i in range(requisitions):
+        created = start + timedelta(seconds=rng.randrange(7 * 86400))
+        requisition_id = conn.execute(
+            """INSERT INTO requisitions (
+                requisition_number, created_by_user_id, department_requesting,
+                creation_date, status, urgency
+            ) VALUES (?, 1, ?, ?, 'схвалено', ?)""",
+            (f"REQ-BENCH-{i + 1:05d}", rng.choice(DEPARTMENTS),
+             created.strftime("%Y-%m-%d %H:%M:%S"), rng.choice(URGENCIES))
+        ).lastrowid
+        conn.executemany(
+            """INSERT INTO requisition_items (
+                requisition_id, resource_id, requested_resource_name,
+                quantity_requested, item_status
+            ) VALUES (?, ?, ?, ?, 'схвалено')""",
+            (
+                (requisition_id, resource_id, f"Ресурс {resource_id}", rng.randint(1, 20))
+                for resource_id in rng.sample(resource_ids, items)
+            )
+        )
+    conn.execute("""
+        UPDATE resources SET quantity = (
+            SELECT SUM(quantity_requested) / 2 FROM requisition_items
+            WHERE resource_id = resources.id
+        )
+    """)
+    conn.commit()
+    conn.execute("ANALYZE")
+
+def allocate_one_by_one(conn) -> dict:
+    """Видача по одній позиції у тому ж порядку пріоритетів."""
+    issued = {}
+    for item in plan_allocation(load_open_items(conn)):
+        if item["quantity"] and requisition_handler.process_requisition_item_execution(
+                conn, item["item_id"], item["quantity"], 1):
+            issued[item["item_id"]] = item["quantity"]
+    return issued
+
+def issued_quantities(conn) -> dict:
+    return {
+        row[0]: row[1] for row in conn.execute("""
+            SELECT requisition_item_id, SUM(quantity_changed) FROM resource_transactions
+            WHERE transaction_type = 'видача' GROUP BY requisition_item_id
+        """)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requisitions", type=int, default=500)
+    parser.add_argument("--items", type=int, default=5, help="Позицій у заявці")
+    parser.add_argument("--resources", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "resources.db")
+        conn = create_connection(db_file, profile="bulk-import")
+        create_tables(conn)
+        populate(conn, args.requisitions, args.items, args.resources)
+        conn.close()
+        legacy_file = os.path.join(tmp_dir, "legacy.db")
+        shutil.copyfile(db_file, legacy_file)
+        print(f"Заповнено {args.requisitions} заявок по {args.items} позицій, "
+              f"{args.resources} ресурсів\n")
+
+        conn = create_connection(db_file)
+        started = time.perf_counter()
+        plan = allocate_stock(conn, 1, dry_run=True)
+        dry_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        result = allocate_stock(conn, 1)
+        batch_ms = (time.perf_counter() - started) * 1000
+        batch_issued = issued_quantities(conn)
+        conn.close()
+
+        legacy_conn = create_connection(legacy_file)
+        started = time.perf_counter()
+        legacy_issued = allocate_one_by_one(legacy_conn)
+        legacy_ms = (time.perf_counter() - started) * 1000
+        legacy_conn.close()
+
+        print(f"Позицій до видачі: {result['issued_items']}, з нестачею: {result['short_items']}")
+        print(f"{'По одній позиції':<24}{legacy_ms:>10.1f} мс")
+        print(f"{'Пакетний розподіл':<24}{batch_ms:>10.1f} мс")
+        print(f"{'План (dry_run)':<24}{dry_ms:>10.1f} мс")
+
+        # Перевірка: пакет видає те саме, що й видача по одній позиції за планом
+        if batch_issued != legacy_issued or plan["issued_quantity"] != sum(batch_issued.values()):
+            print("ПОМИЛКА: результати розподілу відрізняються")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
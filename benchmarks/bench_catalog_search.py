@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк пошуку в каталозі ресурсів на великому каталозі.
+
+Порівнюються старий фільтр вікна (назви всіх ресурсів у нижньому регістрі,
+підрядок шукається в Python), LIKE '%...%' по назві, опису, постачальнику
+та походженню, і повнотекстовий індекс resources_fts: ранжовані ID (усі
+та перші 100), ID у межах категорії та фасети за категоріями. Запити
+імітують введення слова по літері (з другої літери, див.
+catalog_search.MIN_SEARCH_CHARS) та пошук за кількома словами.
+
+Запуск:
+    python benchmarks/bench_catalog_search.py [--resources 200000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'military_resource_app')))
+from logic.db_manager import create_connection, create_tables
+from logic.catalog_search import search_category_facets, search_resource_ids
+
+ITEMS = ["Бронежилет", "Шолом", "Радіостанція", "Акумулятор", "Сухпайок", "Аптечка",
+         "Турнікет", "Спальник", "Намет", "Генератор", "Тепловізор", "Бінокль", "Сітка",
+         "Каска", "Рюкзак", "Черевики", "Куртка", "Рукавиці", "Окуляри", "Ліхтар",
+         "Кабель", "Антена", "Зарядний пристрій", "Фільтр", "Насос", "Домкрат", "Лопата",
+         "Пальне", "Мастило", "Бинт", "Шина", "Знеболювальне", "Ноші", "Планшет"]
+QUALIFIERS = ["тактичний", "польовий", "зимовий", "літній", "посилений", "легкий",
+              "портативний", "цифровий", "балістичний", "медичний", "інженерний",
+              "водонепроникний", "камуфльований", "резервний", "ремонтний"]
+ORIGINS = ["Україна", "Польща", "Німеччина", "США", "Канада", "Чехія", "Литва",
+           "Велика Британія", "Франція", "Туреччина", "Фінляндія", "Естонія"]
+WORDS = ["для", "комплект", "модель", "клас", "захисту", "ремонту", "зв'язку", "у",
+         "польових", "умовах", "з", "кріпленням", "чохлом", "підвищеної", "міцності"]
+
+def populate(conn, resources: int):
+    """Заповнює каталог ресурсами з назвами, описами, постачальниками та походженням."""
+    rng = random.Random(42)
+    categories = [row["id"] for row in conn.execute("SELECT id FROM categories")]
+    suppliers = [f"ТОВ \"{rng.choice(ITEMS)}-{rng.choice(ORIGINS)} {i}\"" for i in range(300)]
+    conn.executemany(
+        """INSERT INTO resources (
+            name, category_id, quantity, unit_of_measure, description, supplier, origin
+        ) VALUES (?, ?, ?, 'шт', ?, ?, ?)""",
+        (
+            (
+                f"{rng.choice(ITEMS)} {rng.choice(QUALIFIERS)} {rng.choice('АБВГДЕКМТ')}-{rng.randint(1, 999)}",
+                rng.choice(categories), rng.randint(0, 500),
+                " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))),
+                rng.choice(suppliers), rng.choice(ORIGINS),
+            )
+            for _ in range(resources)
+        )
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+
+def legacy_filter(names: list, text: str) -> list:
+    """Фільтр вікна до переробки: підрядок у назві кожного рядка таблиці."""
+    text = text.lower()
+    return [resource_id for resource_id, name in names if text in name.lower()]
+
+LIKE_SEARCH = """
+    SELECT id FROM resources
+    WHERE name LIKE :search OR description LIKE :search
+       OR supplier LIKE :search OR origin LIKE :search
+"""
+
+def timed(func, repeat: int) -> tuple:
+    """Повертає (найкращий час у мс, результат)."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resources", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "resources.db")
+        conn = create_connection(db_file, profile="bulk-import")
+        create_tables(conn)
+        started = time.perf_counter()
+        populate(conn, args.resources)
+        print(f"Заповнено {args.resources} ресурсів за {time.perf_counter() - started:.1f} с\n")
+
+        names = [(row["id"], row["name"]) for row in conn.execute("SELECT id, name FROM resources")]
+        category_id = conn.execute("SELECT id FROM categories ORDER BY id LIMIT 1").fetchone()["id"]
+        terms = ["те", "теп", "тепл", "тепловізор", "тепловізор цифровий",
+                 "бінокль польща", "зв'язку", "ТОВ"]
+
+        print(f"{'Запит':<22}{'знайдено':>9}{'Python':>9}{'LIKE':>9}"
+              f"{'FTS всі':>9}{'FTS 100':>9}{'категорія':>10}{'фасети':>9}   (мс)")
+        for term in terms:
+            python_ms, _ = timed(lambda: legacy_filter(names, term), args.repeat)
+            like_ms, _ = timed(lambda: conn.execute(
+                LIKE_SEARCH, {"search": f"%{term}%"}).fetchall(), args.repeat)
+            all_ms, found = timed(lambda: search_resource_ids(term, conn=conn), args.repeat)
+            page_ms, _ = timed(lambda: search_resource_ids(term, limit=100, conn=conn), args.repeat)
+            category_ms, _ = timed(lambda: search_resource_ids(
+                term, category_id, limit=100, conn=conn), args.repeat)
+            facets_ms, _ = timed(lambda: search_category_facets(term, conn=conn), args.repeat)
+            print(f"{term:<22}{len(found):>9}{python_ms:>9.1f}{like_ms:>9.1f}"
+                  f"{all_ms:>9.1f}{page_ms:>9.1f}{category_ms:>10.1f}{facets_ms:>9.1f}")
+
+        # Перевірка: індекс знаходить усі ресурси з цілим словом у назві
+        # (а також ресурси, де воно є лише в описі чи постачальнику)
+        fts = set(search_resource_ids("Тепловізор", conn=conn))
+        if not fts or not fts >= set(legacy_filter(names, "Тепловізор")):
+            print("ПОМИЛКА: результати пошуку відрізняються")
+            sys.exit(1)
+        if sum(facet["count"] for facet in search_category_facets("Тепловізор", conn=conn)) != len(fts):
+            print("ПОМИЛКА: фасети не збігаються з кількістю знайдених ресурсів")
+            sys.exit(1)
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк фільтрів за датами на великій історії транзакцій.
+
+Порівнюються старі умови `DATE(колонка) >= DATE(?)` (повний перегляд
+таблиці) та напіввідкриті діапазони по індексованих колонках *_ts
+(міграція 3). Для кожного запиту виводиться план виконання.
+
+Запуск:
+    python benchmarks/bench_date_ranges.py [--transactions 1000000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# requisition_handler імпортує модулі як logic.*, тому використовуємо той самий шлях
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'military_resource_app')))
+from logic.db_manager import create_connection, create_tables
+from logic.query_registry import date_range, get_registry
+from logic import reporting, requisition_handler, transaction_handler
+
+RESOURCES = 500
+DEPARTMENTS = ["1-й батальйон", "2-й батальйон", "3-й батальйон", "Рота зв'язку", "Інженерна рота"]
+HISTORY_DAYS = 3 * 365
+
+LEGACY_MOVEMENT = """
+    SELECT t.id, t.transaction_date, r.name, t.quantity_changed
+    FROM resource_transactions t
+    JOIN resources r ON t.resource_id = r.id
+    WHERE DATE(t.transaction_date) >= DATE(?) AND DATE(t.transaction_date) <= DATE(?)
+    ORDER BY t.transaction_date DESC
+"""
+
+LEGACY_RESOURCE_HISTORY = """
+    SELECT t.*
+    FROM resource_transactions t
+    WHERE t.resource_id = ?
+      AND DATE(t.transaction_date) >= DATE(?) AND DATE(t.transaction_date) <= DATE(?)
+    ORDER BY t.transaction_date DESC
+"""
+
+LEGACY_REQUISITIONS = """
+    SELECT r.id, r.requisition_number, r.creation_date
+    FROM requisitions r
+    WHERE DATE(r.creation_date) >= DATE(?) AND DATE(r.creation_date) <= DATE(?)
+    ORDER BY r.creation_date DESC LIMIT 100
+"""
+
+def populate(conn, transactions: int, requisitions: int):
+    """Заповнює базу ресурсами, транзакціями та заявками з датами за три роки."""
+    rng = random.Random(42)
+    start = datetime.now() - timedelta(days=HISTORY_DAYS)
+    category_id = conn.execute("SELECT id FROM categories LIMIT 1").fetchone()["id"]
+    conn.executemany(
+        "INSERT INTO resources (name, category_id, quantity) VALUES (?, ?, ?)",
+        [(f"Ресурс {i}", category_id, 1_000_000) for i in range(RESOURCES)]
+    )
+
+    def random_date():
+        moment = start + timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+        return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+    batch = 50_000
+    for offset in range(0, transactions, batch):
+        conn.executemany(
+            """INSERT INTO resource_transactions (
+                resource_id, transaction_type, quantity_changed,
+                transaction_date, recipient_department, issued_by_user_id
+            ) VALUES (?, 'видача', ?, ?, ?, 1)""",
+            [
+                (rng.randint(1, RESOURCES), rng.randint(1, 20), random_date(), rng.choice(DEPARTMENTS))
+                for _ in range(min(batch, transactions - offset))
+            ]
+        )
+    conn.executemany(
+        """INSERT INTO requisitions (
+            requisition_number, created_by_user_id, department_requesting, creation_date
+        ) VALUES (?, 1, ?, ?)""",
+        [(f"REQ-BENCH-{i:07d}", rng.choice(DEPARTMENTS), random_date()) for i in range(requisitions)]
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+
+def timed(conn, sql, params, repeat: int) -> tuple:
+    """Повертає (найкращий час у мс, кількість рядків)."""
+    best, rows = None, 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(conn.execute(sql, params).fetchall())
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+def plan(conn, sql, params) -> str:
+    return "; ".join(row["detail"] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--requisitions", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    registry = get_registry()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "resources.db")
+        conn = create_connection(db_file, profile="bulk-import")
+        create_tables(conn)
+        started = time.perf_counter()
+        populate(conn, args.transactions, args.requisitions)
+        print(f"Заповнено {args.transactions} транзакцій та {args.requisitions} заявок "
+              f"за {time.perf_counter() - started:.1f} с\n")
+
+        date_to = datetime.now().date()
+        date_from = date_to - timedelta(days=30)
+        day_from, day_to = date_from.isoformat(), date_to.isoformat()
+        start_ts, end_ts = date_range(day_from, day_to)
+
+        cases = [
+            ("Рух ресурсів за місяць",
+             (LEGACY_MOVEMENT, (day_from, day_to)),
+             (registry.sql(reporting.QUERY_MOVEMENT_REPORT),
+              registry.params(reporting.QUERY_MOVEMENT_REPORT, start_ts=start_ts, end_ts=end_ts))),
+            ("Історія ресурсу за місяць",
+             (LEGACY_RESOURCE_HISTORY, (7, day_from, day_to)),
+             (registry.sql(transaction_handler.QUERY_RESOURCE_TRANSACTIONS),
+              registry.params(transaction_handler.QUERY_RESOURCE_TRANSACTIONS,
+                              resource_id=7, start_ts=start_ts, end_ts=end_ts))),
+            ("Заявки за місяць (100)",
+             (LEGACY_REQUISITIONS, (day_from, day_to)),
+             (registry.sql(requisition_handler.QUERY_REQUISITIONS),
+              registry.params(requisition_handler.QUERY_REQUISITIONS,
+                              start_ts=start_ts, end_ts=end_ts, limit=100, offset=0))),
+        ]
+
+        print(f"{'Запит':<28}{'Варіант':<10}{'мс':>10}{'рядків':>10}  План")
+        for title, legacy, ranged in cases:
+            for label, (sql, params) in (("DATE()", legacy), ("діапазон", ranged)):
+                elapsed, rows = timed(conn, sql, params, args.repeat)
+                print(f"{title:<28}{label:<10}{elapsed:>10.1f}{rows:>10}  {plan(conn, sql, params)}")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
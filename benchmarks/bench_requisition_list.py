@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк списку заявок з переліком позицій.
+
+Порівнюється старий список (корельований підзапит GROUP_CONCAT з
+вкладеним ORDER BY ... LIMIT 3 по requisition_items для кожного рядка)
+зі збереженими в requisitions item_summary та items_total (міграції 10,
+11): перша сторінка (як у головному вікні), сторінка за статусом та
+повний список. Окремо вимірюється вставка заявки з позиціями, для якої
+тригери оновлюють перелік.
+
+Запуск:
+    python benchmarks/bench_requisition_list.py [--requisitions 100000] [--items 500000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'military_resource_app')))
+from logic.db_manager import create_connection, create_tables
+from logic.query_registry import MAX_EPOCH, MIN_EPOCH, execute_query
+from logic import requisition_handler
+
+DEPARTMENTS = ["1-й батальйон", "2-й батальйон", "3-й батальйон", "Рота зв'язку", "Інженерна рота"]
+STATUSES = ["нова", "на розгляді", "схвалено", "частково виконано", "виконано"]
+ITEMS = ["Бронежилет", "Шолом", "Радіостанція", "Акумулятор", "Сухпайок", "Аптечка", "Турнікет"]
+HISTORY_DAYS = 2 * 365
+
+LEGACY_LIST = """
+    SELECT
+        r.id, r.requisition_number,
+        r.author_manual_rank,
+        r.author_manual_lastname,
+        r.author_manual_initials,
+        u_creator.username as system_user_creator,
+        r.department_requesting,
+        r.creation_date, r.status, r.urgency,
+        r.purpose_description,
+        r.requisition_type,
+        (
+            SELECT GROUP_CONCAT(ri.requested_resource_name || ' (' || ri.quantity_requested || COALESCE(' ' || ri.unit_of_measure, '') || ')', '; ')
+            FROM (
+                SELECT ri_sub.requested_resource_name, ri_sub.quantity_requested, ri_sub.unit_of_measure
+                FROM requisition_items ri_sub
+                WHERE ri_sub.requisition_id = r.id
+                ORDER BY ri_sub.id LIMIT 3
+            ) AS ri
+        ) as item_summary
+    FROM requisitions r
+    LEFT JOIN users u_creator ON r.created_by_user_id = u_creator.id
+    WHERE (:status IS NULL OR r.status = :status)
+    ORDER BY r.creation_ts DESC LIMIT :limit
+"""
+
+def populate(conn, requisitions: int, items: int):
+    """Заповнює базу заявками за два роки та позиціями, розподіленими між ними."""
+    rng = random.Random(42)
+    start = datetime.now() - timedelta(days=HISTORY_DAYS)
+    conn.executemany(
+        """INSERT INTO requisitions (
+            requisition_number, created_by_user_id, department_requesting, creation_date, status
+        ) VALUES (?, 1, ?, ?, ?)""",
+        (
+            (f"REQ-BENCH-{i:07d}", rng.choice(DEPARTMENTS),
+             (start + timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))).strftime("%Y-%m-%d %H:%M:%S"),
+             rng.choice(STATUSES))
+            for i in range(requisitions)
+        )
+    )
+    owners = sorted(rng.randint(1, requisitions) for _ in range(items))
+    conn.executemany(
+        """INSERT INTO requisition_items (
+            requisition_id, requested_resource_name, quantity_requested, unit_of_measure
+        ) VALUES (?, ?, ?, 'шт')""",
+        ((owner, rng.choice(ITEMS), rng.randint(1, 50)) for owner in owners)
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+
+def timed(func, repeat: int) -> tuple:
+    """Повертає (найкращий час у мс, результат)."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def stored_list(conn, status, limit):
+    return execute_query(
+        conn, requisition_handler.QUERY_REQUISITIONS,
+        created_by_user_id=None, start_ts=MIN_EPOCH, end_ts=MAX_EPOCH, status=status,
+        urgency=None, requisition_type=None, limit=limit, offset=0
+    ).fetchall()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requisitions", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "resources.db")
+        conn = create_connection(db_file, profile="bulk-import")
+        create_tables(conn)
+        started = time.perf_counter()
+        populate(conn, args.requisitions, args.items)
+        print(f"Заповнено {args.requisitions} заявок та {args.items} позицій "
+              f"за {time.perf_counter() - started:.1f} с\n")
+
+        print(f"{'Список':<24}{'рядків':>10}{'старий, мс':>14}{'збережений, мс':>16}")
+        for title, status, limit in (("Перша сторінка", None, 100),
+                                     ("Сторінка 'схвалено'", "схвалено", 100),
+                                     ("Усі заявки", None, -1)):
+            legacy_ms, legacy = timed(lambda: conn.execute(
+                LEGACY_LIST, {"status": status, "limit": limit}).fetchall(), args.repeat)
+            stored_ms, stored = timed(lambda: stored_list(conn, status, limit), args.repeat)
+            print(f"{title:<24}{len(stored):>10}{legacy_ms:>14.1f}{stored_ms:>16.1f}")
+
+            # Перевірка: збережений перелік збігається з обчисленим
+            if ({row["id"]: row["item_summary"] for row in legacy}
+                    != {row["id"]: row["item_summary"] for row in stored}):
+                print("ПОМИЛКА: перелік позицій відрізняється")
+                sys.exit(1)
+
+        started = time.perf_counter()
+        requisition_handler.create_requisition(conn, 1, DEPARTMENTS[0], "планова", items=[
+            {"requested_resource_name": ITEMS[i % len(ITEMS)], "quantity_requested": i + 1}
+            for i in range(500)
+        ])
+        print(f"\nЗаявка з 500 позиціями: {(time.perf_counter() - started) * 1000:.1f} мс")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк звіту по заявках на великій кількості заявок і позицій.
+
+Порівнюється старий звіт (три корельовані підзапити на заявку, окремий
+запит позицій для кожної заявки та strptime у Python) з одним запитом у
+двох рівнях деталізації: лише підсумки (лічильники позицій заявки, без
+приєднання позицій) та підсумки з позиціями (LEFT JOIN + GROUP BY,
+json_group_array). Після замірів перевіряється, що всі варіанти дають
+однакові підсумки.
+
+Запуск:
+    python benchmarks/bench_requisition_report.py [--requisitions 50000] [--items 500000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'military_resource_app')))
+from logic.db_manager import create_connection, create_tables
+from logic.query_registry import date_range
+from logic import reporting
+
+RESOURCES = 500
+DEPARTMENTS = ["1-й батальйон", "2-й батальйон", "3-й батальйон", "Рота зв'язку", "Інженерна рота"]
+STATUSES = ["нова", "на розгляді", "схвалено", "частково виконано", "виконано"]
+ITEM_STATUSES = ["очікує", "схвалено", "виконано", "частково виконано"]
+HISTORY_DAYS = 2 * 365
+
+LEGACY_REPORT = """
+    SELECT
+        req.id as requisition_id,
+        req.requisition_number,
+        req.creation_date,
+        req.department_requesting,
+        u_created.username as created_by_username,
+        req.status,
+        req.urgency,
+        req.last_updated,
+        u_updated.username as last_updated_by_username,
+        (SELECT COUNT(*) FROM requisition_items ri WHERE ri.requisition_id = req.id) as total_items,
+        (SELECT COUNT(*) FROM requisition_items ri
+         WHERE ri.requisition_id = req.id AND ri.item_status = 'виконано') as completed_items,
+        (SELECT GROUP_CONCAT(DISTINCT ri.item_status)
+         FROM requisition_items ri
+         WHERE ri.requisition_id = req.id) as item_statuses
+    FROM requisitions req
+    LEFT JOIN users u_created ON req.created_by_user_id = u_created.id
+    LEFT JOIN users u_updated ON req.last_updated_by_user_id = u_updated.id
+    WHERE req.creation_ts >= ? AND req.creation_ts < ?
+    ORDER BY req.creation_ts DESC
+"""
+
+LEGACY_ITEMS = """
+    SELECT ri.*, r.name as resource_name, r.unit_of_measure
+    FROM requisition_items ri
+    LEFT JOIN resources r ON ri.resource_id = r.id
+    WHERE ri.requisition_id = ?
+"""
+
+def legacy_report(conn, start_ts: int, end_ts: int) -> list:
+    """Звіт так, як його формував код до переробки."""
+    result = []
+    for row in conn.execute(LEGACY_REPORT, (start_ts, end_ts)).fetchall():
+        row_dict = dict(row)
+        row_dict['items'] = [dict(item) for item in conn.execute(LEGACY_ITEMS, (row_dict['requisition_id'],))]
+        row_dict['completion_percentage'] = (
+            row_dict['completed_items'] / row_dict['total_items'] * 100
+            if row_dict['total_items'] > 0 else 0
+        )
+        if row_dict['last_updated']:
+            created = datetime.strptime(row_dict['creation_date'], "%Y-%m-%d %H:%M:%S")
+            updated = datetime.strptime(row_dict['last_updated'], "%Y-%m-%d %H:%M:%S")
+            row_dict['processing_time_hours'] = (updated - created).total_seconds() / 3600
+        else:
+            row_dict['processing_time_hours'] = None
+        result.append(row_dict)
+    return result
+
+def populate(conn, requisitions: int, items: int):
+    """Заповнює базу заявками за два роки та позиціями, розподіленими між ними."""
+    rng = random.Random(42)
+    start = datetime.now() - timedelta(days=HISTORY_DAYS)
+    category_id = conn.execute("SELECT id FROM categories LIMIT 1").fetchone()["id"]
+    conn.executemany(
+        "INSERT INTO resources (name, category_id, quantity, unit_of_measure) VALUES (?, ?, ?, 'шт')",
+        [(f"Ресурс {i}", category_id, 1000) for i in range(RESOURCES)]
+    )
+
+    rows = []
+    for i in range(requisitions):
+        created = start + timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+        updated = created + timedelta(hours=rng.randint(1, 240)) if rng.random() < 0.7 else None
+        rows.append((
+            f"REQ-BENCH-{i:07d}", rng.choice(DEPARTMENTS), created.strftime("%Y-%m-%d %H:%M:%S"),
+            rng.choice(STATUSES), updated.strftime("%Y-%m-%d %H:%M:%S") if updated else None
+        ))
+    conn.executemany(
+        """INSERT INTO requisitions (
+            requisition_number, created_by_user_id, department_requesting, creation_date,
+            status, last_updated, last_updated_by_user_id
+        ) VALUES (?, 1, ?, ?, ?, ?, 1)""",
+        rows
+    )
+    # Позиції заявки вставляються разом із нею, як у робочому режимі;
+    # кількість позицій на заявку випадкова, в середньому items / requisitions
+    owners = sorted(rng.randint(1, requisitions) for _ in range(items))
+    conn.executemany(
+        """INSERT INTO requisition_items (
+            requisition_id, resource_id, requested_resource_name, quantity_requested, item_status
+        ) VALUES (?, ?, ?, ?, ?)""",
+        (
+            (requisition_id, resource_id, f"Ресурс {resource_id - 1}",
+             rng.randint(1, 50), rng.choice(ITEM_STATUSES))
+            for requisition_id, resource_id in ((owner, rng.randint(1, RESOURCES)) for owner in owners)
+        )
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+
+def timed(func, repeat: int) -> tuple:
+    """Повертає (найкращий час у мс, результат)."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def summary_key(row: dict) -> tuple:
+    hours = row['processing_time_hours']
+    return (
+        row['requisition_id'], row['total_items'], row['completed_items'],
+        sorted((row['item_statuses'] or "").split(",")),
+        round(row['completion_percentage'], 6), None if hours is None else round(hours, 3),
+        len(row.get('items', [])),
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requisitions", type=int, default=50_000)
+    parser.add_argument("--items", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "resources.db")
+        conn = create_connection(db_file, profile="bulk-import")
+        create_tables(conn)
+        started = time.perf_counter()
+        populate(conn, args.requisitions, args.items)
+        print(f"Заповнено {args.requisitions} заявок та {args.items} позицій "
+              f"за {time.perf_counter() - started:.1f} с\n")
+
+        date_to = datetime.now().date()
+        periods = [
+            ("Місяць", (date_to - timedelta(days=30)).isoformat(), date_to.isoformat()),
+            ("Увесь період", None, None),
+        ]
+        print(f"{'Період':<14}{'Варіант':<22}{'мс':>10}{'заявок':>10}")
+        for title, date_from, day_to in periods:
+            start_ts, end_ts = date_range(date_from, day_to)
+            variants = [
+                ("старий (N+1)", lambda: legacy_report(conn, start_ts, end_ts)),
+                ("один запит", lambda: reporting.get_requisition_summary_report(
+                    date_from, day_to, conn=conn, include_items=False)),
+                ("один запит + позиції", lambda: reporting.get_requisition_summary_report(
+                    date_from, day_to, conn=conn)),
+            ]
+            results = {}
+            for label, func in variants:
+                elapsed, result = timed(func, args.repeat)
+                results[label] = result
+                print(f"{title:<14}{label:<22}{elapsed:>10.1f}{len(result):>10}")
+
+            # Порядок заявок з однаковою датою створення не визначений — порівнюємо множини
+            legacy = sorted(summary_key(row) for row in results["старий (N+1)"])
+            if legacy != sorted(summary_key(row) for row in results["один запит + позиції"]):
+                print("ПОМИЛКА: результати звіту відрізняються")
+                sys.exit(1)
+            counters = sorted(
+                (row['requisition_id'], row['total_items'], row['completed_items'])
+                for row in results["один запит"]
+            )
+            if counters != sorted(key[:3] for key in legacy):
+                print("ПОМИЛКА: лічильники позицій не збігаються зі старим звітом")
+                sys.exit(1)
+        conn.close()
+
+if __name__ == "__main__":
+    main()
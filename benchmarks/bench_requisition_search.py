@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк пошуку заявок на великій кількості заявок.
+
+Порівнюється старий пошук (шість умов LIKE '%...%', зокрема EXISTS по
+позиціях) з повнотекстовим індексом requisitions_fts для типових запитів:
+номер заявки, прізвище, підрозділ, назва позиції, кілька слів та
+послідовне введення слова по літері (як у полі пошуку). Для кожного
+запиту виводиться кількість знайдених заявок повним пошуком (без LIMIT)
+та час першої сторінки (limit=100), як у вікні заявок.
+
+Запуск:
+    python benchmarks/bench_requisition_search.py [--requisitions 100000] [--items 500000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'military_resource_app')))
+from logic.db_manager import create_connection, create_tables
+from logic.migrations import REQUISITION_SEARCH_INSERT_SQL
+from logic.query_registry import MAX_EPOCH, MIN_EPOCH, execute_query, fts_match
+from logic import requisition_handler
+
+DEPARTMENTS = ["1-й батальйон", "2-й батальйон", "3-й батальйон", "Рота зв'язку",
+               "Інженерна рота", "Рота матеріального забезпечення", "Медична рота"]
+LASTNAMES = ["Шевченко", "Коваленко", "Бондаренко", "Ткаченко", "Кравченко", "Олійник",
+             "Шевчук", "Поліщук", "Мельник", "Йосипенко", "Гнатюк", "Пономаренко"]
+PURPOSES = ["для проведення навчань", "для забезпечення бойових завдань", "поповнення запасів",
+            "заміна зношеного майна", "облаштування позицій", "ремонт техніки"]
+TYPES = ["планова", "позапланова", "термінова"]
+ITEMS = ["Бронежилет", "Шолом балістичний", "Радіостанція Motorola", "Акумулятор", "Сухпайок",
+         "Аптечка індивідуальна", "Турнікет", "Спальний мішок", "Намет", "Генератор",
+         "Пальне дизельне", "Тепловізор", "Бінокль", "Маскувальна сітка", "Зарядна станція"]
+HISTORY_DAYS = 2 * 365
+PAGE = 100
+
+LEGACY_SEARCH = """
+    SELECT
+        r.id, r.requisition_number,
+        r.author_manual_rank,
+        r.author_manual_lastname,
+        r.author_manual_initials,
+        u_creator.username as system_user_creator,
+        r.department_requesting,
+        r.creation_date, r.status, r.urgency,
+        r.purpose_description,
+        r.requisition_type,
+        (
+            SELECT GROUP_CONCAT(ri.requested_resource_name || ' (' || ri.quantity_requested || COALESCE(' ' || ri.unit_of_measure, '') || ')', '; ')
+            FROM (
+                SELECT ri_sub.requested_resource_name, ri_sub.quantity_requested, ri_sub.unit_of_measure
+                FROM requisition_items ri_sub
+                WHERE ri_sub.requisition_id = r.id
+                ORDER BY ri_sub.id LIMIT 3
+            ) AS ri
+        ) as item_summary
+    FROM requisitions r
+    LEFT JOIN users u_creator ON r.created_by_user_id = u_creator.id
+    WHERE r.requisition_number LIKE :search OR
+          r.department_requesting LIKE :search OR
+          r.purpose_description LIKE :search OR
+          r.requisition_type LIKE :search OR
+          r.author_manual_lastname LIKE :search OR
+          EXISTS (SELECT 1 FROM requisition_items ri_search
+                  WHERE ri_search.requisition_id = r.id
+                    AND ri_search.requested_resource_name LIKE :search)
+    ORDER BY r.creation_ts DESC LIMIT :limit
+"""
+
+FTS_SEARCH = "SELECT rowid FROM requisitions_fts WHERE requisitions_fts MATCH :match"
+
+def populate(conn, requisitions: int, items: int):
+    """Заповнює базу заявками за два роки та будує пошуковий індекс."""
+    rng = random.Random(42)
+    start = datetime.now() - timedelta(days=HISTORY_DAYS)
+    rows = []
+    for i in range(requisitions):
+        created = start + timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+        rows.append((
+            f"REQ-{created:%Y%m}-{i + 1:06d}", rng.choice(DEPARTMENTS),
+            created.strftime("%Y-%m-%d %H:%M:%S"), rng.choice(PURPOSES), rng.choice(TYPES),
+            rng.choice(LASTNAMES)
+        ))
+    conn.executemany(
+        """INSERT INTO requisitions (
+            requisition_number, created_by_user_id, department_requesting, creation_date,
+            purpose_description, requisition_type, author_manual_lastname
+        ) VALUES (?, 1, ?, ?, ?, ?, ?)""",
+        rows
+    )
+    # Як і add_items_to_requisition, індекс будується один раз після вставки
+    # позицій, а не дописується тригером на кожній позиції
+    conn.execute("DELETE FROM requisitions_fts")
+    owners = sorted(rng.randint(1, requisitions) for _ in range(items))
+    conn.executemany(
+        """INSERT INTO requisition_items (
+            requisition_id, requested_resource_name, quantity_requested
+        ) VALUES (?, ?, ?)""",
+        ((owner, rng.choice(ITEMS), rng.randint(1, 50)) for owner in owners)
+    )
+    conn.execute(REQUISITION_SEARCH_INSERT_SQL)
+    conn.execute("INSERT INTO requisitions_fts (requisitions_fts) VALUES ('optimize')")
+    conn.commit()
+    conn.execute("ANALYZE")
+
+def timed(func, repeat: int) -> tuple:
+    """Повертає (найкращий час у мс, результат)."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requisitions", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "resources.db")
+        conn = create_connection(db_file, profile="bulk-import")
+        create_tables(conn)
+        started = time.perf_counter()
+        populate(conn, args.requisitions, args.items)
+        print(f"Заповнено {args.requisitions} заявок та {args.items} позицій "
+              f"за {time.perf_counter() - started:.1f} с\n")
+
+        number = conn.execute(
+            "SELECT requisition_number FROM requisitions ORDER BY random() LIMIT 1"
+        ).fetchone()[0]
+        terms = [number, "Йосипенко", "Рота зв'язку", "Тепловізор", "тепловізор медична",
+                 "т", "те", "теп", "тепл", "тепло"]
+
+        print(f"{'Запит':<24}{'знайдено':>10}{'LIKE, мс':>12}{'FTS5, мс':>12}")
+        for term in terms:
+            like_ms, _ = timed(lambda: conn.execute(
+                LEGACY_SEARCH, {"search": f"%{term}%", "limit": PAGE}).fetchall(), args.repeat)
+            fts_ms, _ = timed(lambda: execute_query(
+                conn, requisition_handler.QUERY_REQUISITIONS_SEARCH, match=fts_match(term),
+                start_ts=MIN_EPOCH, end_ts=MAX_EPOCH, limit=PAGE, offset=0).fetchall(), args.repeat)
+            found = len(conn.execute(FTS_SEARCH, {"match": fts_match(term)}).fetchall())
+            print(f"{term:<24}{found:>10}{like_ms:>12.1f}{fts_ms:>12.1f}")
+
+        # Перевірка: для цілих слів індекс знаходить те саме, що й LIKE
+        for term in ("Йосипенко", "Тепловізор"):
+            legacy = {row["id"] for row in conn.execute(
+                LEGACY_SEARCH, {"search": f"%{term}%", "limit": -1})}
+            fts = {row[0] for row in conn.execute(FTS_SEARCH, {"match": fts_match(term)})}
+            if legacy != fts:
+                print(f"ПОМИЛКА: результати пошуку '{term}' відрізняються")
+                sys.exit(1)
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк конкурентного доступу двох екземплярів програми до resources.db.
+
+Один процес (комірник) записує транзакції короткими комітами, другий
+(звіт/перегляд) безперервно читає залишки. Порівнюються старий режим
+(rollback journal, synchronous=FULL) та профілі PRAGMA з db_manager.
+
+Запуск:
+    python benchmarks/bench_wal_concurrency.py [--seconds 5] [--profiles terminal bulk-import]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from military_resource_app.logic.db_manager import apply_pragma_profile, create_tables
+
+LEGACY = "legacy"
+
+def open_connection(db_file: str, profile: str) -> sqlite3.Connection:
+    """Відкриває з'єднання так, як це робить програма з відповідним профілем."""
+    conn = sqlite3.connect(db_file, timeout=5)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON;")
+    if profile != LEGACY:
+        apply_pragma_profile(conn, profile)
+    return conn
+
+def prepare_database(db_file: str, profile: str, resources: int = 200):
+    """Створює схему та заповнює ресурси для бенчмарку."""
+    conn = open_connection(db_file, profile)
+    if profile == LEGACY:
+        conn.execute("PRAGMA journal_mode = DELETE")
+    create_tables(conn)
+    category_id = conn.execute("SELECT id FROM categories LIMIT 1").fetchone()["id"]
+    conn.executemany(
+        "INSERT INTO resources (name, category_id, quantity) VALUES (?, ?, ?)",
+        [(f"Ресурс {i}", category_id, 1_000_000) for i in range(resources)]
+    )
+    conn.commit()
+    conn.close()
+
+def writer(db_file: str, profile: str, seconds: float, result_queue):
+    """Екземпляр-комірник: одна видача = одна транзакція з комітом."""
+    conn = open_connection(db_file, profile)
+    commits = errors = 0
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        resource_id = i % 200 + 1
+        started = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE resources SET quantity = quantity - 1 WHERE id = ?", (resource_id,)
+            )
+            conn.execute(
+                """INSERT INTO resource_transactions (
+                    resource_id, transaction_type, quantity_changed,
+                    transaction_date, recipient_department, issued_by_user_id
+                ) VALUES (?, 'видача', 1, ?, '1-й батальйон', 1)""",
+                (resource_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            conn.commit()
+            commits += 1
+            latencies.append(time.perf_counter() - started)
+        except sqlite3.OperationalError:
+            conn.rollback()
+            errors += 1
+        i += 1
+    conn.close()
+    result_queue.put(("writer", commits, errors, latencies))
+
+def reader(db_file: str, profile: str, seconds: float, result_queue):
+    """Екземпляр-переглядач: повторно читає залишки та історію."""
+    conn = open_connection(db_file, profile)
+    queries = errors = 0
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            conn.execute("SELECT SUM(quantity) FROM resources").fetchone()
+            conn.execute(
+                "SELECT COUNT(*) FROM resource_transactions WHERE resource_id = ?", (queries % 200 + 1,)
+            ).fetchone()
+            queries += 1
+            latencies.append(time.perf_counter() - started)
+        except sqlite3.OperationalError:
+            errors += 1
+    conn.close()
+    result_queue.put(("reader", queries, errors, latencies))
+
+def percentile(values, pct):
+    """Повертає перцентиль списку (у мілісекундах)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return ordered[index] * 1000
+
+def run_profile(profile: str, seconds: float) -> dict:
+    """Запускає пару процесів writer/reader на окремій копії БД."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "resources.db")
+        prepare_database(db_file, profile)
+
+        result_queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=writer, args=(db_file, profile, seconds, result_queue)),
+            multiprocessing.Process(target=reader, args=(db_file, profile, seconds, result_queue)),
+        ]
+        for process in processes:
+            process.start()
+        results = {}
+        for _ in processes:
+            role, count, errors, latencies = result_queue.get()
+            results[role] = {
+                "ops_per_sec": count / seconds,
+                "errors": errors,
+                "p50_ms": percentile(latencies, 50),
+                "p99_ms": percentile(latencies, 99),
+            }
+        for process in processes:
+            process.join()
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--profiles", nargs="+", default=[LEGACY, "terminal"])
+    args = parser.parse_args()
+
+    print(f"{'Профіль':<18}{'Роль':<8}{'оп/с':>10}{'помилки':>10}{'p50, мс':>10}{'p99, мс':>10}")
+    for profile in args.profiles:
+        results = run_profile(profile, args.seconds)
+        for role in ("writer", "reader"):
+            r = results[role]
+            print(f"{profile:<18}{role:<8}{r['ops_per_sec']:>10.0f}{r['errors']:>10}"
+                  f"{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Стрес-тест одночасної видачі одного ресурсу з кількох процесів.
+
+Кожен процес (окремий термінал комірника) багато разів видає по одиниці
+того самого ресурсу. Початкового залишку вистачає лише на половину спроб,
+тому частина видач має бути відхилена. Після прогону перевіряється, що
+залишок = початковий - кількість успішних видач (немає втрачених
+оновлень) і що залишок не від'ємний.
+
+Режими:
+    legacy  — старий шлях: SELECT quantity, розрахунок у Python, UPDATE
+              абсолютним значенням
+    atomic  — apply_stock_movement: умовний UPDATE під BEGIN IMMEDIATE
+
+Запуск:
+    python benchmarks/stress_stock_decrement.py [--processes 8] [--issues 300]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'military_resource_app')))
+from logic.db_manager import CATEGORIES, add_resource, create_connection, create_tables
+from logic.transaction_handler import TransactionHandler
+
+MODES = ("legacy", "atomic")
+
+def legacy_issue(conn: sqlite3.Connection, resource_id: int, quantity: int) -> bool:
+    """Видача так, як її робив код до рушія: читання і запис окремо."""
+    current = conn.execute("SELECT quantity FROM resources WHERE id = ?", (resource_id,)).fetchone()
+    new_quantity = current["quantity"] - quantity
+    if new_quantity < 0:
+        return False
+    conn.execute("UPDATE resources SET quantity = ? WHERE id = ?", (new_quantity, resource_id))
+    conn.execute(
+        """INSERT INTO resource_transactions (
+            resource_id, transaction_type, quantity_changed, transaction_date, issued_by_user_id
+        ) VALUES (?, 'видача', ?, ?, 1)""",
+        (resource_id, quantity, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    )
+    conn.commit()
+    return True
+
+def terminal(db_file: str, mode: str, resource_id: int, issues: int, start_event, result_queue):
+    """Один процес-термінал: issues спроб видати по одиниці."""
+    conn = create_connection(db_file)
+    handler = TransactionHandler(conn)
+    succeeded = refused = errors = 0
+    start_event.wait()
+    for _ in range(issues):
+        try:
+            if mode == "legacy":
+                ok = legacy_issue(conn, resource_id, 1)
+            else:
+                ok, _ = handler.add_transaction(resource_id, 'видача', 1, 1)
+            if ok:
+                succeeded += 1
+            else:
+                refused += 1
+        except sqlite3.OperationalError:
+            if conn.in_transaction:
+                conn.rollback()
+            errors += 1
+    conn.close()
+    result_queue.put((succeeded, refused, errors))
+
+def run_mode(mode: str, processes: int, issues: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, "resources.db")
+        conn = create_connection(db_file)
+        create_tables(conn)
+        initial = processes * issues // 2
+        resource_id = add_resource(conn, "Набої 5.45", initial, "", None, CATEGORIES[2])
+        conn.close()
+
+        start_event = multiprocessing.Event()
+        result_queue = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(
+                target=terminal,
+                args=(db_file, mode, resource_id, issues, start_event, result_queue)
+            )
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        started = time.perf_counter()
+        start_event.set()
+        totals = [0, 0, 0]
+        for _ in workers:
+            for i, value in enumerate(result_queue.get()):
+                totals[i] += value
+        elapsed = time.perf_counter() - started
+        for worker in workers:
+            worker.join()
+
+        conn = sqlite3.connect(db_file)
+        final = conn.execute("SELECT quantity FROM resources WHERE id = ?", (resource_id,)).fetchone()[0]
+        recorded = conn.execute("SELECT COUNT(*) FROM resource_transactions").fetchone()[0]
+        conn.close()
+
+        succeeded, refused, errors = totals
+        return {
+            "initial": initial,
+            "succeeded": succeeded,
+            "refused": refused,
+            "errors": errors,
+            "final": final,
+            "recorded": recorded,
+            "lost_updates": final - (initial - succeeded),
+            "ops_per_sec": (succeeded + refused) / elapsed,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--issues", type=int, default=300)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    print(f"{'Режим':<8}{'початок':>9}{'видано':>8}{'відмов':>8}{'помилок':>9}"
+          f"{'залишок':>9}{'записів':>9}{'втрачено':>10}{'оп/с':>8}")
+    failed = False
+    for mode in args.modes:
+        r = run_mode(mode, args.processes, args.issues)
+        print(f"{mode:<8}{r['initial']:>9}{r['succeeded']:>8}{r['refused']:>8}{r['errors']:>9}"
+              f"{r['final']:>9}{r['recorded']:>9}{r['lost_updates']:>10}{r['ops_per_sec']:>8.0f}")
+        if mode == "atomic" and (r["lost_updates"] != 0 or r["final"] < 0
+                                 or r["recorded"] != r["succeeded"]):
+            failed = True
+    if failed:
+        print("ПОМИЛКА: атомарний режим втратив оновлення")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Пакетний розподіл залишків між відкритими заявками.
+
+Замість видачі по одній позиції (process_requisition_item_execution з
+власною перевіркою залишку та комітом) розподіл працює за один прохід:
+одним запитом читаються всі відкриті позиції схвалених заявок разом з
+уже виданою кількістю та поточним залишком ресурсу, план будується в
+Python, а видачі застосовуються одним завданням запису: залишок кожного
+ресурсу змінюється одним UPDATE, транзакції 'видача' та статуси позицій
+записуються через executemany, статуси заявок оновлюються за лічильниками
+позицій (requisition_handler.rollup_requisition_statuses).
+
+Дефіцитний ресурс отримують спочатку критичні заявки, потім термінові,
+потім планові; за однакової терміновості — раніше створені.
+
+dry_run=True повертає план без змін у базі. Під час застосування план
+будується заново всередині транзакції запису (BEGIN IMMEDIATE), тому він
+відповідає залишкам, які справді буде списано.
+
+Запуск ранкового розподілу:
+    python -m logic.allocation [--dry-run] [--no-partial] [--resource-id 12]
+"""
+
+import argparse
+import json
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .db_manager import DB_PATH, create_connection, pooled_connection
+from .db_writer import run_write
+from .query_registry import execute_query, executemany_query, register_query
+from .requisition_handler import rollup_requisition_statuses
+from .transaction_handler import (
+    QUERY_ADJUST_STOCK, QUERY_INSERT_TRANSACTION, InsufficientQuantityError
+)
+
+# Порядок обслуговування за терміновістю заявки
+URGENCY_ORDER = ('критична', 'термінова', 'планова')
+
+# Позиції схваленої заявки, які ще чекають на видачу
+OPEN_ITEM_STATUSES = ('очікує', 'схвалено', 'частково виконано')
+OPEN_REQUISITION_STATUSES = ('схвалено', 'частково виконано')
+
+def _sql_list(values: Iterable[str]) -> str:
+    return ", ".join(f"'{value}'" for value in values)
+
+_URGENCY_RANK = " ".join(
+    f"WHEN '{urgency}' THEN {rank}" for rank, urgency in enumerate(URGENCY_ORDER)
+)
+
+# Видану кількість дає частковий індекс idx_transactions_requisition_item,
+# відкриті позиції — idx_requisition_items_open (міграція 9)
+QUERY_OPEN_ITEMS = register_query("allocation.open_items", f"""
+    SELECT
+        ri.id AS item_id,
+        ri.requisition_id,
+        ri.resource_id,
+        ri.requested_resource_name,
+        ri.quantity_requested - COALESCE((
+            SELECT SUM(t.quantity_changed)
+            FROM resource_transactions t
+            WHERE t.requisition_item_id = ri.id AND t.transaction_type = 'видача'
+        ), 0) AS outstanding,
+        r.requisition_number,
+        r.department_requesting,
+        r.urgency,
+        r.creation_date,
+        res.quantity AS stock
+    FROM requisition_items ri
+    JOIN requisitions r ON r.id = ri.requisition_id
+    JOIN resources res ON res.id = ri.resource_id
+    WHERE ri.item_status IN ({_sql_list(OPEN_ITEM_STATUSES)})
+      AND r.status IN ({_sql_list(OPEN_REQUISITION_STATUSES)})
+      AND (:resource_ids IS NULL OR ri.resource_id IN (SELECT value FROM json_each(:resource_ids)))
+    ORDER BY CASE r.urgency {_URGENCY_RANK} ELSE {len(URGENCY_ORDER)} END,
+             r.creation_ts, r.id, ri.id
+""")
+
+QUERY_ISSUE_ITEM = register_query("allocation.issue_item", """
+    UPDATE requisition_items
+    SET item_status = :item_status,
+        last_executed = :executed_at,
+        last_executed_by_user_id = :user_id
+    WHERE id = :item_id
+""")
+
+def load_open_items(conn: sqlite3.Connection,
+                    resource_ids: Optional[List[int]] = None) -> List[Dict]:
+    """
+    Відкриті позиції схвалених заявок у порядку обслуговування.
+
+    Позиції без прив'язки до ресурсу каталогу не розподіляються.
+    """
+    return [dict(row) for row in execute_query(
+        conn, QUERY_OPEN_ITEMS,
+        resource_ids=json.dumps(resource_ids) if resource_ids is not None else None
+    )]
+
+def plan_allocation(items: Iterable[Dict], allow_partial: bool = True) -> List[Dict]:
+    """
+    Розподіляє залишки між позиціями у переданому порядку.
+
+    Args:
+        items: Позиції з load_open_items (вже впорядковані за пріоритетом).
+        allow_partial: Видавати частину, якщо залишку не вистачає на всю
+            позицію; інакше така позиція пропускається і залишок дістається
+            наступним.
+
+    Returns:
+        Позиції з ключами quantity (скільки видати), shortfall (скільки
+        бракує) та item_status (новий статус або None, якщо видачі немає).
+    """
+    remaining = {}
+    plan = []
+    for item in items:
+        outstanding = item["outstanding"]
+        if outstanding <= 0:
+            continue
+        available = remaining.setdefault(item["resource_id"], max(item["stock"], 0))
+        quantity = min(outstanding, available)
+        if quantity < outstanding and not allow_partial:
+            quantity = 0
+        remaining[item["resource_id"]] = available - quantity
+        shortfall = outstanding - quantity
+        plan.append({
+            **item,
+            "quantity": quantity,
+            "shortfall": shortfall,
+            "item_status": None if not quantity else ('виконано' if not shortfall else 'частково виконано'),
+        })
+    return plan
+
+def _summary(plan: List[Dict], dry_run: bool) -> Dict:
+    issued = [item for item in plan if item["quantity"]]
+    return {
+        "dry_run": dry_run,
+        "items": plan,
+        "issued_items": len(issued),
+        "issued_quantity": sum(item["quantity"] for item in issued),
+        "short_items": sum(1 for item in plan if item["shortfall"]),
+        "requisitions": len({item["requisition_id"] for item in issued}),
+    }
+
+def apply_allocation(conn: sqlite3.Connection, plan: List[Dict],
+                     issued_by_user_id: Optional[int] = None) -> int:
+    """
+    Записує видачі плану всередині транзакції запису.
+
+    Returns:
+        Кількість створених транзакцій 'видача'.
+
+    Raises:
+        InsufficientQuantityError: залишок змінився після побудови плану
+            (план слід будувати в тій самій транзакції).
+    """
+    issued = [item for item in plan if item["quantity"]]
+    if not issued:
+        return 0
+    executed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    deltas = {}
+    for item in issued:
+        deltas[item["resource_id"]] = deltas.get(item["resource_id"], 0) - item["quantity"]
+    adjusted = executemany_query(conn, QUERY_ADJUST_STOCK, (
+        {"resource_id": resource_id, "delta": delta} for resource_id, delta in deltas.items()
+    )).rowcount
+    if adjusted != len(deltas):
+        raise InsufficientQuantityError("Залишки змінилися під час розподілу")
+
+    executemany_query(conn, QUERY_INSERT_TRANSACTION, (
+        {
+            "resource_id": item["resource_id"],
+            "transaction_type": 'видача',
+            "quantity": item["quantity"],
+            "transaction_date": executed_at,
+            "recipient_department": item["department_requesting"],
+            "issued_by_user_id": issued_by_user_id,
+            "notes": f"Розподіл за заявкою {item['requisition_number']}",
+            "requisition_item_id": item["item_id"],
+        }
+        for item in issued
+    ))
+    executemany_query(conn, QUERY_ISSUE_ITEM, (
+        {
+            "item_id": item["item_id"],
+            "item_status": item["item_status"],
+            "executed_at": executed_at,
+            "user_id": issued_by_user_id,
+        }
+        for item in issued
+    ))
+    # Загальний статус заявок — те саме правило, що й при видачі однієї позиції
+    rollup_requisition_statuses(conn, {item["requisition_id"] for item in issued}, issued_by_user_id)
+    return len(issued)
+
+def allocate_stock(conn: Optional[sqlite3.Connection] = None,
+                   issued_by_user_id: Optional[int] = None, dry_run: bool = False,
+                   allow_partial: bool = True,
+                   resource_ids: Optional[List[int]] = None) -> Dict:
+    """
+    Розподіляє залишки між усіма відкритими позиціями схвалених заявок.
+
+    Args:
+        conn: З'єднання (для dry_run за замовчуванням — з пулу; для запису
+            потрібне, якщо потік запису не запущено).
+        issued_by_user_id: Хто видає.
+        dry_run: Лише побудувати план, нічого не змінюючи.
+        allow_partial: Див. plan_allocation.
+        resource_ids: Розподіляти лише ці ресурси (None — усі).
+
+    Returns:
+        Словник з планом (items) та підсумками: issued_items,
+        issued_quantity, short_items, requisitions, dry_run.
+        Усі видачі застосовуються атомарно: або всі, або жодна.
+    """
+    if dry_run:
+        with pooled_connection(conn) as read_conn:
+            return _summary(plan_allocation(load_open_items(read_conn, resource_ids), allow_partial), True)
+
+    def _allocate(write_conn: sqlite3.Connection) -> List[Dict]:
+        plan = plan_allocation(load_open_items(write_conn, resource_ids), allow_partial)
+        apply_allocation(write_conn, plan, issued_by_user_id)
+        return plan
+
+    return _summary(run_write(_allocate, conn), False)
+
+def format_allocation(result: Dict) -> str:
+    """Текстовий звіт про розподіл (для консолі та вікна підтвердження)."""
+    lines = [
+        f"{'План розподілу' if result['dry_run'] else 'Розподіл виконано'}: "
+        f"позицій до видачі {result['issued_items']} ({result['issued_quantity']} од.) "
+        f"за {result['requisitions']} заявками, з нестачею {result['short_items']}."
+    ]
+    for item in result["items"]:
+        line = (f"{item['requisition_number']} [{item['urgency']}] "
+                f"{item['requested_resource_name']}: {item['quantity']} з {item['outstanding']}")
+        if item["shortfall"]:
+            line += f" (бракує {item['shortfall']})"
+        lines.append(line)
+    return "\n".join(lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Розподіл залишків між схваленими заявками")
+    parser.add_argument("--db", default=DB_PATH, help="Файл бази даних")
+    parser.add_argument("--dry-run", action="store_true", help="Лише показати план")
+    parser.add_argument("--no-partial", action="store_true",
+                        help="Не видавати позиції частково")
+    parser.add_argument("--resource-id", type=int, action="append", dest="resource_ids",
+                        help="Розподіляти лише цей ресурс (можна повторювати)")
+    parser.add_argument("--user-id", type=int, default=None, help="ID користувача, що видає")
+    args = parser.parse_args()
+
+    connection = create_connection(args.db)
+    try:
+        print(format_allocation(allocate_stock(
+            connection, args.user_id, dry_run=args.dry_run,
+            allow_partial=not args.no_partial, resource_ids=args.resource_ids
+        )))
+    except (sqlite3.Error, InsufficientQuantityError) as e:
+        print(f"Помилка розподілу: {e}")
+    finally:
+        connection.close()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Архівація транзакцій завершених років в окремі файли archive_YYYY.db.
+
+resource_transactions лише зростає. archive_year() переносить транзакції
+року до файлу archive_YYYY.db поруч з основною базою, тож щоденна робота,
+delete_resource та VACUUM мають справу лише з "гарячими" даними. Денні
+підсумки (transaction_daily_rollup) охоплюють усю історію, тому зведення
+та залишки "на дату" від архівації не змінюються.
+
+Повна історія доступна на вимогу: attach_archives() приєднує файли архівів
+років запитаного діапазону дат до з'єднання та створює тимчасове
+представлення all_resource_transactions (UNION ALL основної таблиці та
+архівів). history_connection() робить те саме на окремому з'єднанні, якщо
+на переданому відкрито транзакцію (ATTACH у транзакції неможливий).
+
+Запуск архівації з планувальника завдань:
+    python -m logic.archive [--keep-years 1] [--year 2023]
+"""
+
+import argparse
+import glob
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from .db_manager import DB_PATH, create_connection, main_db_file
+from .migrations import DATE_EPOCH_COLUMNS, ROLLUP_DELETE_TRIGGER, ROLLUP_TRIGGERS
+from .query_registry import MAX_EPOCH, MIN_EPOCH, date_range
+
+ARCHIVE_TABLE = "resource_transactions"
+# Тимчасове представлення з повною історією транзакцій
+ARCHIVE_VIEW = "all_resource_transactions"
+
+_ARCHIVE_FILE_RE = re.compile(r"^archive_(\d{4})\.db$")
+_ARCHIVE_SCHEMA_RE = re.compile(r"^archive_\d{4}$")
+
+def archive_path(db_file: str, year: int) -> str:
+    """Шлях до файлу архіву року поруч з основною базою."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_file)), f"archive_{year}.db")
+
+def list_archives(db_file: str) -> List[int]:
+    """Роки, для яких існують файли архівів."""
+    pattern = os.path.join(os.path.dirname(os.path.abspath(db_file)), "archive_*.db")
+    years = []
+    for path in glob.glob(pattern):
+        match = _ARCHIVE_FILE_RE.match(os.path.basename(path))
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+def archived_years(conn: sqlite3.Connection) -> List[int]:
+    """Роки, транзакції яких перенесено з основної бази з'єднання в архіви."""
+    return list_archives(main_db_file(conn))
+
+def not_archived_filter(column: str, param: str = "archived_years") -> str:
+    """
+    Умова для денних підсумків (transaction_daily_rollup): день column не
+    належить рокам з :param (JSON-масив, див. archived_years). Підсумки
+    охоплюють і архівовані роки, тож без повної історії їх слід виключати,
+    щоб підсумок збігався з основною таблицею; :param = NULL — без обмеження.
+    """
+    return (f"(:{param} IS NULL OR CAST(strftime('%Y', {column}, 'unixepoch') AS INTEGER)"
+            f" NOT IN (SELECT value FROM json_each(:{param})))")
+
+def _years_in_range(years: List[int], start_ts: int, end_ts: int) -> List[int]:
+    """Роки, що перетинаються з діапазоном [start_ts, end_ts)."""
+    selected = []
+    for year in years:
+        year_start, year_end = date_range(f"{year}-01-01", f"{year}-12-31")
+        if year_start < end_ts and start_ts < year_end:
+            selected.append(year)
+    return selected
+
+def _transaction_columns(conn: sqlite3.Connection) -> List[tuple]:
+    """(назва, тип) звичайних колонок resource_transactions основної бази."""
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA main.table_info({ARCHIVE_TABLE})")]
+
+def _ensure_archive_schema(conn: sqlite3.Connection, schema: str):
+    """Створює (або доповнює новими колонками) таблицю архіву."""
+    columns = _transaction_columns(conn)
+    existing = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_xinfo({ARCHIVE_TABLE})")}
+    ts_column, ts_expression = next(
+        (column, expression) for table, column, expression in DATE_EPOCH_COLUMNS
+        if table == ARCHIVE_TABLE
+    )
+    if not existing:
+        definitions = [
+            "id INTEGER PRIMARY KEY" if name == "id" else f"{name} {col_type}"
+            for name, col_type in columns
+        ]
+        definitions.append(f"{ts_column} INTEGER GENERATED ALWAYS AS ({ts_expression}) VIRTUAL")
+        conn.execute(f"CREATE TABLE {schema}.{ARCHIVE_TABLE} ({', '.join(definitions)})")
+    else:
+        for name, col_type in columns:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {schema}.{ARCHIVE_TABLE} ADD COLUMN {name} {col_type}")
+    conn.execute(f"""CREATE INDEX IF NOT EXISTS {schema}.idx_archive_resource_ts
+        ON {ARCHIVE_TABLE} (resource_id, {ts_column})""")
+    conn.execute(f"""CREATE INDEX IF NOT EXISTS {schema}.idx_archive_department_ts
+        ON {ARCHIVE_TABLE} (recipient_department, {ts_column})""")
+
+def archive_year(year: int, db_file: str = DB_PATH, today: Optional[date] = None) -> int:
+    """
+    Переносить транзакції завершеного року year до archive_YYYY.db.
+
+    У режимі WAL транзакція над кількома файлами не атомарна для всіх файлів
+    разом, тому перенесення йде у два кроки, кожен з яких можна безпечно
+    повторити: спочатку копіювання (INSERT OR IGNORE за id), потім
+    видалення з основної бази лише тих рядків, що вже є в архіві.
+    Тригер денних підсумків на видалення на цей час вимикається.
+
+    Returns:
+        int: кількість перенесених транзакцій
+    """
+    today = today or date.today()
+    if year >= today.year:
+        raise ValueError(f"Рік {year} ще не завершено")
+
+    start_ts, end_ts = date_range(f"{year}-01-01", f"{year}-12-31")
+    in_year = "transaction_ts >= :start_ts AND transaction_ts < :end_ts"
+    params = {"start_ts": start_ts, "end_ts": end_ts}
+    conn = create_connection(db_file, profile="bulk-import")
+    try:
+        # Порожній рік не створює файл архіву
+        if not conn.execute(
+            f"SELECT 1 FROM main.{ARCHIVE_TABLE} WHERE {in_year} LIMIT 1", params
+        ).fetchone():
+            return 0
+        conn.execute("ATTACH DATABASE ? AS archive_target", (archive_path(db_file, year),))
+        columns = ", ".join(name for name, _ in _transaction_columns(conn))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _ensure_archive_schema(conn, "archive_target")
+            conn.execute(f"""
+                INSERT OR IGNORE INTO archive_target.{ARCHIVE_TABLE} ({columns})
+                SELECT {columns} FROM main.{ARCHIVE_TABLE} WHERE {in_year}
+            """, params)
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"DROP TRIGGER IF EXISTS main.{ROLLUP_DELETE_TRIGGER}")
+            moved = conn.execute(f"""
+                DELETE FROM main.{ARCHIVE_TABLE}
+                WHERE {in_year}
+                  AND id IN (SELECT id FROM archive_target.{ARCHIVE_TABLE})
+            """, params).rowcount
+            for statement in ROLLUP_TRIGGERS:
+                if ROLLUP_DELETE_TRIGGER in statement:
+                    conn.execute(statement)
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        conn.execute("DETACH DATABASE archive_target")
+        return moved
+    finally:
+        conn.close()
+
+def archive_closed_years(db_file: str = DB_PATH, keep_years: int = 1,
+                         today: Optional[date] = None) -> Dict[int, int]:
+    """
+    Архівує всі роки, старші за keep_years останніх (поточний рік — 1).
+
+    Returns:
+        {рік: кількість перенесених транзакцій}
+    """
+    today = today or date.today()
+    last_year = today.year - max(keep_years, 1)
+    conn = create_connection(db_file)
+    try:
+        first_ts = conn.execute(
+            f"SELECT MIN(transaction_ts) FROM {ARCHIVE_TABLE} WHERE transaction_ts > 0"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    if first_ts is None:
+        return {}
+
+    moved = {}
+    first_year = datetime.fromtimestamp(first_ts, timezone.utc).year
+    for year in range(first_year, last_year + 1):
+        count = archive_year(year, db_file, today)
+        if count:
+            moved[year] = count
+    return moved
+
+def attach_archives(conn: sqlite3.Connection, start_ts: int = MIN_EPOCH,
+                    end_ts: int = MAX_EPOCH) -> List[int]:
+    """
+    Приєднує до з'єднання архіви років, що перетинаються з діапазоном
+    [start_ts, end_ts), та (пере)створює тимчасове представлення
+    all_resource_transactions з основної таблиці та цих архівів.
+
+    Архіви інших років, приєднані раніше, від'єднуються: кількість
+    приєднаних баз обмежена (SQLITE_LIMIT_ATTACHED, типово 10). Приєднання
+    неможливе всередині транзакції, тому викликати до BEGIN (або через
+    history_connection).
+
+    Returns:
+        Роки приєднаних архівів.
+
+    Raises:
+        sqlite3.OperationalError: діапазон охоплює більше архівів, ніж
+            можна приєднати до одного з'єднання.
+    """
+    db_file = main_db_file(conn)
+    years = _years_in_range(list_archives(db_file), start_ts, end_ts)
+    limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    if len(years) > limit:
+        raise sqlite3.OperationalError(
+            f"Діапазон дат охоплює {len(years)} архівів, а приєднати можна не більше {limit}; "
+            f"звузьте діапазон дат"
+        )
+
+    attached = {
+        row[1] for row in conn.execute("PRAGMA database_list").fetchall()
+        if _ARCHIVE_SCHEMA_RE.match(row[1])
+    }
+    wanted = {f"archive_{year}" for year in years}
+    for schema in sorted(attached - wanted):
+        conn.execute(f"DETACH DATABASE {schema}")
+    for year in years:
+        if f"archive_{year}" not in attached:
+            conn.execute(f"ATTACH DATABASE ? AS archive_{year}", (archive_path(db_file, year),))
+
+    view_exists = conn.execute(
+        "SELECT 1 FROM sqlite_temp_master WHERE type = 'view' AND name = ?", (ARCHIVE_VIEW,)
+    ).fetchone()
+    if attached != wanted or not view_exists:
+        columns = ", ".join(name for name, _ in _transaction_columns(conn))
+        ts_column = next(
+            column for table, column, _ in DATE_EPOCH_COLUMNS if table == ARCHIVE_TABLE
+        )
+        selects = [f"SELECT {columns}, {ts_column} FROM main.{ARCHIVE_TABLE}"]
+        selects += [
+            f"SELECT {columns}, {ts_column} FROM archive_{year}.{ARCHIVE_TABLE}" for year in years
+        ]
+        # PRAGMA query_only з'єднань звітів забороняє й тимчасову схему;
+        # файли таких з'єднань відкриті в режимі mode=ro, тож на час
+        # створення представлення обмеження можна зняти
+        query_only = conn.execute("PRAGMA query_only").fetchone()[0]
+        if query_only:
+            conn.execute("PRAGMA query_only = OFF")
+        try:
+            conn.execute(f"DROP VIEW IF EXISTS temp.{ARCHIVE_VIEW}")
+            conn.execute(f"CREATE TEMP VIEW {ARCHIVE_VIEW} AS {' UNION ALL '.join(selects)}")
+        finally:
+            if query_only:
+                conn.execute("PRAGMA query_only = ON")
+    return years
+
+@contextmanager
+def history_connection(conn: sqlite3.Connection, start_ts: int = MIN_EPOCH,
+                       end_ts: int = MAX_EPOCH):
+    """
+    З'єднання з приєднаними архівами років діапазону [start_ts, end_ts).
+
+    Якщо на conn відкрито транзакцію, архіви приєднуються до окремого
+    з'єднання лише для читання з тим самим файлом бази, яке закривається
+    після блоку with; інакше — до самого conn.
+    """
+    if not conn.in_transaction:
+        attach_archives(conn, start_ts, end_ts)
+        yield conn
+        return
+    history_conn = create_connection(
+        main_db_file(conn), check_same_thread=False, read_only=True
+    )
+    if history_conn is None:
+        raise sqlite3.OperationalError("Не вдалося відкрити з'єднання для читання архівів")
+    try:
+        attach_archives(history_conn, start_ts, end_ts)
+        yield history_conn
+    finally:
+        history_conn.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Архівація транзакцій завершених років")
+    parser.add_argument("--db", default=DB_PATH, help="Файл бази даних")
+    parser.add_argument("--keep-years", type=int, default=1,
+                        help="Скільки останніх років лишати в основній базі (поточний — 1)")
+    parser.add_argument("--year", type=int, default=None, help="Архівувати лише цей рік")
+    args = parser.parse_args()
+
+    if args.year is not None:
+        results = {args.year: archive_year(args.year, args.db)}
+    else:
+        results = archive_closed_years(args.db, args.keep_years)
+    for year, count in sorted(results.items()):
+        print(f"{year}: перенесено {count} транзакцій до {archive_path(args.db, year)}")
+    if not results:
+        print("Немає транзакцій для архівації.")
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Асинхронний фасад над функціями логіки.
+
+AsyncRepository дзеркалить синхронні функції (get_requisitions,
+get_requisition_details, TransactionHandler.*, reporting.*) у вигляді
+корутин. Виклики виконуються в обмеженому пулі потоків; кожен потік має
+власне з'єднання з базою, тому кілька запитів можуть виконуватися
+одночасно, наприклад:
+
+    async with AsyncRepository() as repo:
+        categories, requisitions = await asyncio.gather(
+            repo.get_categories(),
+            repo.get_requisitions(status='нова'),
+        )
+
+Звіти (reporting.*) виконуються не в пулі фасаду, а у фоновому потоці
+звітів (reporting.submit_report) на з'єднанні лише для читання з пулу
+звітів, тож довгий звіт не займає потік, потрібний для інших запитів.
+
+Кожен метод приймає timeout (секунди). При скасуванні чи тайм-ауті
+незапущене завдання знімається з черги, а запит, що вже виконується,
+переривається через sqlite3.Connection.interrupt().
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from . import reporting
+from .db_manager import create_connection, fetch_categories, fetch_resources, get_pool, get_report_pool
+from .requisition_handler import get_requisition_details, get_requisitions
+from .transaction_handler import DEFAULT_PAGE_SIZE, TransactionHandler
+
+# Максимальна кількість одночасних запитів (і з'єднань) фасаду
+ASYNC_MAX_WORKERS = int(os.environ.get("MILITARY_DB_ASYNC_WORKERS", "4"))
+
+class _RunningJob:
+    """З'єднання, на якому зараз виконується завдання (для переривання)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self.cancelled = False
+
+    def attach(self, conn: sqlite3.Connection) -> bool:
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._conn = conn
+            return True
+
+    def detach(self):
+        with self._lock:
+            self._conn = None
+
+    def interrupt(self):
+        with self._lock:
+            self.cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+class AsyncRepository:
+    """Асинхронний доступ до даних через обмежений пул потоків."""
+
+    def __init__(self, db_file=None, max_workers=ASYNC_MAX_WORKERS, profile=None):
+        self.db_file = db_file or get_pool().db_file
+        self.profile = profile
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="db-async"
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Повертає з'єднання поточного потоку пулу, створюючи його за потреби."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = create_connection(self.db_file, check_same_thread=False, profile=self.profile)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _invoke(self, job: _RunningJob, func: Callable, args, kwargs):
+        conn = self._connection()
+        if not job.attach(conn):
+            raise asyncio.CancelledError()
+        try:
+            return func(conn, *args, **kwargs)
+        finally:
+            job.detach()
+
+    async def run(self, func: Callable[..., Any], *args,
+                  timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Виконує func(conn, *args, **kwargs) у пулі потоків.
+
+        Raises:
+            asyncio.TimeoutError: якщо виконання не вклалося в timeout
+            asyncio.CancelledError: якщо корутину скасовано
+        """
+        job = _RunningJob()
+        future = self._executor.submit(self._invoke, job, func, args, kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if not future.cancel():
+                job.interrupt()
+            raise
+
+    def _invoke_report(self, job: _RunningJob, func: Callable, args, kwargs):
+        with get_report_pool().connection() as conn:
+            if not job.attach(conn):
+                raise asyncio.CancelledError()
+            try:
+                return func(*args, conn=conn, **kwargs)
+            finally:
+                job.detach()
+
+    async def run_report(self, func: Callable[..., Any], *args,
+                         timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Виконує звіт func(*args, conn=..., **kwargs) у фоновому потоці звітів.
+
+        Якщо фасад відкрито для іншого файлу бази, ніж пул звітів, звіт
+        виконується у пулі фасаду (див. run).
+        """
+        if os.path.abspath(self.db_file) != os.path.abspath(get_report_pool().db_file):
+            return await self.run(_with_conn(func), *args, timeout=timeout, **kwargs)
+        job = _RunningJob()
+        future = reporting.submit_report(self._invoke_report, job, func, args, kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if not future.cancel():
+                job.interrupt()
+            raise
+
+    # --- Довідники ---
+
+    async def get_categories(self, timeout: Optional[float] = None) -> list:
+        rows = await self.run(fetch_categories, timeout=timeout)
+        return [dict(row) for row in rows]
+
+    async def get_resources(self, category: str, timeout: Optional[float] = None) -> list:
+        rows = await self.run(fetch_resources, category, timeout=timeout)
+        return [dict(row) for row in rows]
+
+    # --- Заявки ---
+
+    async def get_requisitions(self, timeout: Optional[float] = None, **filters) -> list:
+        return await self.run(_with_conn(get_requisitions), timeout=timeout, **filters)
+
+    async def get_requisition_details(self, requisition_id: int,
+                                      timeout: Optional[float] = None) -> dict:
+        return await self.run(get_requisition_details, requisition_id, timeout=timeout)
+
+    # --- Транзакції ---
+
+    async def get_resource_transactions(self, resource_id: int, start_date: Optional[str] = None,
+                                        end_date: Optional[str] = None,
+                                        full_history: bool = False,
+                                        timeout: Optional[float] = None) -> list:
+        return await self.run(
+            _handler_method("get_resource_transactions"),
+            resource_id, start_date, end_date, full_history, timeout=timeout
+        )
+
+    async def get_department_transactions(self, department: str, start_date: Optional[str] = None,
+                                          end_date: Optional[str] = None,
+                                          full_history: bool = False,
+                                          timeout: Optional[float] = None) -> list:
+        return await self.run(
+            _handler_method("get_department_transactions"),
+            department, start_date, end_date, full_history, timeout=timeout
+        )
+
+    async def get_recent_transactions(self, limit: int = 50, transaction_type: Optional[str] = None,
+                                      timeout: Optional[float] = None) -> list:
+        return await self.run(
+            _handler_method("get_recent_transactions"),
+            limit, transaction_type, timeout=timeout
+        )
+
+    async def get_resource_transactions_page(self, resource_id: int, start_date: Optional[str] = None,
+                                             end_date: Optional[str] = None,
+                                             page_size: int = DEFAULT_PAGE_SIZE,
+                                             page_token: Optional[str] = None,
+                                             timeout: Optional[float] = None) -> tuple:
+        return await self.run(
+            _handler_method("get_resource_transactions_page"),
+            resource_id, start_date, end_date, page_size, page_token, timeout=timeout
+        )
+
+    async def get_department_transactions_page(self, department: str,
+                                               start_date: Optional[str] = None,
+                                               end_date: Optional[str] = None,
+                                               page_size: int = DEFAULT_PAGE_SIZE,
+                                               page_token: Optional[str] = None,
+                                               timeout: Optional[float] = None) -> tuple:
+        return await self.run(
+            _handler_method("get_department_transactions_page"),
+            department, start_date, end_date, page_size, page_token, timeout=timeout
+        )
+
+    async def get_recent_transactions_page(self, transaction_type: Optional[str] = None,
+                                           page_size: int = DEFAULT_PAGE_SIZE,
+                                           page_token: Optional[str] = None,
+                                           timeout: Optional[float] = None) -> tuple:
+        return await self.run(
+            _handler_method("get_recent_transactions_page"),
+            transaction_type, page_size, page_token, timeout=timeout
+        )
+
+    async def get_transaction_summary(self, resource_id: Optional[int] = None,
+                                      start_date: Optional[str] = None,
+                                      end_date: Optional[str] = None,
+                                      full_history: bool = False,
+                                      timeout: Optional[float] = None) -> dict:
+        return await self.run(
+            _handler_method("get_transaction_summary"),
+            resource_id, start_date, end_date, full_history, timeout=timeout
+        )
+
+    # --- Звіти ---
+
+    async def get_current_resource_stock_report(self, category_id: Optional[int] = None,
+                                                timeout: Optional[float] = None) -> list:
+        return await self.run_report(
+            reporting.get_current_resource_stock_report, category_id, timeout=timeout
+        )
+
+    async def get_requisition_summary_report(self, timeout: Optional[float] = None,
+                                             **filters) -> list:
+        return await self.run_report(
+            reporting.get_requisition_summary_report, timeout=timeout, **filters
+        )
+
+    async def get_resource_movement_report(self, timeout: Optional[float] = None,
+                                           **filters) -> dict:
+        return await self.run_report(
+            reporting.get_resource_movement_report, timeout=timeout, **filters
+        )
+
+    def close(self):
+        """Зупиняє пул потоків і закриває його з'єднання."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+def _with_conn(func: Callable) -> Callable:
+    """Адаптує функцію з параметром conn=... до виклику func(conn, ...)."""
+    def call(conn, *args, **kwargs):
+        return func(*args, conn=conn, **kwargs)
+    return call
+
+def _handler_method(name: str) -> Callable:
+    """Виклик методу TransactionHandler на з'єднанні потоку."""
+    def call(conn, *args, **kwargs):
+        return getattr(TransactionHandler(conn), name)(*args, **kwargs)
+    return call
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Пошук у каталозі ресурсів через повнотекстовий індекс resources_fts.
+
+Індекс (міграція 8) охоплює назву, опис, постачальника та походження
+ресурсу і ведеться тригерами. Пошуковий рядок перетворюється на префіксний
+запит FTS5 (query_registry.fts_match): кожне слово — як початок слова в
+будь-якому з полів, усі слова обов'язкові. Результати впорядковані за
+bm25 з вагами полів (збіг у назві важить найбільше).
+
+search_resource_ids() повертає ранжовані ID ресурсів (за потреби в межах
+категорії), search_category_facets() — кількість знайдених ресурсів у
+кожній категорії для того самого запиту.
+"""
+
+import sqlite3
+from typing import List, Optional
+
+from .db_manager import pooled_connection
+from .query_registry import execute_query, fts_match, register_query
+
+# Коротший запит збігається майже з усім каталогом і лише гальмує введення
+MIN_SEARCH_CHARS = 2
+
+# Скільки найрелевантніших ресурсів показують вікна програми
+RESULT_LIMIT = 500
+
+# Ваги bm25 колонок resources_fts (див. migrations.RESOURCE_SEARCH_COLUMNS):
+# назва, опис, постачальник, походження
+RESOURCE_SEARCH_WEIGHTS = (10.0, 1.0, 3.0, 2.0)
+
+_BM25 = f"bm25(resources_fts, {', '.join(map(str, RESOURCE_SEARCH_WEIGHTS))})"
+
+# Без категорії ресурси не читаються зовсім: і збіги, і ранг дає сам індекс
+QUERY_CATALOG_SEARCH = register_query("catalog.search", f"""
+    SELECT rowid AS id
+    FROM resources_fts
+    WHERE resources_fts MATCH :match
+    ORDER BY {_BM25}, rowid
+    LIMIT :limit
+""")
+
+QUERY_CATALOG_SEARCH_IN_CATEGORY = register_query("catalog.search_in_category", f"""
+    SELECT r.id
+    FROM resources_fts
+    JOIN resources r ON r.id = resources_fts.rowid
+    WHERE resources_fts MATCH :match
+      AND r.category_id = :category_id
+    ORDER BY {_BM25}, r.id
+    LIMIT :limit
+""")
+
+QUERY_CATALOG_FACETS = register_query("catalog.facets", """
+    SELECT c.id AS category_id, c.name AS category_name, COUNT(*) AS count
+    FROM resources_fts
+    JOIN resources r ON r.id = resources_fts.rowid
+    JOIN categories c ON c.id = r.category_id
+    WHERE resources_fts MATCH :match
+    GROUP BY c.id
+    ORDER BY count DESC, c.name
+""")
+
+def catalog_match(search_term: Optional[str]) -> Optional[str]:
+    """Вираз MATCH для каталогу або None, якщо рядок закороткий для пошуку."""
+    if len((search_term or "").strip()) < MIN_SEARCH_CHARS:
+        return None
+    return fts_match(search_term)
+
+def search_resource_ids(search_term: Optional[str], category_id: Optional[int] = None,
+                        limit: int = -1, conn: Optional[sqlite3.Connection] = None) -> List[int]:
+    """
+    ID ресурсів, що відповідають пошуковому рядку, від найрелевантніших.
+
+    Args:
+        search_term: Пошуковий рядок користувача.
+        category_id: Обмежити пошук категорією (None — усі категорії).
+        limit: Максимальна кількість ID (-1 — без обмеження).
+        conn: З'єднання (за замовчуванням — з пулу).
+
+    Returns:
+        Список ID; порожній, якщо рядок закороткий або не містить слів
+        (див. catalog_match).
+    """
+    match = catalog_match(search_term)
+    if not match:
+        return []
+    with pooled_connection(conn) as conn:
+        if category_id is None:
+            cursor = execute_query(conn, QUERY_CATALOG_SEARCH, match=match, limit=limit)
+        else:
+            cursor = execute_query(
+                conn, QUERY_CATALOG_SEARCH_IN_CATEGORY,
+                match=match, category_id=category_id, limit=limit
+            )
+        return [row[0] for row in cursor.fetchall()]
+
+def search_category_facets(search_term: Optional[str],
+                           conn: Optional[sqlite3.Connection] = None) -> List[dict]:
+    """
+    Кількість знайдених ресурсів по категоріях, від найбільшої.
+
+    Returns:
+        Словники з ключами category_id, category_name, count.
+    """
+    match = catalog_match(search_term)
+    if not match:
+        return []
+    with pooled_connection(conn) as conn:
+        return [dict(row) for row in execute_query(conn, QUERY_CATALOG_FACETS, match=match)]
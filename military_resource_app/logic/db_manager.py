@@ -4,10 +4,19 @@
 Функції для роботи з базою даних.
 """
 
+import json
 import os
+import pathlib
 import sqlite3
+import threading
+from contextlib import ExitStack, contextmanager, nullcontext
 from datetime import datetime
 
+from .migrations import run_migrations
+from .query_registry import (
+    MAX_EPOCH, MIN_EPOCH, STATEMENT_CACHE_SIZE, execute_query, optional_filter, register_query
+)
+
 # Змінюємо шлях до бази даних на абсолютний
 DB_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources.db"))
 
@@ -23,8 +32,86 @@ CATEGORIES = [
     "Ремонтні засоби та запчастини"
 ]
 
-def create_connection(db_file=DB_PATH):
-    """Створює з'єднання з базою даних."""
+# Розмір пулу з'єднань (кількість простоюючих з'єднань на один потік)
+POOL_SIZE = int(os.environ.get("MILITARY_DB_POOL_SIZE", "4"))
+
+# Змінна середовища для вибору профілю PRAGMA
+DB_PROFILE_ENV = "MILITARY_DB_PROFILE"
+DEFAULT_PROFILE = "terminal"
+
+# Профілі налаштувань продуктивності SQLite.
+# busy_timeout йде першим, щоб зміна journal_mode чекала на інші процеси.
+PRAGMA_PROFILES = {
+    # Робоче місце комірника: короткі транзакції, паралельне читання
+    "terminal": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,        # ~16 МБ
+        "mmap_size": 67108864,       # 64 МБ
+        "temp_store": "MEMORY",
+    },
+    # Масове завантаження даних (імпорт накладних, тестові дані)
+    "bulk-import": {
+        "busy_timeout": 30000,
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -65536,        # ~64 МБ
+        "mmap_size": 268435456,      # 256 МБ
+        "temp_store": "MEMORY",
+    },
+    # Довгі звіти, що лише читають дані
+    "read-only-report": {
+        "busy_timeout": 10000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32768,        # ~32 МБ
+        "mmap_size": 268435456,      # 256 МБ
+        "temp_store": "MEMORY",
+    },
+}
+
+def get_profile_name(profile=None) -> str:
+    """Визначає профіль PRAGMA: явно вказаний, зі змінної середовища або типовий."""
+    name = profile or os.environ.get(DB_PROFILE_ENV) or DEFAULT_PROFILE
+    if name not in PRAGMA_PROFILES:
+        raise ValueError(
+            f"Невідомий профіль PRAGMA '{name}'. Допустимі: {', '.join(PRAGMA_PROFILES)}"
+        )
+    return name
+
+def apply_pragma_profile(conn, profile=None, read_only=False) -> str:
+    """
+    Застосовує профіль PRAGMA до з'єднання.
+
+    Для з'єднання лише для читання journal_mode пропускається: змінити
+    режим журналу може тільки з'єднання з правом запису.
+
+    Returns:
+        str: назва застосованого профілю
+    """
+    name = get_profile_name(profile)
+    for pragma, value in PRAGMA_PROFILES[name].items():
+        if read_only and pragma == "journal_mode":
+            continue
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return name
+
+class Connection(sqlite3.Connection):
+    """
+    З'єднання, на яке можна створювати слабкі посилання та яке пам'ятає
+    свій cached_statements (потрібно реєстру запитів).
+    """
+    pass
+
+def create_connection(db_file=DB_PATH, check_same_thread=True, profile=None,
+                      cached_statements=STATEMENT_CACHE_SIZE, read_only=False):
+    """
+    Створює з'єднання з базою даних.
+
+    read_only=True відкриває файл у режимі file:...?mode=ro з
+    PRAGMA query_only; таке з'єднання ніколи не бере блокування запису.
+    """
     conn = None
     try:
         print(f"Спроба підключення до бази даних: {db_file}")
@@ -35,14 +122,31 @@ def create_connection(db_file=DB_PATH):
             
         # Переконуємося, що директорія для бази даних існує
         db_dir = os.path.dirname(db_file)
-        if db_dir and not os.path.exists(db_dir):
+        if not read_only and db_dir and not os.path.exists(db_dir):
             print(f"Створення директорії для бази даних: {db_dir}")
             os.makedirs(db_dir)
-            
-        conn = sqlite3.connect(db_file)
+
+        if read_only:
+            database, uri = pathlib.Path(db_file).as_uri() + "?mode=ro", True
+        else:
+            database, uri = db_file, False
+
+        conn = sqlite3.connect(
+            database,
+            check_same_thread=check_same_thread,
+            cached_statements=cached_statements,
+            factory=Connection,
+            uri=uri
+        )
+        # Розмір кешу підготовлених запитів для моделі кешу реєстру запитів
+        conn.cached_statements = cached_statements
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON;")
-        print("З'єднання успішно встановлено")
+        profile_name = apply_pragma_profile(conn, profile, read_only)
+        if read_only:
+            conn.execute("PRAGMA query_only = ON;")
+        print(f"З'єднання успішно встановлено (профіль: {profile_name}"
+              f"{', лише читання' if read_only else ''})")
         return conn
     except sqlite3.Error as e:
         print(f"Помилка підключення до БД: {e}")
@@ -51,95 +155,186 @@ def create_connection(db_file=DB_PATH):
         print(f"Неочікувана помилка: {e}")
         raise
 
+class ConnectionPool:
+    """
+    Пул повторно використовуваних з'єднань з базою даних.
+
+    Кожне з'єднання закріплене за потоком, який його створив: потік отримує
+    з пулу лише власні з'єднання, тому одне з'єднання ніколи не
+    використовується двома потоками одночасно.
+    """
+
+    def __init__(self, db_file=DB_PATH, size=POOL_SIZE, profile=None, read_only=False):
+        self.db_file = db_file
+        self.size = size
+        self.profile = profile
+        self.read_only = read_only
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all_connections = []
+        self._hits = 0
+        self._misses = 0
+
+    def _idle(self):
+        """Повертає список вільних з'єднань поточного потоку."""
+        idle = getattr(self._local, "idle", None)
+        if idle is None:
+            idle = self._local.idle = []
+        return idle
+
+    def acquire(self) -> sqlite3.Connection:
+        """Видає з'єднання з пулу або створює нове, якщо вільних немає."""
+        idle = self._idle()
+        if idle:
+            with self._lock:
+                self._hits += 1
+            return idle.pop()
+
+        conn = create_connection(
+            self.db_file, check_same_thread=False, profile=self.profile, read_only=self.read_only
+        )
+        with self._lock:
+            self._misses += 1
+            self._all_connections.append(conn)
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Повертає з'єднання в пул, відкочуючи незавершену транзакцію."""
+        if conn.in_transaction:
+            conn.rollback()
+        idle = self._idle()
+        if len(idle) < self.size:
+            idle.append(conn)
+            return
+        with self._lock:
+            if conn in self._all_connections:
+                self._all_connections.remove(conn)
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Контекстний менеджер для отримання з'єднання з пулу."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> dict:
+        """Повертає статистику використання пулу."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": len(self._all_connections),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def close_all(self):
+        """Закриває всі з'єднання пулу."""
+        with self._lock:
+            connections, self._all_connections = self._all_connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+_pool = None
+_report_pool = None
+_pool_lock = threading.Lock()
+
+# Профіль з'єднань для звітів
+REPORT_PROFILE = "read-only-report"
+
+def get_pool() -> ConnectionPool:
+    """Повертає спільний для процесу пул з'єднань."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+def get_report_pool() -> ConnectionPool:
+    """Повертає спільний пул з'єднань лише для читання (для звітів)."""
+    global _report_pool
+    if _report_pool is None:
+        db_file = get_pool().db_file
+        with _pool_lock:
+            if _report_pool is None:
+                _report_pool = ConnectionPool(
+                    db_file, POOL_SIZE, REPORT_PROFILE, read_only=True
+                )
+    return _report_pool
+
+def configure_pool(db_file=DB_PATH, size=POOL_SIZE, profile=None) -> ConnectionPool:
+    """Перестворює спільний пул з новими параметрами."""
+    global _pool, _report_pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        if _report_pool is not None:
+            _report_pool.close_all()
+            _report_pool = None
+        _pool = ConnectionPool(db_file, size, profile)
+    return _pool
+
+def main_db_file(conn) -> str:
+    """Файл основної бази з'єднання (порожній рядок для бази в пам'яті)."""
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1] == "main":
+            return row[2]
+    raise sqlite3.OperationalError("Не вдалося визначити файл основної бази")
+
+def pooled_connection(conn=None):
+    """
+    Скорочення для get_pool().connection().
+
+    Якщо передано з'єднання, повертає його без звернення до пулу
+    (так функції можуть працювати на з'єднанні викликача).
+    """
+    if conn is not None:
+        return nullcontext(conn)
+    return get_pool().connection()
+
+@contextmanager
+def snapshot_connection(conn=None, with_archives=False, start_ts=MIN_EPOCH, end_ts=MAX_EPOCH):
+    """
+    З'єднання з одним зафіксованим знімком бази на весь блок with.
+
+    Без аргументу бере з'єднання лише для читання з пулу звітів. Відкрита
+    транзакція читання фіксує знімок WAL, тому всі запити звіту бачать
+    однаковий стан бази, а записи інших з'єднань не чекають на звіт.
+    with_archives=True до початку транзакції приєднує архіви років
+    діапазону [start_ts, end_ts) (представлення all_resource_transactions,
+    див. archive.history_connection).
+    """
+    with ExitStack() as stack:
+        conn = stack.enter_context(
+            pooled_connection(conn) if conn is not None else get_report_pool().connection()
+        )
+        if with_archives:
+            from .archive import history_connection
+            conn = stack.enter_context(history_connection(conn, start_ts, end_ts))
+        own_transaction = not conn.in_transaction
+        if own_transaction:
+            conn.execute("BEGIN")
+            # Знімок фіксується першим читанням, а не самим BEGIN
+            conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        try:
+            yield conn
+        finally:
+            if own_transaction and conn.in_transaction:
+                conn.rollback()
+
 def create_tables(conn):
-    """Створює необхідні таблиці в базі даних."""
+    """Створює необхідні таблиці (через версіоновані міграції) та початкові дані."""
     if conn is None:
         print("Немає з'єднання з БД")
         return
 
     try:
+        run_migrations(conn)
         cur = conn.cursor()
-        cur.executescript("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                role TEXT NOT NULL CHECK(role IN ('admin', 'user')),
-                rank TEXT,
-                last_name TEXT,
-                first_name TEXT,
-                middle_name TEXT,
-                position TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                parent_id INTEGER,
-                FOREIGN KEY (parent_id) REFERENCES categories (id)
-            );
-
-            CREATE TABLE IF NOT EXISTS resources (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                category_id INTEGER NOT NULL,
-                quantity INTEGER NOT NULL DEFAULT 0,
-                unit_of_measure TEXT,
-                description TEXT,
-                image_path TEXT,
-                supplier TEXT,
-                phone TEXT,
-                origin TEXT,
-                arrival_date TEXT,
-                cost REAL,
-                expiration_date TEXT,
-                low_stock_threshold INTEGER DEFAULT 10,
-                FOREIGN KEY (category_id) REFERENCES categories (id)
-            );
-
-            CREATE TABLE IF NOT EXISTS resource_transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                resource_id INTEGER NOT NULL,
-                transaction_type TEXT NOT NULL CHECK(transaction_type IN ('надходження', 'видача', 'списання', 'повернення')),
-                quantity_changed INTEGER NOT NULL,
-                transaction_date TEXT NOT NULL,
-                recipient_department TEXT,
-                issued_by_user_id INTEGER,
-                notes TEXT,
-                FOREIGN KEY (resource_id) REFERENCES resources (id),
-                FOREIGN KEY (issued_by_user_id) REFERENCES users (id)
-            );
-
-            CREATE TABLE IF NOT EXISTS requisitions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                requisition_number TEXT UNIQUE NOT NULL,
-                created_by_user_id INTEGER NOT NULL,
-                department_requesting TEXT,
-                creation_date TEXT NOT NULL,
-                status TEXT NOT NULL DEFAULT 'нова' CHECK(status IN ('нова', 'на розгляді', 'схвалено', 'відхилено', 'частково виконано', 'виконано')),
-                urgency TEXT DEFAULT 'планова' CHECK(urgency IN ('планова', 'термінова', 'критична')),
-                purpose_description TEXT,
-                requisition_type TEXT,
-                author_manual_rank TEXT,
-                author_manual_lastname TEXT,
-                author_manual_initials TEXT,
-                FOREIGN KEY (created_by_user_id) REFERENCES users (id)
-            );
-
-            CREATE TABLE IF NOT EXISTS requisition_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                requisition_id INTEGER NOT NULL,
-                resource_id INTEGER,
-                requested_resource_name TEXT NOT NULL,
-                quantity_requested INTEGER NOT NULL,
-                unit_of_measure TEXT,
-                justification TEXT,
-                item_status TEXT DEFAULT 'очікує' CHECK(item_status IN ('очікує', 'схвалено', 'замовлено', 'отримано', 'відхилено')),
-                FOREIGN KEY (requisition_id) REFERENCES requisitions (id),
-                FOREIGN KEY (resource_id) REFERENCES resources (id)
-            );
-        """)
-        conn.commit()
         print("Таблиці успішно створено/перевірено.")
 
         # Початкове заповнення категорій
@@ -189,6 +384,10 @@ def validate_user(conn, username, password):
     
     return None, None
 
+def fetch_categories(conn):
+    """Отримує список категорій, упорядкований за назвою."""
+    return conn.execute("SELECT id, name FROM categories ORDER BY name").fetchall()
+
 def fetch_resources(conn, category):
     """Отримує список ресурсів для вказаної категорії."""
     return conn.execute(
@@ -200,19 +399,72 @@ def fetch_resources(conn, category):
         WHERE c.name=?""", (category,)
     ).fetchall()
 
+_RESOURCE_LIST_COLUMNS = """r.id, r.name, c.name as category_name, r.quantity,
+           r.unit_of_measure, r.low_stock_threshold, r.supplier,
+           r.description"""
+
+# stock_status = NULL — без фільтра наявності
+_STOCK_STATUS_FILTER = """(:stock_status IS NULL
+           OR (:stock_status = 'В наявності' AND r.quantity > r.low_stock_threshold)
+           OR (:stock_status = 'Закінчується' AND r.quantity <= r.low_stock_threshold AND r.quantity > 0)
+           OR (:stock_status = 'Відсутні' AND r.quantity = 0))"""
+
+# Список ресурсів головного вікна
+QUERY_RESOURCE_LIST = register_query("resources.list", f"""
+    SELECT {_RESOURCE_LIST_COLUMNS}
+    FROM resources r
+    JOIN categories c ON r.category_id = c.id
+    WHERE {optional_filter("r.category_id", "category_id")}
+      AND {_STOCK_STATUS_FILTER}
+    ORDER BY c.name, r.name
+""")
+
+# Ресурси, знайдені пошуком (logic/catalog_search.py), у порядку списку :resource_ids
+QUERY_RESOURCE_LIST_BY_IDS = register_query("resources.list_by_ids", f"""
+    SELECT {_RESOURCE_LIST_COLUMNS}
+    FROM json_each(:resource_ids) j
+    JOIN resources r ON r.id = j.value
+    JOIN categories c ON r.category_id = c.id
+    WHERE {_STOCK_STATUS_FILTER}
+    ORDER BY j.key
+""")
+
+def fetch_resource_list(conn, category_id=None, stock_status="Всі", resource_ids=None):
+    """
+    Отримує ресурси для головного вікна з фільтрами за категорією та наявністю.
+
+    Якщо передано resource_ids (результат пошуку), повертаються лише ці
+    ресурси в тому самому порядку; category_id тоді не застосовується.
+    """
+    stock_status = None if stock_status == "Всі" else stock_status
+    if resource_ids is not None:
+        return execute_query(
+            conn, QUERY_RESOURCE_LIST_BY_IDS,
+            resource_ids=json.dumps(list(resource_ids)), stock_status=stock_status
+        ).fetchall()
+    return execute_query(
+        conn, QUERY_RESOURCE_LIST,
+        category_id=category_id,
+        stock_status=stock_status
+    ).fetchall()
+
 def add_resource(conn, name, quantity, description, image_path, category):
-    """Додає новий ресурс."""
-    cat_id = conn.execute(
-        "SELECT id FROM categories WHERE name=?", (category,)
-    ).fetchone()["id"]
-    
-    cur = conn.execute(
-        """INSERT INTO resources(name,quantity,description,image_path,category_id) 
-        VALUES(?,?,?,?,?)""",
-        (name, quantity, description, image_path, cat_id)
-    )
-    conn.commit()
-    return cur.lastrowid
+    """Додає новий ресурс (через потік запису, якщо він запущений)."""
+    from .db_writer import run_write  # db_writer імпортує цей модуль
+
+    def _insert(write_conn):
+        cat_id = write_conn.execute(
+            "SELECT id FROM categories WHERE name=?", (category,)
+        ).fetchone()["id"]
+
+        cur = write_conn.execute(
+            """INSERT INTO resources(name,quantity,description,image_path,category_id) 
+            VALUES(?,?,?,?,?)""",
+            (name, quantity, description, image_path, cat_id)
+        )
+        return cur.lastrowid
+
+    return run_write(_insert, conn)
 
 def update_resource(conn, rid, name, quantity, description, image_path):
     """Оновлює існуючий ресурс."""
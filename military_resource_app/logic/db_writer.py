@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Єдиний потік запису до бази даних з груповим комітом.
+
+WriterService володіє єдиним з'єднанням для запису. Завдання запису
+(функції, що отримують з'єднання) потрапляють у чергу; завдання, що
+надійшли протягом короткого вікна, виконуються в одній транзакції та
+фіксуються одним COMMIT. Кожне завдання працює у власному SAVEPOINT,
+тому помилка одного завдання не скасовує інші завдання пакета.
+Результат або виняток повертається викликачеві через Future.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from .db_manager import DB_PATH, create_connection, main_db_file
+
+# Скільки чекати на наступні завдання після першого (секунди)
+WRITER_BATCH_WINDOW = 0.005
+# Максимальна кількість завдань в одній транзакції
+WRITER_MAX_BATCH = 64
+
+WriteJob = Callable[[sqlite3.Connection], Any]
+
+_STOP = object()
+
+# Лічильник комітів цього процесу; разом з PRAGMA data_version визначає,
+# чи змінилися дані з моменту кешування результату (див. result_cache)
+_write_generation = 0
+_generation_lock = threading.Lock()
+
+def bump_write_generation() -> int:
+    """Збільшує лічильник записів процесу (після кожного коміту)."""
+    global _write_generation
+    with _generation_lock:
+        _write_generation += 1
+        return _write_generation
+
+def get_write_generation() -> int:
+    """Поточне значення лічильника записів процесу."""
+    return _write_generation
+
+class WriterService:
+    """Сервіс, що виконує всі записи в окремому потоці."""
+
+    def __init__(self, db_file=DB_PATH, batch_window=WRITER_BATCH_WINDOW,
+                 max_batch=WRITER_MAX_BATCH, profile=None):
+        self.db_file = db_file
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.profile = profile
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._jobs = 0
+
+    @property
+    def thread(self) -> Optional[threading.Thread]:
+        return self._thread
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Запускає потік запису."""
+        with self._lock:
+            if self.is_running():
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(ready,), name="db-writer", daemon=True
+            )
+            self._thread.start()
+        ready.wait()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Зупиняє потік після виконання вже поставлених завдань."""
+        if not self.is_running():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def submit(self, job: WriteJob) -> Future:
+        """Ставить завдання запису в чергу та повертає Future з його результатом."""
+        if not self.is_running():
+            raise RuntimeError("Потік запису не запущено")
+        future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def execute(self, job: WriteJob, timeout: Optional[float] = None) -> Any:
+        """Виконує завдання запису та чекає на коміт."""
+        return self.submit(job).result(timeout)
+
+    def stats(self) -> dict:
+        """Повертає кількість виконаних пакетів та завдань."""
+        with self._lock:
+            return {"batches": self._batches, "jobs": self._jobs}
+
+    def _collect_batch(self, first) -> tuple:
+        """Збирає завдання, що надійшли протягом вікна групового коміту."""
+        batch = [first]
+        stop = False
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self, ready: threading.Event):
+        conn = create_connection(self.db_file, profile=self.profile)
+        # Транзакціями керуємо вручну
+        conn.isolation_level = None
+        ready.set()
+        try:
+            while True:
+                first = self._queue.get()
+                if first is _STOP:
+                    break
+                batch, stop = self._collect_batch(first)
+                self._execute_batch(conn, batch)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _execute_batch(self, conn: sqlite3.Connection, batch: list):
+        """Виконує пакет завдань в одній транзакції."""
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT write_job")
+                try:
+                    result = job(conn)
+                except BaseException as e:
+                    conn.execute("ROLLBACK TO write_job")
+                    conn.execute("RELEASE write_job")
+                    future.set_exception(e)
+                else:
+                    conn.execute("RELEASE write_job")
+                    outcomes.append((future, result))
+            conn.execute("COMMIT")
+            bump_write_generation()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for job, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, result in outcomes:
+            future.set_result(result)
+        with self._lock:
+            self._batches += 1
+            self._jobs += len(batch)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def start_writer(db_file=DB_PATH, **kwargs) -> WriterService:
+    """Запускає спільний для процесу потік запису."""
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_running():
+            _writer = WriterService(db_file, **kwargs)
+            _writer.start()
+    return _writer
+
+def stop_writer():
+    """Зупиняє спільний потік запису."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.stop()
+            _writer = None
+
+def get_writer() -> Optional[WriterService]:
+    """Повертає запущений потік запису або None."""
+    return _writer if _writer is not None and _writer.is_running() else None
+
+def _same_database(conn: sqlite3.Connection, db_file: str) -> bool:
+    """Чи працює з'єднання з тим самим файлом бази, що й потік запису."""
+    conn_file = main_db_file(conn)
+    return bool(conn_file) and os.path.realpath(conn_file) == os.path.realpath(db_file)
+
+def run_write(job: WriteJob, conn: Optional[sqlite3.Connection] = None) -> Any:
+    """
+    Виконує завдання запису.
+
+    Якщо на переданому з'єднанні вже відкрито транзакцію (виклик з іншого
+    завдання запису, зокрема в потоці запису, або з транзакції викликача),
+    завдання виконується в ній, а коміт чи відкат лишається її власнику.
+
+    Інакше, якщо потік запису запущено і з'єднання не передано або воно до
+    тієї самої бази, завдання передається потоку запису і виклик чекає на
+    груповий коміт. В решті випадків (скрипти, консольні утиліти, інший файл
+    бази) завдання виконується на переданому з'єднанні з власним комітом;
+    транзакція відкривається як BEGIN IMMEDIATE, щоб блокування запису
+    бралося до першого читання.
+    """
+    if conn is not None and conn.in_transaction:
+        return job(conn)
+
+    writer = get_writer()
+    if (writer is not None and threading.current_thread() is not writer.thread
+            and (conn is None or _same_database(conn, writer.db_file))):
+        return writer.execute(job)
+
+    if conn is None:
+        raise RuntimeError("Потік запису не запущено і з'єднання не передано")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = job(conn)
+        conn.commit()
+        bump_write_generation()
+        return result
+    except BaseException:
+        conn.rollback()
+        raise
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Резервне копіювання та обслуговування бази даних без зупинки роботи.
+
+backup_database() копіює базу через sqlite3.Connection.backup порціями
+по BACKUP_PAGES сторінок з паузою між порціями. Джерело — з'єднання лише
+для читання з відкритою транзакцією читання: у режимі WAL воно не
+заважає записам терміналів, а копія відповідає одному знімку бази (інакше
+кожен запис іншого з'єднання перезапускав би копіювання з початку).
+Копія спершу пишеться у файл .part, перевіряється PRAGMA quick_check і
+лише потім перейменовується; зберігаються BACKUP_KEEP останніх копій.
+
+optimize_database() виконує PRAGMA optimize, пасивну контрольну точку WAL
+та (для баз з auto_vacuum = INCREMENTAL) звільнення вільних сторінок
+короткими кроками PRAGMA incremental_vacuum.
+
+MaintenanceService запускає обидві процедури у фоновому потоці раз на
+MAINTENANCE_INTERVAL секунд і повідомляє про хід роботи через progress().
+
+Запуск вручну:
+    python -m logic.maintenance [--backup] [--optimize] [--enable-incremental-vacuum]
+"""
+
+import argparse
+import glob
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from .db_manager import DB_PATH, create_connection
+
+# Каталог резервних копій (типово — backups поруч з базою)
+BACKUP_DIR_ENV = "MILITARY_DB_BACKUP_DIR"
+# Скільки останніх копій зберігати
+BACKUP_KEEP = int(os.environ.get("MILITARY_DB_BACKUP_KEEP", "7"))
+# Сторінок за один крок копіювання та пауза між кроками (секунди)
+BACKUP_PAGES = int(os.environ.get("MILITARY_DB_BACKUP_PAGES", "256"))
+BACKUP_SLEEP = float(os.environ.get("MILITARY_DB_BACKUP_SLEEP", "0.05"))
+# Сторінок за один крок incremental_vacuum
+VACUUM_PAGES = int(os.environ.get("MILITARY_DB_VACUUM_PAGES", "200"))
+# Період фонового обслуговування (секунди)
+MAINTENANCE_INTERVAL = int(os.environ.get("MILITARY_DB_MAINTENANCE_INTERVAL", str(24 * 60 * 60)))
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+ProgressCallback = Callable[[str, int, int], None]
+
+class MaintenanceCancelled(Exception):
+    """Обслуговування перервано запитом на зупинку."""
+
+def backup_dir_for(db_file: str) -> str:
+    """Каталог резервних копій для файлу бази."""
+    return os.environ.get(BACKUP_DIR_ENV) or os.path.join(
+        os.path.dirname(os.path.abspath(db_file)), "backups"
+    )
+
+def list_backups(db_file: str = DB_PATH, backup_dir: Optional[str] = None) -> List[str]:
+    """Готові резервні копії бази, від найстаріших до найновіших."""
+    base = os.path.splitext(os.path.basename(db_file))[0]
+    pattern = os.path.join(backup_dir or backup_dir_for(db_file), f"{base}_*.db")
+    return sorted(glob.glob(pattern))
+
+def rotate_backups(db_file: str = DB_PATH, backup_dir: Optional[str] = None,
+                   keep: int = BACKUP_KEEP) -> List[str]:
+    """Видаляє найстаріші копії понад keep; повертає видалені файли."""
+    backups = list_backups(db_file, backup_dir)
+    removed = backups[:-keep] if keep > 0 else []
+    for path in removed:
+        os.remove(path)
+    return removed
+
+def backup_database(db_file: str = DB_PATH, backup_dir: Optional[str] = None,
+                    pages: int = BACKUP_PAGES, sleep: float = BACKUP_SLEEP,
+                    keep: int = BACKUP_KEEP,
+                    progress: Optional[ProgressCallback] = None,
+                    cancel: Optional[threading.Event] = None) -> str:
+    """
+    Створює резервну копію бази покроково.
+
+    Args:
+        pages: сторінок за один крок копіювання
+        sleep: пауза між кроками, щоб не навантажувати диск терміналів
+        keep: скільки останніх копій зберігати
+        progress: progress("backup", скопійовано сторінок, усього сторінок)
+        cancel: подія, встановлення якої перериває копіювання
+
+    Returns:
+        str: шлях до створеної копії
+    """
+    backup_dir = backup_dir or backup_dir_for(db_file)
+    os.makedirs(backup_dir, exist_ok=True)
+    base = os.path.splitext(os.path.basename(db_file))[0]
+    target = os.path.join(backup_dir, f"{base}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
+    partial = target + ".part"
+
+    def on_step(status, remaining, total):
+        if progress:
+            progress("backup", total - remaining, total)
+        if cancel is not None and cancel.is_set():
+            raise MaintenanceCancelled("Резервне копіювання перервано")
+        if remaining and sleep > 0:
+            time.sleep(sleep)
+
+    source = create_connection(db_file, profile="read-only-report", read_only=True)
+    destination = sqlite3.connect(partial)
+    try:
+        # Транзакція читання фіксує знімок на весь час копіювання
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        source.backup(destination, pages=pages, progress=on_step)
+        source.rollback()
+        # Копія — один самодостатній файл без -wal/-shm
+        destination.execute("PRAGMA journal_mode = DELETE")
+        check = destination.execute("PRAGMA quick_check").fetchone()[0]
+        if check != "ok":
+            raise sqlite3.DatabaseError(f"Перевірка резервної копії не пройдена: {check}")
+        destination.close()
+        os.replace(partial, target)
+    except BaseException:
+        destination.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        source.close()
+
+    rotate_backups(db_file, backup_dir, keep)
+    return target
+
+def optimize_database(db_file: str = DB_PATH, vacuum_pages: int = VACUUM_PAGES,
+                      sleep: float = BACKUP_SLEEP,
+                      progress: Optional[ProgressCallback] = None,
+                      cancel: Optional[threading.Event] = None) -> dict:
+    """
+    PRAGMA optimize, пасивна контрольна точка WAL та покрокове звільнення
+    вільних сторінок (лише для баз з auto_vacuum = INCREMENTAL).
+
+    Кожен крок incremental_vacuum — окрема коротка транзакція запису.
+
+    Returns:
+        dict: {"freed_pages": ..., "incremental_vacuum": чи доступний}
+    """
+    conn = create_connection(db_file)
+    try:
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+
+        incremental = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL
+        freed = 0
+        if incremental:
+            total = remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            while remaining:
+                if cancel is not None and cancel.is_set():
+                    raise MaintenanceCancelled("Обслуговування перервано")
+                conn.execute(f"PRAGMA incremental_vacuum({vacuum_pages})").fetchall()
+                conn.commit()
+                after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                # Крок, що нічого не звільнив, зупиняє цикл
+                if after >= remaining:
+                    break
+                freed += remaining - after
+                remaining = after
+                if progress:
+                    progress("vacuum", total - remaining, total)
+                if remaining and sleep > 0:
+                    time.sleep(sleep)
+        return {"freed_pages": freed, "incremental_vacuum": incremental}
+    finally:
+        conn.close()
+
+def enable_incremental_vacuum(db_file: str = DB_PATH) -> bool:
+    """
+    Одноразово переводить базу на auto_vacuum = INCREMENTAL.
+
+    Потребує повного VACUUM, який блокує запис на весь час виконання,
+    тому запускати в неробочий час (python -m logic.maintenance
+    --enable-incremental-vacuum). Нові бази створюються вже в цьому режимі.
+
+    Returns:
+        bool: True, якщо режим було змінено
+    """
+    conn = create_connection(db_file)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            return False
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return True
+    finally:
+        conn.close()
+
+class MaintenanceService:
+    """Фонове резервне копіювання та обслуговування бази за розкладом."""
+
+    def __init__(self, db_file=DB_PATH, interval=MAINTENANCE_INTERVAL,
+                 backup_dir=None, keep=BACKUP_KEEP):
+        self.db_file = db_file
+        self.interval = interval
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self._stop = threading.Event()
+        self._run_now = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._progress = {
+            "stage": "idle", "done": 0, "total": 0,
+            "last_run": None, "last_backup": None, "last_error": None,
+        }
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Запускає фоновий потік обслуговування."""
+        with self._lock:
+            if self.is_running():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Зупиняє потік; незавершене копіювання переривається, файл .part видаляється."""
+        if not self.is_running():
+            return
+        self._stop.set()
+        self._run_now.set()
+        self._thread.join(timeout)
+
+    def run_now(self):
+        """Запускає обслуговування позачергово, не чекаючи на розклад."""
+        self._run_now.set()
+
+    def progress(self) -> dict:
+        """Поточний етап (idle/backup/vacuum/optimize), хід етапу та результат останнього запуску."""
+        with self._lock:
+            return dict(self._progress)
+
+    def _report(self, stage: str, done: int = 0, total: int = 0):
+        with self._lock:
+            self._progress.update(stage=stage, done=done, total=total)
+
+    def run_once(self):
+        """Одне повне обслуговування: резервна копія, потім оптимізація."""
+        try:
+            backup = backup_database(
+                self.db_file, self.backup_dir, keep=self.keep,
+                progress=self._report, cancel=self._stop
+            )
+            with self._lock:
+                self._progress["last_backup"] = backup
+            self._report("optimize")
+            optimize_database(self.db_file, progress=self._report, cancel=self._stop)
+            error = None
+        except MaintenanceCancelled:
+            error = None
+        except (sqlite3.Error, OSError) as e:
+            print(f"Помилка обслуговування бази даних: {e}")
+            error = str(e)
+        with self._lock:
+            self._progress.update(
+                stage="idle", done=0, total=0,
+                last_run=datetime.now().strftime("%Y-%m-%d %H:%M:%S"), last_error=error
+            )
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._run_now.wait(self.interval)
+            self._run_now.clear()
+            if self._stop.is_set():
+                break
+            self.run_once()
+
+_maintenance = None
+_maintenance_lock = threading.Lock()
+
+def start_maintenance(db_file=DB_PATH, **kwargs) -> MaintenanceService:
+    """Запускає спільний для процесу сервіс обслуговування."""
+    global _maintenance
+    with _maintenance_lock:
+        if _maintenance is None or not _maintenance.is_running():
+            _maintenance = MaintenanceService(db_file, **kwargs)
+            _maintenance.start()
+    return _maintenance
+
+def stop_maintenance():
+    """Зупиняє спільний сервіс обслуговування."""
+    global _maintenance
+    with _maintenance_lock:
+        if _maintenance is not None:
+            _maintenance.stop()
+            _maintenance = None
+
+def get_maintenance() -> Optional[MaintenanceService]:
+    """Повертає запущений сервіс обслуговування або None."""
+    return _maintenance if _maintenance is not None and _maintenance.is_running() else None
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Резервне копіювання та обслуговування бази даних")
+    parser.add_argument("--db", default=DB_PATH, help="Файл бази даних")
+    parser.add_argument("--backup", action="store_true", help="Створити резервну копію")
+    parser.add_argument("--optimize", action="store_true",
+                        help="PRAGMA optimize та звільнення вільних сторінок")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="Перевести базу на auto_vacuum = INCREMENTAL (повний VACUUM)")
+    parser.add_argument("--keep", type=int, default=BACKUP_KEEP, help="Скільки копій зберігати")
+    args = parser.parse_args()
+
+    def print_progress(stage, done, total):
+        print(f"\r{stage}: {done}/{total}", end="", flush=True)
+
+    if args.enable_incremental_vacuum:
+        changed = enable_incremental_vacuum(args.db)
+        print("Режим auto_vacuum = INCREMENTAL увімкнено." if changed
+              else "Режим auto_vacuum = INCREMENTAL вже увімкнено.")
+    if args.backup or not (args.optimize or args.enable_incremental_vacuum):
+        path = backup_database(args.db, keep=args.keep, progress=print_progress)
+        print(f"\nРезервну копію створено: {path}")
+    if args.optimize:
+        result = optimize_database(args.db, progress=print_progress)
+        print(f"\nОптимізацію завершено, звільнено сторінок: {result['freed_pages']}")
+        if not result["incremental_vacuum"]:
+            print("Для звільнення сторінок потрібен --enable-incremental-vacuum.")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Імпорт накладних (маніфестів) транзакцій з CSV або JSONL.
+
+Файл читається потоково і передається в TransactionHandler.add_transactions
+пакетами фіксованого розміру, тому пам'ять не залежить від розміру файлу.
+Кожен пакет застосовується однією транзакцією; помилки повідомляються
+з номером рядка файлу.
+
+Колонки (CSV) / ключі (JSONL):
+    resource_id, transaction_type, quantity_changed — обов'язкові
+    issued_by_user_id, recipient_department, notes, transaction_date — необов'язкові
+
+Запуск:
+    python -m logic.manifest_import накладна.csv --user-id 1 [--chunk-size 1000]
+"""
+
+import argparse
+import csv
+import json
+import os
+from itertools import islice
+from typing import Dict, Iterator, Optional, Tuple
+
+from .db_manager import DB_PATH, create_connection
+from .transaction_handler import TransactionHandler
+
+DEFAULT_CHUNK_SIZE = 1000
+INTEGER_FIELDS = ("resource_id", "quantity_changed", "issued_by_user_id")
+TEXT_FIELDS = ("transaction_type", "recipient_department", "notes", "transaction_date")
+
+def _read_lines(path: str) -> Iterator[Tuple[int, Dict]]:
+    """Повертає (номер рядка файлу, сирий словник) без читання всього файлу."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".jsonl"):
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, {"_error": f"Некоректний JSON: {e}"}
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+def _parse_line(raw: Dict, default_user_id: Optional[int]) -> Tuple[Optional[Dict], Optional[str]]:
+    """Перетворює сирий рядок на параметри транзакції або повертає текст помилки."""
+    if not isinstance(raw, dict):
+        return None, f"Рядок має бути JSON-об'єктом, отримано {type(raw).__name__}"
+    if "_error" in raw:
+        return None, raw["_error"]
+    line = {}
+    for field in INTEGER_FIELDS:
+        value = raw.get(field)
+        if value in (None, ""):
+            continue
+        # JSON true/false та дробові числа int() мовчки перетворив би на ціле
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            return None, f"Поле '{field}' має бути цілим числом: {value!r}"
+        try:
+            line[field] = int(value)
+        except (TypeError, ValueError):
+            return None, f"Поле '{field}' має бути цілим числом: {value!r}"
+    for field in TEXT_FIELDS:
+        value = raw.get(field)
+        if value not in (None, ""):
+            line[field] = str(value).strip()
+    line.setdefault("issued_by_user_id", default_user_id)
+    return line, None
+
+def import_manifest(path: str, db_file: str = DB_PATH,
+                    default_user_id: Optional[int] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    profile: Optional[str] = "bulk-import") -> Tuple[int, int]:
+    """
+    Імпортує файл накладної пакетами по chunk_size рядків.
+
+    Returns:
+        Tuple[int, int]: (кількість успішних рядків, кількість помилкових)
+    """
+    conn = create_connection(db_file, profile=profile)
+    if conn is None:
+        raise RuntimeError(f"Не вдалося підключитися до бази даних {db_file}")
+    handler = TransactionHandler(conn)
+    succeeded = failed = 0
+    lines = _read_lines(path)
+    try:
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                break
+            batch, batch_line_nos = [], []
+            for line_no, raw in chunk:
+                line, error = _parse_line(raw, default_user_id)
+                if error:
+                    print(f"Рядок {line_no}: {error}")
+                    failed += 1
+                    continue
+                batch.append(line)
+                batch_line_nos.append(line_no)
+            for line_no, (success, message) in zip(batch_line_nos, handler.add_transactions(batch)):
+                if success:
+                    succeeded += 1
+                else:
+                    print(f"Рядок {line_no}: {message}")
+                    failed += 1
+    finally:
+        conn.close()
+    return succeeded, failed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Імпорт накладної транзакцій (CSV або JSONL)")
+    parser.add_argument("path", help="Файл .csv або .jsonl")
+    parser.add_argument("--db", default=DB_PATH, help="Файл бази даних")
+    parser.add_argument("--user-id", type=int, default=None,
+                        help="ID користувача для рядків без issued_by_user_id")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--profile", default="bulk-import", help="Профіль PRAGMA з'єднання")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        parser.error(f"Файл не знайдено: {args.path}")
+    ok, errors = import_manifest(args.path, args.db, args.user_id, args.chunk_size, args.profile)
+    print(f"Імпорт завершено: успішно {ok}, з помилками {errors}.")
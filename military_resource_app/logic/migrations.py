@@ -0,0 +1,662 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Версіоновані міграції схеми бази даних.
+
+Поточна версія схеми зберігається в PRAGMA user_version. Кожна міграція
+виконується в окремій транзакції разом з оновленням версії, тому
+перерваний запуск не залишає базу в проміжному стані. Якщо версія вже
+актуальна, run_migrations повертається одразу, не торкаючись схеми.
+"""
+
+import sqlite3
+
+BASE_TABLES = [
+    """CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL CHECK(role IN ('admin', 'user')),
+        rank TEXT,
+        last_name TEXT,
+        first_name TEXT,
+        middle_name TEXT,
+        position TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        description TEXT,
+        parent_id INTEGER,
+        FOREIGN KEY (parent_id) REFERENCES categories (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS resources (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        category_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL DEFAULT 0,
+        unit_of_measure TEXT,
+        description TEXT,
+        image_path TEXT,
+        supplier TEXT,
+        phone TEXT,
+        origin TEXT,
+        arrival_date TEXT,
+        cost REAL,
+        expiration_date TEXT,
+        low_stock_threshold INTEGER DEFAULT 10,
+        FOREIGN KEY (category_id) REFERENCES categories (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS requisitions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        requisition_number TEXT UNIQUE NOT NULL,
+        created_by_user_id INTEGER NOT NULL,
+        department_requesting TEXT,
+        creation_date TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'нова' CHECK(status IN ('нова', 'на розгляді', 'схвалено', 'відхилено', 'частково виконано', 'виконано')),
+        urgency TEXT DEFAULT 'планова' CHECK(urgency IN ('планова', 'термінова', 'критична')),
+        purpose_description TEXT,
+        requisition_type TEXT,
+        author_manual_rank TEXT,
+        author_manual_lastname TEXT,
+        author_manual_initials TEXT,
+        notes TEXT,
+        last_updated TEXT,
+        last_updated_by_user_id INTEGER,
+        FOREIGN KEY (created_by_user_id) REFERENCES users (id),
+        FOREIGN KEY (last_updated_by_user_id) REFERENCES users (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS requisition_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        requisition_id INTEGER NOT NULL,
+        resource_id INTEGER,
+        requested_resource_name TEXT NOT NULL,
+        quantity_requested INTEGER NOT NULL,
+        unit_of_measure TEXT,
+        justification TEXT,
+        item_status TEXT DEFAULT 'очікує' CHECK(item_status IN ('очікує', 'схвалено', 'замовлено', 'отримано', 'відхилено', 'виконано', 'частково виконано')),
+        last_executed TEXT,
+        last_executed_by_user_id INTEGER,
+        FOREIGN KEY (requisition_id) REFERENCES requisitions (id),
+        FOREIGN KEY (resource_id) REFERENCES resources (id),
+        FOREIGN KEY (last_executed_by_user_id) REFERENCES users (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS resource_transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        resource_id INTEGER NOT NULL,
+        transaction_type TEXT NOT NULL CHECK(transaction_type IN ('надходження', 'видача', 'списання', 'повернення')),
+        quantity_changed INTEGER NOT NULL,
+        transaction_date TEXT NOT NULL,
+        recipient_department TEXT,
+        issued_by_user_id INTEGER,
+        notes TEXT,
+        requisition_item_id INTEGER,
+        FOREIGN KEY (resource_id) REFERENCES resources (id),
+        FOREIGN KEY (issued_by_user_id) REFERENCES users (id),
+        FOREIGN KEY (requisition_item_id) REFERENCES requisition_items (id)
+    )""",
+]
+
+# Колонки, яких може не бути в базах, створених старими версіями
+# db_manager.create_tables, resource_app.create_tables чи initialize_database.
+LEGACY_MISSING_COLUMNS = {
+    "users": [
+        ("rank", "TEXT"), ("last_name", "TEXT"), ("first_name", "TEXT"),
+        ("middle_name", "TEXT"), ("position", "TEXT"),
+    ],
+    "categories": [("description", "TEXT")],
+    "requisitions": [
+        ("purpose_description", "TEXT"), ("requisition_type", "TEXT"),
+        ("author_manual_rank", "TEXT"), ("author_manual_lastname", "TEXT"),
+        ("author_manual_initials", "TEXT"), ("notes", "TEXT"),
+        ("last_updated", "TEXT"), ("last_updated_by_user_id", "INTEGER"),
+    ],
+    "requisition_items": [
+        ("last_executed", "TEXT"), ("last_executed_by_user_id", "INTEGER"),
+    ],
+    "resource_transactions": [("requisition_item_id", "INTEGER")],
+}
+
+HOT_PATH_INDEXES = [
+    """CREATE INDEX IF NOT EXISTS idx_transactions_resource_date
+       ON resource_transactions (resource_id, transaction_date)""",
+    """CREATE INDEX IF NOT EXISTS idx_transactions_department_date
+       ON resource_transactions (recipient_department, transaction_date)""",
+    """CREATE INDEX IF NOT EXISTS idx_requisitions_creator_date
+       ON requisitions (created_by_user_id, creation_date)""",
+    """CREATE INDEX IF NOT EXISTS idx_requisition_items_requisition
+       ON requisition_items (requisition_id)""",
+    """CREATE INDEX IF NOT EXISTS idx_resources_category_name
+       ON resources (category_id, name)""",
+]
+
+# Дати зберігаються як текст 'YYYY-MM-DD HH:MM:SS'. Обчислювані колонки з
+# секундами епохи дають індексовані діапазони замість DATE(колонка) >= DATE(?).
+# Нерозпізнані обов'язкові дати стають 0, щоб не випадати з необмежених вибірок.
+DATE_EPOCH_COLUMNS = [
+    ("resource_transactions", "transaction_ts",
+     "COALESCE(CAST(strftime('%s', transaction_date) AS INTEGER), 0)"),
+    ("requisitions", "creation_ts",
+     "COALESCE(CAST(strftime('%s', creation_date) AS INTEGER), 0)"),
+    ("requisitions", "last_updated_ts",
+     "CAST(strftime('%s', last_updated) AS INTEGER)"),
+]
+
+DATE_RANGE_INDEXES = [
+    """CREATE INDEX IF NOT EXISTS idx_transactions_ts
+       ON resource_transactions (transaction_ts)""",
+    """CREATE INDEX IF NOT EXISTS idx_transactions_resource_ts
+       ON resource_transactions (resource_id, transaction_ts)""",
+    """CREATE INDEX IF NOT EXISTS idx_transactions_department_ts
+       ON resource_transactions (recipient_department, transaction_ts)""",
+    """CREATE INDEX IF NOT EXISTS idx_requisitions_creation_ts
+       ON requisitions (creation_ts)""",
+    """CREATE INDEX IF NOT EXISTS idx_requisitions_creator_ts
+       ON requisitions (created_by_user_id, creation_ts)""",
+    """CREATE INDEX IF NOT EXISTS idx_requisitions_last_updated_ts
+       ON requisitions (last_updated_ts)""",
+]
+
+# Індекси з міграції 2, які замінено індексами по колонках *_ts
+REPLACED_DATE_INDEXES = [
+    "idx_transactions_resource_date",
+    "idx_transactions_department_date",
+    "idx_requisitions_creator_date",
+]
+
+def get_table_columns(conn: sqlite3.Connection, table: str) -> set:
+    """Повертає множину назв колонок таблиці (разом з обчислюваними)."""
+    return {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})").fetchall()}
+
+def _migration_001_base_schema(conn: sqlite3.Connection):
+    """Базова схема та вирівнювання таблиць, створених старими скриптами."""
+    for statement in BASE_TABLES:
+        conn.execute(statement)
+
+    for table, columns in LEGACY_MISSING_COLUMNS.items():
+        existing = get_table_columns(conn, table)
+        for column, column_type in columns:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    # Стара колонка з resource_app.py, яка ламала вставку позицій
+    if "quantity_executed" in get_table_columns(conn, "requisition_items"):
+        conn.execute("ALTER TABLE requisition_items DROP COLUMN quantity_executed")
+
+def _migration_002_hot_path_indexes(conn: sqlite3.Connection):
+    """Індекси для запитів історії транзакцій, списків заявок та ресурсів."""
+    for statement in HOT_PATH_INDEXES:
+        conn.execute(statement)
+
+def _migration_003_date_epoch_columns(conn: sqlite3.Connection):
+    """Обчислювані колонки дат у секундах епохи та індекси для діапазонних запитів."""
+    for table, column, expression in DATE_EPOCH_COLUMNS:
+        if column not in get_table_columns(conn, table):
+            conn.execute(
+                f"ALTER TABLE {table} ADD COLUMN {column} INTEGER "
+                f"GENERATED ALWAYS AS ({expression}) VIRTUAL"
+            )
+    for index in REPLACED_DATE_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+    for statement in DATE_RANGE_INDEXES:
+        conn.execute(statement)
+
+def _migration_004_stock_snapshots(conn: sqlite3.Connection):
+    """Таблиця знімків залишків на кінець дня для запитів "на дату"."""
+    conn.execute("""CREATE TABLE IF NOT EXISTS stock_snapshots (
+        snapshot_date TEXT NOT NULL,
+        resource_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (snapshot_date, resource_id),
+        FOREIGN KEY (resource_id) REFERENCES resources (id) ON DELETE CASCADE
+    ) WITHOUT ROWID""")
+    conn.execute("""CREATE INDEX IF NOT EXISTS idx_stock_snapshots_resource_date
+       ON stock_snapshots (resource_id, snapshot_date)""")
+
+# Денні підсумки транзакцій. day — початок доби (секунди епохи, як *_ts),
+# department — '' для транзакцій без отримувача, qty_sum — сума модулів
+# кількості (напрям визначає transaction_type). Таблиця ведеться тригерами,
+# тому будь-який шлях запису (рушій, пакетний імпорт, видалення ресурсу)
+# оновлює підсумки в тій самій транзакції.
+ROLLUP_KEY_SQL = {
+    "day": "{row}.transaction_ts - {row}.transaction_ts % 86400",
+    "department": "COALESCE({row}.recipient_department, '')",
+}
+
+def _rollup_add_sql(row: str) -> str:
+    return f"""INSERT INTO transaction_daily_rollup (
+            resource_id, department, day, transaction_type, count, qty_sum
+        ) VALUES (
+            {row}.resource_id, {ROLLUP_KEY_SQL["department"].format(row=row)},
+            {ROLLUP_KEY_SQL["day"].format(row=row)}, {row}.transaction_type,
+            1, ABS({row}.quantity_changed)
+        )
+        ON CONFLICT (day, resource_id, department, transaction_type) DO UPDATE SET
+            count = count + 1,
+            qty_sum = qty_sum + excluded.qty_sum;"""
+
+def _rollup_remove_sql(row: str) -> str:
+    key = f"""resource_id = {row}.resource_id
+          AND department = {ROLLUP_KEY_SQL["department"].format(row=row)}
+          AND day = {ROLLUP_KEY_SQL["day"].format(row=row)}
+          AND transaction_type = {row}.transaction_type"""
+    return f"""UPDATE transaction_daily_rollup
+        SET count = count - 1, qty_sum = qty_sum - ABS({row}.quantity_changed)
+        WHERE {key};
+        DELETE FROM transaction_daily_rollup WHERE {key} AND count <= 0;"""
+
+# Архівація (logic/archive.py) тимчасово вимикає цей тригер: перенесені
+# в архів транзакції лишаються в денних підсумках
+ROLLUP_DELETE_TRIGGER = "trg_transactions_rollup_delete"
+
+ROLLUP_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_insert
+       AFTER INSERT ON resource_transactions
+       BEGIN
+        {_rollup_add_sql("NEW")}
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {ROLLUP_DELETE_TRIGGER}
+       AFTER DELETE ON resource_transactions
+       BEGIN
+        {_rollup_remove_sql("OLD")}
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_update
+       AFTER UPDATE OF resource_id, transaction_type, quantity_changed,
+                       transaction_date, recipient_department
+       ON resource_transactions
+       BEGIN
+        {_rollup_remove_sql("OLD")}
+        {_rollup_add_sql("NEW")}
+       END""",
+]
+
+def _migration_005_transaction_daily_rollup(conn: sqlite3.Connection):
+    """Таблиця денних підсумків транзакцій, її заповнення та тригери."""
+    conn.execute("""CREATE TABLE IF NOT EXISTS transaction_daily_rollup (
+        day INTEGER NOT NULL,
+        resource_id INTEGER NOT NULL,
+        department TEXT NOT NULL,
+        transaction_type TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        qty_sum INTEGER NOT NULL,
+        PRIMARY KEY (day, resource_id, department, transaction_type)
+    ) WITHOUT ROWID""")
+    conn.execute("""CREATE INDEX IF NOT EXISTS idx_rollup_resource_day
+       ON transaction_daily_rollup (resource_id, day)""")
+    conn.execute("DELETE FROM transaction_daily_rollup")
+    conn.execute(f"""INSERT INTO transaction_daily_rollup (
+            day, resource_id, department, transaction_type, count, qty_sum
+        )
+        SELECT {ROLLUP_KEY_SQL["day"].format(row="t")}, t.resource_id,
+               {ROLLUP_KEY_SQL["department"].format(row="t")}, t.transaction_type,
+               COUNT(*), SUM(ABS(t.quantity_changed))
+        FROM resource_transactions t
+        GROUP BY 1, 2, 3, 4""")
+    for statement in ROLLUP_TRIGGERS:
+        conn.execute(statement)
+
+def _migration_006_sequences(conn: sqlite3.Connection):
+    """Лічильники номерів документів (див. logic/sequences.py)."""
+    conn.execute("""CREATE TABLE IF NOT EXISTS sequences (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    ) WITHOUT ROWID""")
+    # Продовжуємо нумерацію наявних заявок REQ-YYYYMM-NNNN кожного місяця
+    conn.execute("""INSERT OR REPLACE INTO sequences (name, value)
+        SELECT 'requisition:' || substr(requisition_number, 5, 6),
+               MAX(CAST(substr(requisition_number, 12) AS INTEGER))
+        FROM requisitions
+        WHERE requisition_number GLOB 'REQ-[0-9][0-9][0-9][0-9][0-9][0-9]-[0-9]*'
+        GROUP BY 1""")
+
+# Токенізатор повнотекстових індексів. unicode61 переводить кирилицю в нижній
+# регістр; діакритику не прибираємо, бо й/и та ї/і в українській — різні
+# літери. Апостроф ʼ (U+02BC) unicode61 вважає літерою, тому він явно
+# оголошений роздільником, як ' та ’: "зв'язок" у будь-якому написанні
+# індексується як "зв" + "язок" і знаходиться фразою (query_registry.fts_match).
+FTS_TOKENIZE = "unicode61 remove_diacritics 0 separators 'ʼ'"
+
+# Пошуковий індекс заявок: rowid = requisitions.id, item_names — назви всіх
+# позицій заявки через пробіл. Індекс ведеться тригерами в тій самій
+# транзакції, що й зміни заявок та позицій.
+REQUISITION_SEARCH_COLUMNS = [
+    "requisition_number", "department_requesting", "purpose_description",
+    "requisition_type", "author_manual_lastname",
+]
+
+_REQUISITION_ITEM_NAMES_SQL = """(SELECT group_concat(ri.requested_resource_name, ' ')
+            FROM requisition_items ri WHERE ri.requisition_id = {requisition_id})"""
+
+REQUISITION_SEARCH_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_requisitions_fts_insert
+       AFTER INSERT ON requisitions
+       BEGIN
+        INSERT INTO requisitions_fts (rowid, {", ".join(REQUISITION_SEARCH_COLUMNS)}, item_names)
+        VALUES (NEW.id, {", ".join("NEW." + column for column in REQUISITION_SEARCH_COLUMNS)},
+                {_REQUISITION_ITEM_NAMES_SQL.format(requisition_id="NEW.id")});
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_requisitions_fts_update
+       AFTER UPDATE OF {", ".join(REQUISITION_SEARCH_COLUMNS)} ON requisitions
+       BEGIN
+        UPDATE requisitions_fts
+        SET {", ".join(f"{column} = NEW.{column}" for column in REQUISITION_SEARCH_COLUMNS)}
+        WHERE rowid = NEW.id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_requisitions_fts_delete
+       AFTER DELETE ON requisitions
+       BEGIN
+        DELETE FROM requisitions_fts WHERE rowid = OLD.id;
+       END""",
+    # Нова позиція лише дописується до документа заявки. FTS5 при цьому
+    # переіндексовує весь документ, тому пакетна вставка
+    # (requisition_handler.add_items_to_requisition) прибирає документ на
+    # час вставки і будує його один раз після неї
+    """CREATE TRIGGER IF NOT EXISTS trg_requisition_items_fts_insert
+       AFTER INSERT ON requisition_items
+       BEGIN
+        UPDATE requisitions_fts
+        SET item_names = COALESCE(item_names || ' ', '') || NEW.requested_resource_name
+        WHERE rowid = NEW.requisition_id;
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_requisition_items_fts_update
+       AFTER UPDATE OF requisition_id, requested_resource_name ON requisition_items
+       BEGIN
+        UPDATE requisitions_fts
+        SET item_names = {_REQUISITION_ITEM_NAMES_SQL.format(requisition_id="requisitions_fts.rowid")}
+        WHERE rowid IN (OLD.requisition_id, NEW.requisition_id);
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_requisition_items_fts_delete
+       AFTER DELETE ON requisition_items
+       BEGIN
+        UPDATE requisitions_fts
+        SET item_names = {_REQUISITION_ITEM_NAMES_SQL.format(requisition_id="OLD.requisition_id")}
+        WHERE rowid = OLD.requisition_id;
+       END""",
+]
+
+# Побудова документів індексу з таблиць (для однієї заявки — з умовою WHERE r.id)
+REQUISITION_SEARCH_INSERT_SQL = f"""INSERT INTO requisitions_fts (
+            rowid, {", ".join(REQUISITION_SEARCH_COLUMNS)}, item_names
+        )
+        SELECT r.id, {", ".join("r." + column for column in REQUISITION_SEARCH_COLUMNS)},
+               {_REQUISITION_ITEM_NAMES_SQL.format(requisition_id="r.id")}
+        FROM requisitions r"""
+
+def _migration_007_requisition_search(conn: sqlite3.Connection):
+    """Повнотекстовий індекс заявок FTS5, його заповнення та тригери."""
+    columns = ", ".join(REQUISITION_SEARCH_COLUMNS)
+    conn.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS requisitions_fts USING fts5(
+        {columns}, item_names,
+        tokenize = "{FTS_TOKENIZE}",
+        prefix = '2 3'
+    )""")
+    conn.execute("DELETE FROM requisitions_fts")
+    conn.execute(REQUISITION_SEARCH_INSERT_SQL)
+    conn.execute("INSERT INTO requisitions_fts (requisitions_fts) VALUES ('optimize')")
+    for statement in REQUISITION_SEARCH_TRIGGERS:
+        conn.execute(statement)
+
+# Пошуковий індекс каталогу ресурсів із зовнішнім вмістом: текст береться
+# з таблиці resources (rowid = resources.id), індекс не дублює його. Тригер
+# оновлення спрацьовує лише на зміну індексованих колонок, тож зміна
+# залишку (quantity) індекс не чіпає.
+RESOURCE_SEARCH_COLUMNS = ["name", "description", "supplier", "origin"]
+
+def _resource_search_values(row: str) -> str:
+    return ", ".join(f"{row}.{column}" for column in RESOURCE_SEARCH_COLUMNS)
+
+RESOURCE_SEARCH_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_resources_fts_insert
+       AFTER INSERT ON resources
+       BEGIN
+        INSERT INTO resources_fts (rowid, {", ".join(RESOURCE_SEARCH_COLUMNS)})
+        VALUES (NEW.id, {_resource_search_values("NEW")});
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_resources_fts_delete
+       AFTER DELETE ON resources
+       BEGIN
+        INSERT INTO resources_fts (resources_fts, rowid, {", ".join(RESOURCE_SEARCH_COLUMNS)})
+        VALUES ('delete', OLD.id, {_resource_search_values("OLD")});
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_resources_fts_update
+       AFTER UPDATE OF {", ".join(RESOURCE_SEARCH_COLUMNS)} ON resources
+       BEGIN
+        INSERT INTO resources_fts (resources_fts, rowid, {", ".join(RESOURCE_SEARCH_COLUMNS)})
+        VALUES ('delete', OLD.id, {_resource_search_values("OLD")});
+        INSERT INTO resources_fts (rowid, {", ".join(RESOURCE_SEARCH_COLUMNS)})
+        VALUES (NEW.id, {_resource_search_values("NEW")});
+       END""",
+]
+
+def _migration_008_resource_search(conn: sqlite3.Connection):
+    """Повнотекстовий індекс каталогу ресурсів FTS5, його побудова та тригери."""
+    conn.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5(
+        {", ".join(RESOURCE_SEARCH_COLUMNS)},
+        content = 'resources', content_rowid = 'id',
+        tokenize = "{FTS_TOKENIZE}",
+        prefix = '2 3'
+    )""")
+    conn.execute("INSERT INTO resources_fts (resources_fts) VALUES ('rebuild')")
+    for statement in RESOURCE_SEARCH_TRIGGERS:
+        conn.execute(statement)
+
+# Індекси розподілу залишків (див. logic/allocation.py): відкриті позиції
+# за ресурсом і вже видана кількість кожної позиції
+ALLOCATION_INDEXES = [
+    """CREATE INDEX IF NOT EXISTS idx_requisition_items_open
+       ON requisition_items (resource_id)
+       WHERE item_status IN ('очікує', 'схвалено', 'частково виконано')""",
+    """CREATE INDEX IF NOT EXISTS idx_transactions_requisition_item
+       ON resource_transactions (requisition_item_id)
+       WHERE requisition_item_id IS NOT NULL""",
+]
+
+def _migration_009_allocation_indexes(conn: sqlite3.Connection):
+    """Індекси відкритих позицій заявок і видач за позиціями."""
+    for statement in ALLOCATION_INDEXES:
+        conn.execute(statement)
+
+# Лічильники позицій заявки: усього, виконано, частково виконано,
+# відхилено. Ведуться
+# тригерами в тій самій транзакції, що й зміни позицій, тому загальний
+# статус і прогрес заявки читаються з одного рядка requisitions.
+REQUISITION_ITEM_COUNTERS = [
+    ("items_total", None),
+    ("items_done", "виконано"),
+    ("items_partial", "частково виконано"),
+    ("items_rejected", "відхилено"),
+]
+
+def _item_counter_changes(row: str, sign: str) -> str:
+    return ",\n            ".join(
+        f"{column} = {column} {sign} " + ("1" if status is None else f"({row}.item_status IS '{status}')")
+        for column, status in REQUISITION_ITEM_COUNTERS
+    )
+
+REQUISITION_ITEM_COUNTER_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_requisition_items_count_insert
+       AFTER INSERT ON requisition_items
+       BEGIN
+        UPDATE requisitions
+        SET {_item_counter_changes("NEW", "+")}
+        WHERE id = NEW.requisition_id;
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_requisition_items_count_delete
+       AFTER DELETE ON requisition_items
+       BEGIN
+        UPDATE requisitions
+        SET {_item_counter_changes("OLD", "-")}
+        WHERE id = OLD.requisition_id;
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_requisition_items_count_update
+       AFTER UPDATE OF requisition_id, item_status ON requisition_items
+       WHEN OLD.requisition_id IS NOT NEW.requisition_id
+         OR OLD.item_status IS NOT NEW.item_status
+       BEGIN
+        UPDATE requisitions
+        SET {_item_counter_changes("OLD", "-")}
+        WHERE id = OLD.requisition_id;
+        UPDATE requisitions
+        SET {_item_counter_changes("NEW", "+")}
+        WHERE id = NEW.requisition_id;
+       END""",
+]
+
+REQUISITION_ITEM_COUNTER_TRIGGER_NAMES = [
+    "trg_requisition_items_count_insert",
+    "trg_requisition_items_count_delete",
+    "trg_requisition_items_count_update",
+]
+
+def _install_requisition_item_counters(conn: sqlite3.Connection):
+    """Додає відсутні лічильники, заповнює їх і (пере)створює тригери."""
+    existing = get_table_columns(conn, "requisitions")
+    for column, _ in REQUISITION_ITEM_COUNTERS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE requisitions ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    conn.execute(f"""UPDATE requisitions
+        SET {", ".join(f"{column} = agg.{column}" for column, _ in REQUISITION_ITEM_COUNTERS)}
+        FROM (
+            SELECT requisition_id, {", ".join(
+                f"COUNT(*) AS {column}" if status is None
+                else f"COUNT(CASE WHEN item_status = '{status}' THEN 1 END) AS {column}"
+                for column, status in REQUISITION_ITEM_COUNTERS
+            )}
+            FROM requisition_items
+            GROUP BY requisition_id
+        ) agg
+        WHERE agg.requisition_id = requisitions.id""")
+    for name in REQUISITION_ITEM_COUNTER_TRIGGER_NAMES:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for statement in REQUISITION_ITEM_COUNTER_TRIGGERS:
+        conn.execute(statement)
+
+def _migration_010_requisition_item_counters(conn: sqlite3.Connection):
+    """Лічильники позицій заявки, їх заповнення та тригери."""
+    _install_requisition_item_counters(conn)
+
+# Короткий перелік позицій для списку заявок: перші три позиції
+# "назва (кількість одиниця)" через "; ". Зберігається в requisitions
+# (разом з items_total це і є кількість позицій) і ведеться тригерами,
+# тож список заявок не читає requisition_items.
+REQUISITION_ITEM_SUMMARY_LIMIT = 3
+
+_REQUISITION_ITEM_SUMMARY_SQL = f"""(SELECT GROUP_CONCAT(
+                ri.requested_resource_name || ' (' || ri.quantity_requested
+                || COALESCE(' ' || ri.unit_of_measure, '') || ')', '; ')
+            FROM (
+                SELECT requested_resource_name, quantity_requested, unit_of_measure
+                FROM requisition_items
+                WHERE requisition_id = {{requisition_id}}
+                ORDER BY id LIMIT {REQUISITION_ITEM_SUMMARY_LIMIT}
+            ) AS ri)"""
+
+def _item_summary_refresh_sql(requisition_id: str) -> str:
+    return f"""UPDATE requisitions
+        SET item_summary = {_REQUISITION_ITEM_SUMMARY_SQL.format(requisition_id=requisition_id)}
+        WHERE id = {requisition_id};"""
+
+REQUISITION_ITEM_SUMMARY_TRIGGERS = [
+    # Нова позиція має найбільший id і потрапляє до переліку, лише якщо
+    # перед нею менше трьох позицій заявки
+    f"""CREATE TRIGGER IF NOT EXISTS trg_requisition_items_summary_insert
+       AFTER INSERT ON requisition_items
+       WHEN (SELECT COUNT(*) FROM (
+                SELECT 1 FROM requisition_items
+                WHERE requisition_id = NEW.requisition_id AND id < NEW.id
+                LIMIT {REQUISITION_ITEM_SUMMARY_LIMIT}
+             )) < {REQUISITION_ITEM_SUMMARY_LIMIT}
+       BEGIN
+        {_item_summary_refresh_sql("NEW.requisition_id")}
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_requisition_items_summary_update
+       AFTER UPDATE OF requisition_id, requested_resource_name, quantity_requested,
+                       unit_of_measure ON requisition_items
+       BEGIN
+        {_item_summary_refresh_sql("OLD.requisition_id")}
+        {_item_summary_refresh_sql("NEW.requisition_id")}
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_requisition_items_summary_delete
+       AFTER DELETE ON requisition_items
+       BEGIN
+        {_item_summary_refresh_sql("OLD.requisition_id")}
+       END""",
+]
+
+def _migration_011_requisition_item_summary(conn: sqlite3.Connection):
+    """Перелік позицій у requisitions, його заповнення та тригери."""
+    if "item_summary" not in get_table_columns(conn, "requisitions"):
+        conn.execute("ALTER TABLE requisitions ADD COLUMN item_summary TEXT")
+    conn.execute(f"""UPDATE requisitions
+        SET item_summary = {_REQUISITION_ITEM_SUMMARY_SQL.format(requisition_id="requisitions.id")}
+        WHERE items_total > 0""")
+    for statement in REQUISITION_ITEM_SUMMARY_TRIGGERS:
+        conn.execute(statement)
+
+def _migration_012_requisition_items_partial(conn: sqlite3.Connection):
+    """Лічильник частково виконаних позицій; тригери лічильників перестворюються."""
+    _install_requisition_item_counters(conn)
+
+# (версія, опис, функція міграції) — лише додавати в кінець
+MIGRATIONS = [
+    (1, "Базова схема", _migration_001_base_schema),
+    (2, "Індекси для гарячих запитів", _migration_002_hot_path_indexes),
+    (3, "Колонки дат у секундах епохи", _migration_003_date_epoch_columns),
+    (4, "Знімки залишків", _migration_004_stock_snapshots),
+    (5, "Денні підсумки транзакцій", _migration_005_transaction_daily_rollup),
+    (6, "Лічильники номерів документів", _migration_006_sequences),
+    (7, "Повнотекстовий пошук заявок", _migration_007_requisition_search),
+    (8, "Повнотекстовий пошук у каталозі ресурсів", _migration_008_resource_search),
+    (9, "Індекси розподілу залишків", _migration_009_allocation_indexes),
+    (10, "Лічильники позицій заявок", _migration_010_requisition_item_counters),
+    (11, "Перелік позицій у списку заявок", _migration_011_requisition_item_summary),
+    (12, "Лічильник частково виконаних позицій", _migration_012_requisition_items_partial),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Повертає поточну версію схеми з PRAGMA user_version."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def run_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Застосовує всі міграції, новіші за поточну версію схеми.
+
+    Returns:
+        int: версія схеми після виконання
+    """
+    current = get_schema_version(conn)
+    if current >= SCHEMA_VERSION:
+        return current
+
+    if conn.in_transaction:
+        conn.commit()
+
+    # Нова порожня база одразу отримує auto_vacuum = INCREMENTAL, щоб
+    # обслуговування могло звільняти сторінки без повного VACUUM
+    if current == 0 and not conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Інший процес міг застосувати міграцію, поки ми чекали на блокування
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                current = version
+                continue
+            migrate(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        print(f"Міграцію {version} ({description}) застосовано.")
+        current = version
+
+    return current
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Реєстр канонічних параметризованих запитів.
+
+sqlite3 кешує підготовлені запити за текстом SQL (cached_statements
+на з'єднання). Якщо запит збирається конкатенацією умов, кожна комбінація
+фільтрів дає новий текст і кеш не працює. Тут кожен запит має один
+незмінний текст з іменованими параметрами, а необов'язкові фільтри
+записуються у формі `(:param IS NULL OR колонка = :param)`.
+
+Реєстр також оцінює, скільки разів запит було підготовлено і скільки разів
+використано повторно, за моделлю LRU-кешу кожного з'єднання (розміром
+cached_statements цього з'єднання). Модель бачить лише зареєстровані
+запити: незареєстровані conn.execute теж займають місця в кеші sqlite3 і
+можуть витісняти з нього запити реєстру, тому reused_max — верхня межа
+повторних використань, а prepared_min — нижня межа підготовок.
+"""
+
+import base64
+import calendar
+import json
+import os
+import re
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import date, timedelta
+
+# Розмір кешу підготовлених запитів на одне з'єднання
+STATEMENT_CACHE_SIZE = int(os.environ.get("MILITARY_DB_STATEMENT_CACHE", "256"))
+
+# Кількість рядків, що читається за один fetchmany у потокових iter_* функціях
+DEFAULT_ARRAYSIZE = int(os.environ.get("MILITARY_DB_ARRAYSIZE", "500"))
+
+# Межі необмеженого діапазону дат (секунди епохи)
+MIN_EPOCH = -(2 ** 62)
+MAX_EPOCH = 2 ** 62
+
+_PARAM_RE = re.compile(r"(?<!:):([A-Za-z_]\w*)")
+_DAY_RE = re.compile(r"(\d{4}-\d{2}-\d{2})(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?")
+
+def optional_filter(expression: str, param: str, op: str = "=") -> str:
+    """Умова, яка не діє, якщо параметр дорівнює NULL."""
+    return f"(:{param} IS NULL OR {expression} {op} :{param})"
+
+def range_filter(column: str, start_param: str = "start_ts", end_param: str = "end_ts") -> str:
+    """
+    Напіввідкритий діапазон `column >= :start AND column < :end`.
+
+    На відміну від форми `(:param IS NULL OR ...)`, таку умову SQLite може
+    виконати по індексу; відсутні межі замінюються на MIN_EPOCH/MAX_EPOCH.
+    """
+    return f"{column} >= :{start_param} AND {column} < :{end_param}"
+
+def optional_range_filter(column: str, start_param: str = "start_ts", end_param: str = "end_ts") -> str:
+    """
+    Діапазон як у range_filter, але межа MIN_EPOCH/MAX_EPOCH не перевіряється.
+
+    Для запитів, де рядки вибирає не індекс по column (наприклад, повнотекстовий
+    пошук): обчислювана колонка *_ts не рахується для кожного рядка, якщо
+    діапазон дат не задано.
+    """
+    return (f"(:{start_param} = {MIN_EPOCH} OR {column} >= :{start_param})"
+            f" AND (:{end_param} = {MAX_EPOCH} OR {column} < :{end_param})")
+
+def fts_match(search_term: str | None) -> str | None:
+    """
+    Вираз MATCH для FTS5 з пошукового рядка користувача.
+
+    Кожне слово береться в лапки (синтаксис запитів FTS5 не інтерпретується)
+    і шукається як префікс: "бат 2-й" -> "бат"* "2-й"* — документ має
+    містити всі слова. Повертає None, якщо шукати нічого.
+    """
+    words = [
+        '"' + word.replace('"', '""') + '"*'
+        for word in (search_term or "").split()
+        if any(char.isalnum() for char in word)
+    ]
+    return " ".join(words) or None
+
+def parse_day(value: str) -> date:
+    """
+    Дата з рядка 'YYYY-MM-DD' (можливо, з часом 'YYYY-MM-DD HH:MM[:SS]').
+
+    Дозволено лише повний формат з нулями попереду: такі рядки однаково
+    порівнюються як текст і як дати (колонки дат зберігаються текстом).
+
+    Raises:
+        ValueError: інший формат або неіснуюча дата.
+    """
+    match = _DAY_RE.fullmatch(value) if isinstance(value, str) else None
+    try:
+        if match is None:
+            raise ValueError
+        return date.fromisoformat(match.group(1))
+    except ValueError:
+        raise ValueError(f"Некоректна дата {value!r}: очікується формат YYYY-MM-DD") from None
+
+def _day_start_epoch(value: str) -> int:
+    return calendar.timegm(parse_day(value).timetuple())
+
+def date_range(date_from: str | None = None, date_to: str | None = None) -> tuple:
+    """
+    Перетворює включні дати 'YYYY-MM-DD' на межі [початок date_from,
+    початок дня після date_to) у секундах епохи — так само, як їх рахує
+    strftime('%s', ...) в обчислюваних колонках *_ts.
+
+    Raises:
+        ValueError: дата не у форматі YYYY-MM-DD (текст придатний для
+            показу користувачу).
+    """
+    start = _day_start_epoch(date_from) if date_from else MIN_EPOCH
+    end = _day_start_epoch(date_to) + int(timedelta(days=1).total_seconds()) if date_to else MAX_EPOCH
+    return start, end
+
+def encode_page_token(*key) -> str:
+    """Непрозорий токен продовження з ключа останнього рядка сторінки."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+def decode_page_token(token: str, size: int) -> tuple:
+    """Повертає ключ з токена продовження; ValueError для пошкодженого токена."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Некоректний токен сторінки") from None
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError("Некоректний токен сторінки")
+    return tuple(key)
+
+class QueryRegistry:
+    """Реєстр канонічних запитів з оцінкою підготовки/повторного використання."""
+
+    def __init__(self, cache_size=STATEMENT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._queries = {}
+        self._params = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        # Модель кешу sqlite3 для кожного з'єднання: текст SQL у порядку LRU
+        # (лише запити реєстру)
+        self._caches = weakref.WeakKeyDictionary()
+
+    def register(self, name: str, sql: str) -> str:
+        """Реєструє запит під назвою; повторна реєстрація того ж тексту дозволена."""
+        sql = sql.strip()
+        with self._lock:
+            if name in self._queries and self._queries[name] != sql:
+                raise ValueError(f"Запит '{name}' вже зареєстровано з іншим текстом")
+            self._queries[name] = sql
+            self._params[name] = tuple(dict.fromkeys(_PARAM_RE.findall(sql)))
+            self._stats.setdefault(name, {"prepared_min": 0, "reused_max": 0})
+        return name
+
+    def sql(self, name: str) -> str:
+        """Повертає текст зареєстрованого запиту."""
+        try:
+            return self._queries[name]
+        except KeyError:
+            raise KeyError(f"Запит '{name}' не зареєстровано") from None
+
+    def params(self, name: str, **values) -> dict:
+        """Формує повний набір іменованих параметрів (відсутні = None)."""
+        self.sql(name)
+        unknown = set(values) - set(self._params[name])
+        if unknown:
+            raise ValueError(f"Невідомі параметри запиту '{name}': {', '.join(sorted(unknown))}")
+        return {param: values.get(param) for param in self._params[name]}
+
+    def execute(self, conn: sqlite3.Connection, name: str, **values) -> sqlite3.Cursor:
+        """Виконує зареєстрований запит на з'єднанні."""
+        sql = self.sql(name)
+        params = self.params(name, **values)
+        self._record(conn, name, sql)
+        return conn.execute(sql, params)
+
+    def executemany(self, conn: sqlite3.Connection, name: str, rows) -> sqlite3.Cursor:
+        """Виконує зареєстрований запит для кожного словника параметрів з rows."""
+        sql = self.sql(name)
+        self._record(conn, name, sql)
+        return conn.executemany(sql, (self.params(name, **row) for row in rows))
+
+    def iterate(self, conn: sqlite3.Connection, name: str,
+                arraysize: int = DEFAULT_ARRAYSIZE, as_tuples: bool = False, **values):
+        """
+        Генератор рядків зареєстрованого запиту, що читає їх порціями по arraysize.
+
+        Рядки повертаються як словники або, якщо as_tuples, як прості кортежі
+        в порядку колонок SELECT (без створення sqlite3.Row та dict).
+        """
+        sql = self.sql(name)
+        params = self.params(name, **values)
+        self._record(conn, name, sql)
+        cursor = conn.cursor()
+        if as_tuples:
+            cursor.row_factory = None
+        cursor.arraysize = arraysize
+        try:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                if as_tuples:
+                    yield from rows
+                else:
+                    for row in rows:
+                        yield dict(row)
+        finally:
+            cursor.close()
+
+    def _record(self, conn, name: str, sql: str):
+        with self._lock:
+            stats = self._stats[name]
+            try:
+                cache = self._caches.get(conn)
+                if cache is None:
+                    cache = self._caches[conn] = OrderedDict()
+            except TypeError:
+                # З'єднання без підтримки слабких посилань не відстежуємо
+                stats["prepared_min"] += 1
+                return
+            if sql in cache:
+                cache.move_to_end(sql)
+                stats["reused_max"] += 1
+                return
+            cache[sql] = True
+            # Розмір кешу з'єднання задає create_connection (cached_statements)
+            if len(cache) > getattr(conn, "cached_statements", self.cache_size):
+                cache.popitem(last=False)
+            stats["prepared_min"] += 1
+
+    def stats(self) -> dict:
+        """
+        Оцінка по кожному запиту: prepared_min (не менше стільки підготовок)
+        та reused_max (не більше стільки повторних використань з кешу).
+        """
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def reset_stats(self):
+        """Обнуляє статистику."""
+        with self._lock:
+            for counts in self._stats.values():
+                counts["prepared_min"] = counts["reused_max"] = 0
+
+_registry = QueryRegistry()
+
+def get_registry() -> QueryRegistry:
+    """Повертає спільний для процесу реєстр запитів."""
+    return _registry
+
+def register_query(name: str, sql: str) -> str:
+    """Реєструє канонічний запит у спільному реєстрі."""
+    return _registry.register(name, sql)
+
+def execute_query(conn: sqlite3.Connection, name: str, **values) -> sqlite3.Cursor:
+    """Виконує канонічний запит зі спільного реєстру."""
+    return _registry.execute(conn, name, **values)
+
+def executemany_query(conn: sqlite3.Connection, name: str, rows) -> sqlite3.Cursor:
+    """Виконує канонічний запит зі спільного реєстру для кожного набору параметрів."""
+    return _registry.executemany(conn, name, rows)
+
+def iter_query(conn: sqlite3.Connection, name: str,
+               arraysize: int = DEFAULT_ARRAYSIZE, as_tuples: bool = False, **values):
+    """Потоково читає канонічний запит зі спільного реєстру (див. QueryRegistry.iterate)."""
+    return _registry.iterate(conn, name, arraysize, as_tuples, **values)
+
+def get_query_stats() -> dict:
+    """Оцінка підготовки/повторного використання запитів (див. QueryRegistry.stats)."""
+    return _registry.stats()
@@ -4,85 +4,258 @@
 Модуль для генерації звітів в системі обліку військового майна.
 """
 
+import json
 import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from .db_manager import create_connection
+from .archive import ARCHIVE_VIEW, archived_years, not_archived_filter
+from .db_manager import snapshot_connection
+from .query_registry import (
+    DEFAULT_ARRAYSIZE, date_range, execute_query, iter_query, optional_filter, range_filter, register_query
+)
 
-def get_current_resource_stock_report(category_id: int | None = None) -> list:
+QUERY_STOCK_REPORT = register_query("reports.stock", f"""
+    SELECT
+        r.id as resource_id,
+        r.name as resource_name,
+        c.name as category_name,
+        r.quantity,
+        r.unit_of_measure,
+        r.expiration_date,
+        r.low_stock_threshold,
+        r.cost,
+        r.supplier,
+        r.arrival_date,
+        (SELECT COUNT(*) FROM resource_transactions t 
+         WHERE t.resource_id = r.id AND t.transaction_type = 'видача') as total_issues,
+        (SELECT COUNT(*) FROM requisition_items ri 
+         WHERE ri.resource_id = r.id AND ri.item_status != 'виконано') as pending_requests
+    FROM resources r
+    JOIN categories c ON r.category_id = c.id
+    WHERE {optional_filter("r.category_id", "category_id")}
+    ORDER BY c.name, r.name
+""")
+
+# Кількість позицій і виконаних позицій беруться з лічильників заявки
+# (міграція 10), тому підсумковий звіт читає лише requisitions. Варіант з
+# позиціями агрегує їх одним запитом: внутрішній GROUP BY групує лише ключі
+# та агрегати (вузьке сортування), решта колонок заявки приєднується після
+# нього. Час обробки та відсоток виконання рахуються в SQL.
+_REQUISITION_REPORT_SQL = """
+    SELECT
+        req.id as requisition_id,
+        req.requisition_number,
+        req.creation_date,
+        req.department_requesting,
+        u_created.username as created_by_username,
+        req.status,
+        req.urgency,
+        req.last_updated,
+        u_updated.username as last_updated_by_username,
+        req.items_total as total_items,
+        req.items_done as completed_items,
+        req.items_rejected as rejected_items,
+        CASE WHEN req.items_total > 0
+             THEN req.items_done * 100.0 / req.items_total
+             ELSE 0 END as completion_percentage,
+        (julianday(req.last_updated) - julianday(req.creation_date)) * 24 as processing_time_hours{items_columns}
+    FROM {source}
+    LEFT JOIN users u_created ON req.created_by_user_id = u_created.id
+    LEFT JOIN users u_updated ON req.last_updated_by_user_id = u_updated.id{where}
+    ORDER BY req.creation_ts DESC
+"""
+
+_REQUISITION_REPORT_ITEMS_SOURCE = """(
+        SELECT
+            sel.id,
+            GROUP_CONCAT(DISTINCT ri.item_status) as item_statuses,
+            json_group_array(json_object(
+                'id', ri.id,
+                'requisition_id', ri.requisition_id,
+                'resource_id', ri.resource_id,
+                'requested_resource_name', ri.requested_resource_name,
+                'resource_name', r.name,
+                'quantity_requested', ri.quantity_requested,
+                'unit_of_measure', COALESCE(ri.unit_of_measure, r.unit_of_measure),
+                'justification', ri.justification,
+                'item_status', ri.item_status,
+                'last_executed', ri.last_executed,
+                'last_executed_by_user_id', ri.last_executed_by_user_id
+            )) FILTER (WHERE ri.id IS NOT NULL) as items_json
+        FROM requisitions sel
+        LEFT JOIN requisition_items ri ON ri.requisition_id = sel.id
+        LEFT JOIN resources r ON ri.resource_id = r.id
+        WHERE {where}
+        GROUP BY sel.id
+    ) agg
+    JOIN requisitions req ON req.id = agg.id"""
+
+def _requisition_report_where(alias: str) -> str:
+    return f"""{range_filter(f"{alias}.creation_ts")}
+          AND {optional_filter(f"{alias}.status", "status")}
+          AND {optional_filter(f"{alias}.department_requesting", "department", "LIKE")}"""
+
+# Два рівні деталізації: лише підсумки (без item_statuses) або разом з позиціями
+QUERY_REQUISITION_REPORT = register_query(
+    "reports.requisitions",
+    _REQUISITION_REPORT_SQL.format(
+        items_columns="",
+        source="requisitions req",
+        where=f"\n    WHERE {_requisition_report_where('req')}"
+    )
+)
+QUERY_REQUISITION_REPORT_WITH_ITEMS = register_query(
+    "reports.requisitions_with_items",
+    _REQUISITION_REPORT_SQL.format(
+        items_columns=",\n        agg.item_statuses,\n        agg.items_json",
+        source=_REQUISITION_REPORT_ITEMS_SOURCE.format(where=_requisition_report_where("sel")),
+        where=""
+    )
+)
+
+_MOVEMENT_REPORT_SQL = """
+    SELECT
+        t.id as transaction_id,
+        t.transaction_date,
+        r.id as resource_id,
+        r.name as resource_name,
+        c.name as category_name,
+        t.transaction_type,
+        t.quantity_changed,
+        r.unit_of_measure,
+        t.recipient_department,
+        u.username as issued_by_username,
+        t.notes,
+        req.requisition_number
+    FROM {source} t
+    JOIN resources r ON t.resource_id = r.id
+    JOIN categories c ON r.category_id = c.id
+    LEFT JOIN users u ON t.issued_by_user_id = u.id
+    LEFT JOIN requisition_items ri ON t.requisition_item_id = ri.id
+    LEFT JOIN requisitions req ON ri.requisition_id = req.id
+    WHERE {where}
+    ORDER BY t.transaction_ts DESC
+"""
+
+_MOVEMENT_WHERE = range_filter("t.transaction_ts")
+_MOVEMENT_BY_RESOURCE_WHERE = "t.resource_id = :resource_id AND " + range_filter("t.transaction_ts")
+
+# Два варіанти, щоб SQLite обирав індекс (resource_id, transaction_ts) або (transaction_ts)
+QUERY_MOVEMENT_REPORT = register_query(
+    "reports.movement",
+    _MOVEMENT_REPORT_SQL.format(source="resource_transactions", where=_MOVEMENT_WHERE)
+)
+QUERY_MOVEMENT_REPORT_BY_RESOURCE = register_query(
+    "reports.movement_by_resource",
+    _MOVEMENT_REPORT_SQL.format(source="resource_transactions", where=_MOVEMENT_BY_RESOURCE_WHERE)
+)
+# Ті самі запити по повній історії (основна таблиця та приєднані архіви)
+QUERY_MOVEMENT_REPORT_FULL = register_query(
+    "reports.movement_full",
+    _MOVEMENT_REPORT_SQL.format(source=ARCHIVE_VIEW, where=_MOVEMENT_WHERE)
+)
+QUERY_MOVEMENT_REPORT_BY_RESOURCE_FULL = register_query(
+    "reports.movement_by_resource_full",
+    _MOVEMENT_REPORT_SQL.format(source=ARCHIVE_VIEW, where=_MOVEMENT_BY_RESOURCE_WHERE)
+)
+
+def _movement_query(resource_id: int | None, full_history: bool) -> str:
+    if resource_id is not None:
+        return QUERY_MOVEMENT_REPORT_BY_RESOURCE_FULL if full_history else QUERY_MOVEMENT_REPORT_BY_RESOURCE
+    return QUERY_MOVEMENT_REPORT_FULL if full_history else QUERY_MOVEMENT_REPORT
+
+# Підсумки руху з денних підсумків замість повторного обходу транзакцій;
+# без повної історії архівовані роки не враховуються (not_archived_filter)
+QUERY_MOVEMENT_SUMMARY = register_query("reports.movement_summary", f"""
+    SELECT
+        COALESCE(SUM(CASE WHEN transaction_type = 'надходження' THEN qty_sum END), 0) as total_incoming,
+        COALESCE(SUM(CASE WHEN transaction_type = 'видача' THEN qty_sum END), 0) as total_outgoing,
+        COUNT(DISTINCT NULLIF(department, '')) as departments_served,
+        COUNT(DISTINCT resource_id) as unique_resources
+    FROM transaction_daily_rollup
+    WHERE {optional_filter("resource_id", "resource_id")}
+      AND {range_filter("day")}
+      AND {not_archived_filter("day")}
+""")
+
+# Фоновий потік для формування звітів
+_report_executor = None
+_report_executor_lock = threading.Lock()
+
+def submit_report(report_func, *args, **kwargs) -> Future:
+    """
+    Запускає функцію звіту у фоновому потоці.
+
+    Returns:
+        Future з результатом звіту
+    """
+    global _report_executor
+    with _report_executor_lock:
+        if _report_executor is None:
+            _report_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report")
+        return _report_executor.submit(report_func, *args, **kwargs)
+
+def shutdown_report_worker(wait: bool = True):
+    """Зупиняє фоновий потік звітів."""
+    global _report_executor
+    with _report_executor_lock:
+        if _report_executor is not None:
+            _report_executor.shutdown(wait=wait)
+            _report_executor = None
+
+def _stock_report_row(row_dict: dict) -> dict:
+    """Додає до рядка звіту про залишки вартість і статус запасів."""
+    # Розрахунок вартості залишків
+    row_dict['total_value'] = row_dict['quantity'] * (row_dict['cost'] or 0)
+    # Статус запасів
+    if row_dict['quantity'] <= 0:
+        row_dict['stock_status'] = 'відсутній'
+    elif row_dict['quantity'] <= row_dict['low_stock_threshold']:
+        row_dict['stock_status'] = 'критичний'
+    elif row_dict['quantity'] <= row_dict['low_stock_threshold'] * 2:
+        row_dict['stock_status'] = 'низький'
+    else:
+        row_dict['stock_status'] = 'достатній'
+    return row_dict
+
+def _requisition_report_row(row_dict: dict) -> dict:
+    """Розбирає позиції заявки (рівень деталізації з позиціями) з JSON."""
+    items_json = row_dict.pop('items_json', None)
+    if items_json is not None:
+        row_dict['items'] = json.loads(items_json)
+    return row_dict
+
+def get_current_resource_stock_report(category_id: int | None = None,
+                                     conn: sqlite3.Connection | None = None) -> list:
     """
     Отримує дані для звіту про поточні залишки ресурсів.
 
     Args:
         category_id: ID категорії для фільтрації (якщо None, то всі категорії).
+        conn: З'єднання (якщо None, береться з пулу звітів лише для читання).
 
     Returns:
         Список словників, де кожен словник представляє ресурс та його залишки.
     """
-    conn = create_connection()
-    if not conn:
-        return []
-
-    query = """
-        SELECT
-            r.id as resource_id,
-            r.name as resource_name,
-            c.name as category_name,
-            r.quantity,
-            r.unit_of_measure,
-            r.expiration_date,
-            r.low_stock_threshold,
-            r.cost,
-            r.supplier,
-            r.arrival_date,
-            (SELECT COUNT(*) FROM transactions t 
-             WHERE t.resource_id = r.id AND t.transaction_type = 'видача') as total_issues,
-            (SELECT COUNT(*) FROM requisition_items ri 
-             WHERE ri.resource_id = r.id AND ri.status != 'виконано') as pending_requests
-        FROM resources r
-        JOIN categories c ON r.category_id = c.id
-    """
-    params = []
-
-    if category_id is not None:
-        query += " WHERE r.category_id = ?"
-        params.append(category_id)
-
-    query += " ORDER BY c.name, r.name"
-
     try:
-        cur = conn.cursor()
-        cur.execute(query, tuple(params))
-        report_data = cur.fetchall()
+        with snapshot_connection(conn) as conn:
+            report_data = execute_query(
+                conn, QUERY_STOCK_REPORT, category_id=category_id
+            ).fetchall()
         
         # Додаємо додаткові розрахункові поля
-        result = []
-        for row in report_data:
-            row_dict = dict(row)
-            # Розрахунок вартості залишків
-            row_dict['total_value'] = row_dict['quantity'] * (row_dict['cost'] or 0)
-            # Статус запасів
-            if row_dict['quantity'] <= 0:
-                row_dict['stock_status'] = 'відсутній'
-            elif row_dict['quantity'] <= row_dict['low_stock_threshold']:
-                row_dict['stock_status'] = 'критичний'
-            elif row_dict['quantity'] <= row_dict['low_stock_threshold'] * 2:
-                row_dict['stock_status'] = 'низький'
-            else:
-                row_dict['stock_status'] = 'достатній'
-            result.append(row_dict)
-        
-        return result
+        return [_stock_report_row(dict(row)) for row in report_data]
     except sqlite3.Error as e:
         print(f"Помилка бази даних при формуванні звіту про залишки: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 def get_requisition_summary_report(date_from: str | None = None,
                                  date_to: str | None = None,
                                  status: str | None = None,
-                                 department: str | None = None) -> list:
+                                 department: str | None = None,
+                                 conn: sqlite3.Connection | None = None,
+                                 include_items: bool = True) -> list:
     """
     Отримує дані для звіту про виконання заявок за період.
 
@@ -91,104 +264,38 @@ def get_requisition_summary_report(date_from: str | None = None,
         date_to: Дата створення заявки "до" (формат YYYY-MM-DD).
         status: Статус заявки для фільтрації.
         department: Відділення, що подало заявку, для фільтрації.
+        conn: З'єднання (якщо None, береться з пулу звітів лише для читання).
+        include_items: Додавати до кожної заявки список позицій ('items') та
+            їх статуси ('item_statuses'); без них звіт читає лише заявки.
 
     Returns:
         Список словників, де кожен словник представляє заявку.
     """
-    conn = create_connection()
-    if not conn:
-        return []
-
-    query = """
-        SELECT
-            req.id as requisition_id,
-            req.requisition_number,
-            req.creation_date,
-            req.department_requesting,
-            u_created.username as created_by_username,
-            req.status,
-            req.urgency,
-            req.last_updated,
-            u_updated.username as last_updated_by_username,
-            (SELECT COUNT(*) FROM requisition_items ri WHERE ri.requisition_id = req.id) as total_items,
-            (SELECT COUNT(*) FROM requisition_items ri 
-             WHERE ri.requisition_id = req.id AND ri.status = 'виконано') as completed_items,
-            (SELECT GROUP_CONCAT(DISTINCT ri.status) 
-             FROM requisition_items ri 
-             WHERE ri.requisition_id = req.id) as item_statuses
-        FROM requisitions req
-        LEFT JOIN users u_created ON req.created_by_user_id = u_created.id
-        LEFT JOIN users u_updated ON req.last_updated_by_user_id = u_updated.id
-    """
-    conditions = []
-    params = []
-
-    if date_from:
-        conditions.append("DATE(req.creation_date) >= DATE(?)")
-        params.append(date_from)
-    if date_to:
-        conditions.append("DATE(req.creation_date) <= DATE(?)")
-        params.append(date_to)
-    if status:
-        conditions.append("req.status = ?")
-        params.append(status)
-    if department:
-        conditions.append("req.department_requesting LIKE ?")
-        params.append(f"%{department}%")
-
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-
-    query += " ORDER BY req.creation_date DESC"
-
     try:
-        cur = conn.cursor()
-        cur.execute(query, tuple(params))
-        report_data = cur.fetchall()
-        
-        # Додаємо додаткові розрахункові поля та деталі позицій
-        result = []
-        for row in report_data:
-            row_dict = dict(row)
-            
-            # Отримуємо деталі позицій заявки
-            cur.execute("""
-                SELECT ri.*, r.name as resource_name, r.unit_of_measure
-                FROM requisition_items ri
-                LEFT JOIN resources r ON ri.resource_id = r.id
-                WHERE ri.requisition_id = ?
-            """, (row_dict['requisition_id'],))
-            items = [dict(item) for item in cur.fetchall()]
-            row_dict['items'] = items
-            
-            # Розрахунок відсотка виконання
-            row_dict['completion_percentage'] = (
-                (row_dict['completed_items'] / row_dict['total_items'] * 100)
-                if row_dict['total_items'] > 0 else 0
-            )
-            
-            # Розрахунок часу обробки
-            if row_dict['last_updated']:
-                creation_date = datetime.strptime(row_dict['creation_date'], "%Y-%m-%d %H:%M:%S")
-                last_updated = datetime.strptime(row_dict['last_updated'], "%Y-%m-%d %H:%M:%S")
-                processing_time = last_updated - creation_date
-                row_dict['processing_time_hours'] = processing_time.total_seconds() / 3600
-            else:
-                row_dict['processing_time_hours'] = None
-            
-            result.append(row_dict)
-        
-        return result
+        with snapshot_connection(conn) as conn:
+            start_ts, end_ts = date_range(date_from, date_to)
+            report_data = execute_query(
+                conn,
+                QUERY_REQUISITION_REPORT_WITH_ITEMS if include_items else QUERY_REQUISITION_REPORT,
+                start_ts=start_ts,
+                end_ts=end_ts,
+                status=status or None,
+                department=f"%{department}%" if department else None
+            ).fetchall()
+
+        return [_requisition_report_row(dict(row)) for row in report_data]
     except sqlite3.Error as e:
         print(f"Помилка бази даних при формуванні звіту по заявках: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
+    except ValueError as e:
+        print(f"Некоректний період звіту по заявках: {e}")
+        return []
 
 def get_resource_movement_report(resource_id: int | None = None,
                                date_from: str | None = None,
-                               date_to: str | None = None) -> list:
+                               date_to: str | None = None,
+                               conn: sqlite3.Connection | None = None,
+                               full_history: bool = False) -> list:
     """
     Отримує дані для звіту про рух ресурсів (надходження та видача).
 
@@ -196,78 +303,108 @@ def get_resource_movement_report(resource_id: int | None = None,
         resource_id: ID ресурсу для фільтрації (якщо None, то всі ресурси).
         date_from: Дата транзакції "від" (формат YYYY-MM-DD).
         date_to: Дата транзакції "до" (формат YYYY-MM-DD).
+        conn: З'єднання (якщо None, береться з пулу звітів лише для читання).
+        full_history: Включати транзакції з архівів завершених років.
 
     Returns:
         Список словників з інформацією про рух ресурсів.
     """
-    conn = create_connection()
-    if not conn:
-        return []
-
-    query = """
-        SELECT
-            t.id as transaction_id,
-            t.transaction_date,
-            r.id as resource_id,
-            r.name as resource_name,
-            c.name as category_name,
-            t.transaction_type,
-            t.quantity_changed,
-            r.unit_of_measure,
-            t.recipient_department,
-            u.username as issued_by_username,
-            t.notes,
-            req.requisition_number
-        FROM transactions t
-        JOIN resources r ON t.resource_id = r.id
-        JOIN categories c ON r.category_id = c.id
-        LEFT JOIN users u ON t.issued_by_user_id = u.id
-        LEFT JOIN requisitions req ON t.requisition_id = req.id
-    """
-    conditions = []
-    params = []
-
-    if resource_id is not None:
-        conditions.append("t.resource_id = ?")
-        params.append(resource_id)
-    if date_from:
-        conditions.append("DATE(t.transaction_date) >= DATE(?)")
-        params.append(date_from)
-    if date_to:
-        conditions.append("DATE(t.transaction_date) <= DATE(?)")
-        params.append(date_to)
-
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-
-    query += " ORDER BY t.transaction_date DESC"
-
     try:
-        cur = conn.cursor()
-        cur.execute(query, tuple(params))
-        transactions = cur.fetchall()
+        start_ts, end_ts = date_range(date_from, date_to)
+        with snapshot_connection(conn, full_history, start_ts, end_ts) as conn:
+            transactions = execute_query(
+                conn, _movement_query(resource_id, full_history),
+                **({"resource_id": resource_id} if resource_id is not None else {}),
+                start_ts=start_ts, end_ts=end_ts
+            ).fetchall()
+            # Підсумкова статистика з денних підсумків у тому ж знімку
+            # і за ті самі роки, що й перелік транзакцій
+            summary = execute_query(
+                conn, QUERY_MOVEMENT_SUMMARY,
+                resource_id=resource_id, start_ts=start_ts, end_ts=end_ts,
+                archived_years=None if full_history else json.dumps(archived_years(conn))
+            ).fetchone()
         
-        # Додаємо підсумкову статистику
         result = {
             'transactions': [dict(t) for t in transactions],
-            'summary': {
-                'total_incoming': sum(t['quantity_changed'] for t in transactions 
-                                   if t['transaction_type'] == 'надходження'),
-                'total_outgoing': sum(abs(t['quantity_changed']) for t in transactions 
-                                   if t['transaction_type'] == 'видача'),
-                'departments_served': len(set(t['recipient_department'] for t in transactions 
-                                           if t['recipient_department'])),
-                'unique_resources': len(set(t['resource_id'] for t in transactions))
-            }
+            'summary': dict(summary)
         }
         
         return result
     except sqlite3.Error as e:
         print(f"Помилка бази даних при формуванні звіту про рух ресурсів: {e}")
         return {'transactions': [], 'summary': {}}
-    finally:
-        if conn:
-            conn.close()
+    except ValueError as e:
+        print(f"Некоректний період звіту про рух ресурсів: {e}")
+        return {'transactions': [], 'summary': {}}
+
+# --- Потокові варіанти звітів ---
+# Рядки читаються порціями по arraysize в межах одного знімка WAL, який
+# утримується, доки генератор не вичерпано або не закрито. Помилки бази
+# даних не перехоплюються: частину рядків уже могло бути віддано.
+# Некоректна дата періоду — ValueError (див. date_range).
+
+def iter_current_resource_stock_report(category_id: int | None = None,
+                                       conn: sqlite3.Connection | None = None,
+                                       arraysize: int = DEFAULT_ARRAYSIZE):
+    """
+    Потоковий варіант get_current_resource_stock_report.
+
+    Yields:
+        Словники ресурсів з total_value та stock_status.
+    """
+    with snapshot_connection(conn) as conn:
+        for row_dict in iter_query(conn, QUERY_STOCK_REPORT, arraysize, category_id=category_id):
+            yield _stock_report_row(row_dict)
+
+def iter_requisition_summary_report(date_from: str | None = None,
+                                    date_to: str | None = None,
+                                    status: str | None = None,
+                                    department: str | None = None,
+                                    conn: sqlite3.Connection | None = None,
+                                    arraysize: int = DEFAULT_ARRAYSIZE,
+                                    include_items: bool = True):
+    """
+    Потоковий варіант get_requisition_summary_report.
+
+    Yields:
+        Словники заявок з відсотком виконання, часом обробки та (якщо
+        include_items) позиціями.
+    """
+    start_ts, end_ts = date_range(date_from, date_to)
+    with snapshot_connection(conn) as conn:
+        for row_dict in iter_query(
+            conn,
+            QUERY_REQUISITION_REPORT_WITH_ITEMS if include_items else QUERY_REQUISITION_REPORT,
+            arraysize,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            status=status or None,
+            department=f"%{department}%" if department else None
+        ):
+            yield _requisition_report_row(row_dict)
+
+def iter_resource_movement_report(resource_id: int | None = None,
+                                  date_from: str | None = None,
+                                  date_to: str | None = None,
+                                  conn: sqlite3.Connection | None = None,
+                                  arraysize: int = DEFAULT_ARRAYSIZE,
+                                  as_tuples: bool = False,
+                                  full_history: bool = False):
+    """
+    Потоковий варіант get_resource_movement_report: лише транзакції, без
+    підсумків (їх можна накопичити під час обходу).
+
+    Yields:
+        Транзакції (словники або, якщо as_tuples, кортежі) від найновіших.
+    """
+    start_ts, end_ts = date_range(date_from, date_to)
+    with snapshot_connection(conn, full_history, start_ts, end_ts) as conn:
+        yield from iter_query(
+            conn, _movement_query(resource_id, full_history), arraysize, as_tuples,
+            **({"resource_id": resource_id} if resource_id is not None else {}),
+            start_ts=start_ts, end_ts=end_ts
+        )
 
 if __name__ == '__main__':
     # Тестування функцій звітності
@@ -308,7 +445,7 @@ if __name__ == '__main__':
             for item in req['items']:
                 print(f"- {item['requested_resource_name']}: "
                       f"{item['quantity_requested']} {item['unit_of_measure'] or ''} "
-                      f"({item['status']})")
+                      f"({item['item_status']})")
     else:
         print("Немає даних для звіту по заявках.")
 
@@ -4,21 +4,191 @@
 Модуль для роботи з заявками в системі обліку військового майна.
 """
 
+import json
 import sqlite3
-from datetime import datetime, timedelta
-import os
 import sys
+from datetime import datetime, timedelta
 
-# Add parent directory to Python path for imports
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-if parent_dir not in sys.path:
-    sys.path.append(parent_dir)
+# Відносні імпорти, як в інших модулях logic: абсолютні `logic.*` у пакеті
+# military_resource_app.logic завантажували б другу копію модулів (окремі
+# пул з'єднань, реєстр запитів і лічильник записів)
+from .db_manager import create_connection, create_tables, pooled_connection
+from .db_writer import run_write
+from .migrations import REQUISITION_SEARCH_INSERT_SQL
+from .sequences import next_requisition_number
+from .transaction_handler import InsufficientQuantityError, TransactionError, apply_stock_movement
+from .query_registry import (
+    DEFAULT_ARRAYSIZE, date_range, execute_query, executemany_query, fts_match, iter_query,
+    optional_filter, optional_range_filter, range_filter, register_query
+)
+
+# Запит списку заявок: усі фільтри необов'язкові (NULL = не діє).
+# Перелік і кількість позицій зберігаються в самій заявці (міграції 10, 11).
+# {source}, {date_filter}, {search} та {order} відрізняють список від пошуку
+_REQUISITIONS_SQL = f"""
+    SELECT
+        r.id, r.requisition_number,
+        r.author_manual_rank,
+        r.author_manual_lastname,
+        r.author_manual_initials,
+        u_creator.username as system_user_creator, 
+        r.department_requesting,
+        r.creation_date, r.status, r.urgency,
+        r.purpose_description,
+        r.requisition_type,
+        r.items_total, r.items_done, r.items_partial, r.items_rejected,
+        r.item_summary
+    FROM {{source}}
+    LEFT JOIN users u_creator ON r.created_by_user_id = u_creator.id 
+    WHERE {optional_filter("r.created_by_user_id", "created_by_user_id")}
+      AND {{date_filter}}
+      AND {optional_filter("r.status", "status")}
+      AND {optional_filter("r.urgency", "urgency")}
+      AND {optional_filter("r.requisition_type", "requisition_type")}{{search}}
+    ORDER BY {{order}} LIMIT :limit OFFSET :offset
+"""
 
-from logic.db_manager import create_connection, create_tables
+# Ваги bm25 колонок requisitions_fts (див. migrations.REQUISITION_SEARCH_COLUMNS):
+# номер, підрозділ, мета, тип, прізвище автора, назви позицій
+REQUISITION_SEARCH_WEIGHTS = (10.0, 3.0, 1.0, 2.0, 5.0, 1.0)
+
+QUERY_REQUISITIONS = register_query("requisitions.list", _REQUISITIONS_SQL.format(
+    source="requisitions r",
+    date_filter=range_filter("r.creation_ts"),
+    search="",
+    order="r.creation_ts DESC",
+))
+
+# Пошук через повнотекстовий індекс: найрелевантніші заявки першими, за
+# однакової релевантності — новіші (за id, без обчислення creation_ts)
+QUERY_REQUISITIONS_SEARCH = register_query("requisitions.search", _REQUISITIONS_SQL.format(
+    source="requisitions_fts JOIN requisitions r ON r.id = requisitions_fts.rowid",
+    date_filter=optional_range_filter("r.creation_ts"),
+    search="\n      AND requisitions_fts MATCH :match",
+    order=f"bm25(requisitions_fts, {', '.join(map(str, REQUISITION_SEARCH_WEIGHTS))}), r.id DESC",
+))
+
+def _requisition_list_query(search_term: str | None) -> tuple:
+    """(назва запиту, додаткові параметри) для списку заявок з пошуком або без."""
+    match = fts_match(search_term)
+    if match:
+        return QUERY_REQUISITIONS_SEARCH, {"match": match}
+    return QUERY_REQUISITIONS, {}
+
+# Документ заявки в повнотекстовому індексі (пакетна вставка позицій)
+QUERY_REQUISITION_SEARCH_DELETE = register_query("requisitions_fts.delete", """
+    DELETE FROM requisitions_fts WHERE rowid = :requisition_id
+""")
+
+QUERY_REQUISITION_SEARCH_INSERT = register_query(
+    "requisitions_fts.insert", REQUISITION_SEARCH_INSERT_SQL + "\n        WHERE r.id = :requisition_id"
+)
+
+QUERY_RESOURCES_BY_IDS = register_query("resources.by_ids", """
+    SELECT r.id, r.name, r.unit_of_measure
+    FROM resources r
+    JOIN json_each(:resource_ids) j ON r.id = j.value
+""")
+
+QUERY_INSERT_REQUISITION_ITEM = register_query("requisition_items.insert", """
+    INSERT INTO requisition_items (
+        requisition_id, resource_id, requested_resource_name,
+        quantity_requested, unit_of_measure, justification, item_status
+    ) VALUES (
+        :requisition_id, :resource_id, :requested_resource_name,
+        :quantity_requested, :unit_of_measure, :justification, 'очікує'
+    )
+""")
+
+QUERY_REQUISITION_ITEM_COUNTERS = register_query("requisitions.item_counters", """
+    SELECT r.id, r.status, r.items_total, r.items_done, r.items_partial, r.items_rejected
+    FROM requisitions r
+    JOIN json_each(:requisition_ids) j ON r.id = j.value
+""")
+
+QUERY_SET_REQUISITION_STATUS = register_query("requisitions.set_status", """
+    UPDATE requisitions
+    SET status = :status,
+        last_updated = datetime('now'),
+        last_updated_by_user_id = COALESCE(:updated_by_user_id, last_updated_by_user_id)
+    WHERE id = :requisition_id
+""")
+
+def _clean_text(value) -> str | None:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def add_items_to_requisition(conn: sqlite3.Connection, requisition_id: int, items: list) -> int:
+    """
+    Додає позиції до заявки одним executemany у транзакції викликача (без коміту).
+
+    Спершу перевіряються всі позиції, потім одним запитом знаходяться всі
+    вказані ресурси. Ресурс, якого немає в базі, не прив'язується
+    (resource_id = NULL); назва та одиниця виміру за замовчуванням беруться
+    з ресурсу.
+
+    Args:
+        conn: З'єднання (зазвичай всередині завдання run_write).
+        requisition_id: ID заявки.
+        items: Словники з ключами requested_resource_name, quantity_requested,
+            resource_id, unit_of_measure, justification (необов'язкові, крім кількості).
+
+    Returns:
+        Кількість доданих позицій.
+
+    Raises:
+        ValueError: некоректна позиція (з її номером) або заявку не знайдено.
+    """
+    for index, item in enumerate(items, start=1):
+        quantity = item.get('quantity_requested')
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+            raise ValueError(f"Позиція {index}: кількість має бути цілим додатним числом")
+        resource_id = item.get('resource_id')
+        if resource_id is not None and not isinstance(resource_id, int):
+            raise ValueError(f"Позиція {index}: некоректний ID ресурсу {resource_id!r}")
+        if resource_id is None and not _clean_text(item.get('requested_resource_name')):
+            raise ValueError(f"Позиція {index}: вкажіть назву ресурсу або оберіть існуючий")
+    if not items:
+        return 0
+    if not conn.execute("SELECT 1 FROM requisitions WHERE id = ?", (requisition_id,)).fetchone():
+        raise ValueError(f"Заявку з ID {requisition_id} не знайдено")
+
+    resource_ids = {item['resource_id'] for item in items if item.get('resource_id') is not None}
+    resources = {}
+    if resource_ids:
+        resources = {
+            row['id']: row for row in execute_query(
+                conn, QUERY_RESOURCES_BY_IDS, resource_ids=json.dumps(sorted(resource_ids))
+            )
+        }
+
+    rows = []
+    for index, item in enumerate(items, start=1):
+        resource = resources.get(item.get('resource_id'))
+        name = _clean_text(item.get('requested_resource_name')) or (resource['name'] if resource else None)
+        if not name:
+            raise ValueError(f"Позиція {index}: ресурс з ID {item['resource_id']} не знайдено")
+        rows.append({
+            'requisition_id': requisition_id,
+            'resource_id': resource['id'] if resource else None,
+            'requested_resource_name': name,
+            'quantity_requested': item['quantity_requested'],
+            'unit_of_measure': _clean_text(item.get('unit_of_measure'))
+                               or (resource['unit_of_measure'] if resource else None),
+            'justification': _clean_text(item.get('justification')),
+        })
+    # Тригер індексу переіндексовує документ заявки на кожній позиції;
+    # без документа він нічого не робить, і документ будується один раз
+    execute_query(conn, QUERY_REQUISITION_SEARCH_DELETE, requisition_id=requisition_id)
+    executemany_query(conn, QUERY_INSERT_REQUISITION_ITEM, rows)
+    execute_query(conn, QUERY_REQUISITION_SEARCH_INSERT, requisition_id=requisition_id)
+    return len(rows)
 
 def create_requisition(conn: sqlite3.Connection, user_id: int, department: str,
-                      urgency: str, purpose_description: str | None = None) -> int | None:
+                      urgency: str, purpose_description: str | None = None,
+                      items: list | None = None) -> int | None:
     """
     Створює нову заявку.
 
@@ -28,17 +198,19 @@ def create_requisition(conn: sqlite3.Connection, user_id: int, department: str,
         department: Відділення, що подає заявку.
         urgency: Терміновість заявки.
         purpose_description: Опис призначення (опціонально).
+        items: Позиції заявки (див. add_items_to_requisition); додаються
+            в тій самій транзакції, що й заявка.
 
     Returns:
         ID створеної заявки або None у разі помилки.
+
+    Raises:
+        ValueError: некоректна позиція; заявку не створено.
     """
-    try:
-        print(f"[DEBUG] Створення заявки для користувача {user_id}, відділ {department}")
-        cur = conn.cursor()
-        # Генеруємо номер заявки (можна модифікувати логіку за потреби)
-        cur.execute("SELECT COUNT(*) + 1 as next_num FROM requisitions")
-        next_num = cur.fetchone()['next_num']
-        requisition_number = f"REQ-{datetime.now().strftime('%Y%m')}-{next_num:04d}"
+    def _insert(write_conn: sqlite3.Connection) -> int:
+        cur = write_conn.cursor()
+        # Номер з місячного лічильника в тій самій транзакції, що й вставка
+        requisition_number = next_requisition_number(write_conn)
         print(f"[DEBUG] Згенерований номер заявки: {requisition_number}")
 
         cur.execute("""
@@ -47,10 +219,15 @@ def create_requisition(conn: sqlite3.Connection, user_id: int, department: str,
                 creation_date, status, urgency, purpose_description
             ) VALUES (?, ?, ?, datetime('now'), 'нова', ?, ?)
         """, (requisition_number, user_id, department, urgency, purpose_description))
-        
-        new_id = cur.lastrowid
+        requisition_id = cur.lastrowid
+        if items:
+            add_items_to_requisition(write_conn, requisition_id, items)
+        return requisition_id
+
+    try:
+        print(f"[DEBUG] Створення заявки для користувача {user_id}, відділ {department}")
+        new_id = run_write(_insert, conn)
         print(f"[DEBUG] Заявка успішно створена з ID: {new_id}")
-        conn.commit()
         return new_id
     except sqlite3.Error as e:
         print(f"[ERROR] Помилка створення заявки: {e}")
@@ -60,47 +237,26 @@ def create_requisition(conn: sqlite3.Connection, user_id: int, department: str,
 
 def add_item_to_requisition(conn: sqlite3.Connection, requisition_id: int,
                           resource_id: int | None, resource_name: str,
-                          quantity_requested: float, notes: str | None = None) -> bool:
+                          quantity_requested: int, notes: str | None = None) -> bool:
     """
-    Додає позицію до заявки.
+    Додає одну позицію до заявки та фіксує транзакцію.
 
-    Args:
-        conn: З'єднання з базою даних.
-        requisition_id: ID заявки.
-        resource_id: ID ресурсу (якщо вибрано з існуючих).
-        resource_name: Назва ресурсу.
-        quantity_requested: Запитувана кількість.
-        notes: Додаткові примітки.
+    Для кількох позицій використовуйте add_items_to_requisition.
 
     Returns:
         True якщо успішно, False у разі помилки.
     """
     try:
-        print(f"[DEBUG] Додавання позиції до заявки {requisition_id}:")
-        print(f"[DEBUG] Ресурс: {resource_name} (ID: {resource_id})")
-        print(f"[DEBUG] Кількість: {quantity_requested}")
-        
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO requisition_items (
-                requisition_id, resource_id, requested_resource_name,
-                quantity_requested, item_status, justification
-            ) VALUES (?, ?, ?, ?, 'очікує', ?)
-        """, (requisition_id, resource_id, resource_name, quantity_requested, notes))
-        
+        add_items_to_requisition(conn, requisition_id, [{
+            'resource_id': resource_id,
+            'requested_resource_name': resource_name,
+            'quantity_requested': quantity_requested,
+            'justification': notes,
+        }])
         conn.commit()
-        print(f"[DEBUG] Позицію успішно додано")
         return True
-        
-    except sqlite3.Error as e:
+    except (sqlite3.Error, ValueError) as e:
         print(f"[ERROR] Помилка додавання позиції до заявки: {e}")
-        print(f"[ERROR] SQL State: {e.sqlite_errorcode if hasattr(e, 'sqlite_errorcode') else 'Unknown'}")
-        print(f"[ERROR] Extended Error Code: {e.sqlite_errorname if hasattr(e, 'sqlite_errorname') else 'Unknown'}")
-        if conn:
-            conn.rollback()
-        return False
-    except Exception as e:
-        print(f"[ERROR] Неочікувана помилка: {e}")
         if conn:
             conn.rollback()
         return False
@@ -158,15 +314,17 @@ def update_requisition_status(conn: sqlite3.Connection, requisition_id: int,
     Returns:
         True якщо успішно, False у разі помилки.
     """
-    try:
-        conn.execute("""
+    def _update(write_conn: sqlite3.Connection):
+        write_conn.execute("""
             UPDATE requisitions
             SET status = ?,
                 last_updated = datetime('now'),
                 last_updated_by_user_id = ?
             WHERE id = ?
         """, (new_status, updated_by_user_id, requisition_id))
-        conn.commit()
+
+    try:
+        run_write(_update, conn)
         return True
     except sqlite3.Error as e:
         print(f"Помилка оновлення статусу заявки: {e}")
@@ -187,93 +345,131 @@ def process_requisition_item_execution(conn: sqlite3.Connection, item_id: int,
     Returns:
         True якщо успішно, False у разі помилки.
     """
-    try:
+    def _execute(write_conn: sqlite3.Connection) -> bool:
         # Отримуємо інформацію про позицію
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT ri.*, r.quantity as available_quantity
+        item = write_conn.execute("""
+            SELECT ri.id, ri.requisition_id, ri.resource_id, req.department_requesting
             FROM requisition_items ri
-            LEFT JOIN resources r ON ri.resource_id = r.id
+            JOIN requisitions req ON ri.requisition_id = req.id
             WHERE ri.id = ?
-        """, (item_id,))
-        item = cur.fetchone()
+        """, (item_id,)).fetchone()
 
         if not item:
             print("Позицію не знайдено")
             return False
 
-        # Перевіряємо наявність ресурсу
+        # Списуємо ресурс умовним UPDATE (перевірка залишку в тому ж операторі)
         if item['resource_id'] is not None:
-            if item['available_quantity'] < quantity_executed:
-                print("Недостатньо ресурсу для виконання")
-                return False
-
-            # Оновлюємо кількість ресурсу
-            conn.execute("""
-                UPDATE resources
-                SET quantity = quantity - ?
-                WHERE id = ?
-            """, (quantity_executed, item['resource_id']))
+            apply_stock_movement(
+                write_conn, item['resource_id'], 'видача', quantity_executed,
+                issued_by_user_id=executed_by_user_id,
+                recipient_department=item['department_requesting'],
+                requisition_item_id=item_id
+            )
 
         # Оновлюємо статус позиції
         new_status = 'виконано'
 
-        conn.execute("""
+        write_conn.execute("""
             UPDATE requisition_items
             SET item_status = ?,
                 last_executed = datetime('now'),
                 last_executed_by_user_id = ?
             WHERE id = ?
         """, (new_status, executed_by_user_id, item_id))
-
-        conn.commit()
+        rollup_requisition_status(write_conn, item['requisition_id'], executed_by_user_id)
         return True
+
+    try:
+        return run_write(_execute, conn)
+    except InsufficientQuantityError:
+        print("Недостатньо ресурсу для виконання")
+        return False
+    except TransactionError as e:
+        print(f"Помилка обробки виконання позиції: {e}")
+        return False
     except sqlite3.Error as e:
         print(f"Помилка обробки виконання позиції: {e}")
         return False
 
+def overall_requisition_status(items_total: int, items_done: int,
+                               items_partial: int, items_rejected: int) -> str | None:
+    """
+    Загальний статус заявки за лічильниками позицій.
+
+    Returns:
+        'виконано', якщо кожна позиція виконана або відхилена (і хоча б
+        одна виконана), 'частково виконано', якщо є виконані чи частково
+        виконані позиції, або None — статус не залежить від позицій.
+    """
+    if items_done and items_done + items_rejected == items_total:
+        return 'виконано'
+    if items_done or items_partial:
+        return 'частково виконано'
+    return None
+
+def rollup_requisition_statuses(conn: sqlite3.Connection, requisition_ids,
+                                updated_by_user_id: int | None = None) -> set:
+    """
+    Оновлює загальний статус заявок за лічильниками позицій.
+
+    Викликати всередині транзакції запису, у якій змінено статуси позицій
+    (тригери вже оновили лічильники). Використовується і видачею однієї
+    позиції, і пакетним розподілом (logic/allocation.py).
+
+    Returns:
+        ID заявок, що існують і мають позиції.
+    """
+    updates = []
+    found = set()
+    for counters in execute_query(
+        conn, QUERY_REQUISITION_ITEM_COUNTERS, requisition_ids=json.dumps(sorted(set(requisition_ids)))
+    ):
+        if counters['items_total'] == 0:
+            continue
+        found.add(counters['id'])
+        new_status = overall_requisition_status(
+            counters['items_total'], counters['items_done'],
+            counters['items_partial'], counters['items_rejected']
+        )
+        if new_status is not None and new_status != counters['status']:
+            updates.append({
+                "requisition_id": counters['id'],
+                "status": new_status,
+                "updated_by_user_id": updated_by_user_id,
+            })
+    if updates:
+        executemany_query(conn, QUERY_SET_REQUISITION_STATUS, updates)
+    return found
+
+def rollup_requisition_status(conn: sqlite3.Connection, requisition_id: int,
+                              updated_by_user_id: int | None = None) -> bool:
+    """
+    Оновлює загальний статус однієї заявки (див. rollup_requisition_statuses).
+
+    Повертає False, якщо заявки немає або вона без позицій.
+    """
+    return requisition_id in rollup_requisition_statuses(conn, [requisition_id], updated_by_user_id)
+
 def check_and_update_overall_requisition_status(conn: sqlite3.Connection,
                                               requisition_id: int) -> bool:
     """
     Перевіряє та оновлює загальний статус заявки на основі статусів її позицій.
 
+    Статуси позицій не перечитуються: лічильники items_total, items_done,
+    items_partial та items_rejected ведуть тригери на requisition_items
+    (міграції 10, 12).
+
     Args:
         conn: З'єднання з базою даних.
         requisition_id: ID заявки.
 
     Returns:
-        True якщо успішно, False у разі помилки.
+        True якщо успішно, False якщо заявки немає, вона без позицій або
+        сталася помилка.
     """
     try:
-        cur = conn.cursor()
-        # Отримуємо статуси всіх позицій
-        cur.execute("""
-            SELECT status
-            FROM requisition_items
-            WHERE requisition_id = ?
-        """, (requisition_id,))
-        statuses = [row['status'] for row in cur.fetchall()]
-
-        if not statuses:
-            return False
-
-        # Визначаємо загальний статус
-        if all(s == 'виконано' for s in statuses):
-            new_status = 'виконано'
-        elif any(s in ('виконано', 'частково виконано') for s in statuses):
-            new_status = 'частково виконано'
-        else:
-            return True  # Залишаємо поточний статус
-
-        # Оновлюємо статус заявки
-        conn.execute("""
-            UPDATE requisitions
-            SET status = ?,
-                last_updated = datetime('now')
-            WHERE id = ?
-        """, (new_status, requisition_id))
-        conn.commit()
-        return True
+        return run_write(lambda write_conn: rollup_requisition_status(write_conn, requisition_id), conn)
     except sqlite3.Error as e:
         print(f"Помилка оновлення загального статусу заявки: {e}")
         return False
@@ -283,75 +479,34 @@ def get_requisitions(date_from: str | None = None, date_to: str | None = None,
                      search_term: str | None = None,
                      created_by_user_id: int | None = None,
                      requisition_type_filter: str | None = None,
-                     limit: int = 100, offset: int = 0) -> list:
-    conn = None
-    try:
-        conn = create_connection()
-        if not conn:
-            print("[ERROR] get_requisitions: Не вдалося створити з'єднання з БД.")
-            return []
-
-        base_query = """
-            SELECT
-                r.id, r.requisition_number,
-                r.author_manual_rank,
-                r.author_manual_lastname,
-                r.author_manual_initials,
-                u_creator.username as system_user_creator, 
-                r.department_requesting,
-                r.creation_date, r.status, r.urgency,
-                r.purpose_description,
-                r.requisition_type,
-                (
-                    SELECT GROUP_CONCAT(ri.requested_resource_name || ' (' || ri.quantity_requested || COALESCE(' ' || ri.unit_of_measure, '') || ')', '; ')
-                    FROM (
-                        SELECT ri_sub.requested_resource_name, ri_sub.quantity_requested, ri_sub.unit_of_measure
-                        FROM requisition_items ri_sub
-                        WHERE ri_sub.requisition_id = r.id
-                        ORDER BY ri_sub.id LIMIT 3
-                    ) AS ri
-                ) as item_summary
-            FROM requisitions r
-            LEFT JOIN users u_creator ON r.created_by_user_id = u_creator.id 
-        """
-
-        conditions = []
-        params = []
-
-        if created_by_user_id is not None:
-            conditions.append("r.created_by_user_id = ?")
-            params.append(created_by_user_id)
-
-        if date_from: conditions.append("DATE(r.creation_date) >= DATE(?)"); params.append(date_from)
-        if date_to: conditions.append("DATE(r.creation_date) <= DATE(?)"); params.append(date_to)
-        if status: conditions.append("r.status = ?"); params.append(status)
-        if urgency: conditions.append("r.urgency = ?"); params.append(urgency)
-        if requisition_type_filter: conditions.append("r.requisition_type = ?"); params.append(requisition_type_filter)
-
-        if search_term:
-            conditions.append("""
-                (r.requisition_number LIKE ? OR
-                 r.department_requesting LIKE ? OR
-                 r.purpose_description LIKE ? OR 
-                 r.requisition_type LIKE ? OR
-                 r.author_manual_lastname LIKE ? OR 
-                 EXISTS (SELECT 1 FROM requisition_items ri_search
-                         WHERE ri_search.requisition_id = r.id AND ri_search.requested_resource_name LIKE ?))
-            """)
-            like_term = f"%{search_term}%"
-            params.extend([like_term, like_term, like_term, like_term, like_term, like_term])
-        
-        if conditions:
-            base_query += " WHERE " + " AND ".join(conditions)
+                     limit: int = 100, offset: int = 0,
+                     conn: sqlite3.Connection | None = None) -> list:
+    """
+    Список заявок за фільтрами, від найновіших.
 
-        base_query += " ORDER BY r.creation_date DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+    search_term шукається в повнотекстовому індексі requisitions_fts (номер,
+    підрозділ, мета, тип, прізвище автора, назви позицій): кожне слово —
+    як початок слова в будь-якому з полів, результати впорядковані за
+    релевантністю.
+    """
+    try:
+        start_ts, end_ts = date_range(date_from, date_to)
+        params = dict(
+            created_by_user_id=created_by_user_id,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            status=status or None,
+            urgency=urgency or None,
+            requisition_type=requisition_type_filter or None,
+            limit=limit,
+            offset=offset
+        )
+        query, search_params = _requisition_list_query(search_term)
+        params.update(search_params)
 
-        cur = conn.cursor()
-        print(f"[DEBUG] SQL Query (get_requisitions):\n{base_query}")
         print(f"[DEBUG] Parameters (get_requisitions): {params}")
-        cur.execute(base_query, tuple(params))
-        requisitions_rows = cur.fetchall()
+        with pooled_connection(conn) as conn:
+            requisitions_rows = execute_query(conn, query, **params).fetchall()
         print(f"[DEBUG] Отримано {len(requisitions_rows)} заявок з БД (get_requisitions).")
         return [dict(row) for row in requisitions_rows]
     except sqlite3.Error as e:
@@ -361,12 +516,49 @@ def get_requisitions(date_from: str | None = None, date_to: str | None = None,
         import traceback
         traceback.print_exc()
         return []
-    finally:
-        if conn:
-            conn.close()
+    except ValueError as e:
+        print(f"[ERROR] Некоректний фільтр заявок (get_requisitions): {e}")
+        return []
+
+def iter_requisitions(date_from: str | None = None, date_to: str | None = None,
+                      status: str | None = None, urgency: str | None = None,
+                      search_term: str | None = None,
+                      created_by_user_id: int | None = None,
+                      requisition_type_filter: str | None = None,
+                      limit: int = -1, offset: int = 0,
+                      conn: sqlite3.Connection | None = None,
+                      arraysize: int = DEFAULT_ARRAYSIZE,
+                      as_tuples: bool = False):
+    """
+    Потоковий варіант get_requisitions: заявки читаються порціями по
+    arraysize (за замовчуванням без обмеження кількості, limit=-1).
+
+    З'єднання з пулу утримується, доки генератор не вичерпано або не закрито.
+    Помилки бази даних не перехоплюються; некоректна дата — ValueError
+    (див. date_range).
+
+    Yields:
+        Заявки (словники або, якщо as_tuples, кортежі) від найновіших,
+        а з search_term — від найрелевантніших.
+    """
+    start_ts, end_ts = date_range(date_from, date_to)
+    query, search_params = _requisition_list_query(search_term)
+    with pooled_connection(conn) as conn:
+        yield from iter_query(
+            conn, query, arraysize, as_tuples,
+            created_by_user_id=created_by_user_id,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            status=status or None,
+            urgency=urgency or None,
+            requisition_type=requisition_type_filter or None,
+            limit=limit,
+            offset=offset,
+            **search_params
+        )
 
 if __name__ == '__main__':
-    # Тестування функцій
+    # Тестування функцій: python -m logic.requisition_handler
     conn = create_connection()
     if conn:
         print("\nТестування get_requisitions з фільтрами...")
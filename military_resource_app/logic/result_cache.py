@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Кеш результатів читання з точною інвалідацією.
+
+Інтерфейс повторно виконує ті самі запити (перемикання вкладок,
+перевірка попереджень після кожної зміни). ResultCache зберігає результат
+виклику функції за ключем (функція, аргументи) разом з версією даних:
+
+    - PRAGMA data_version окремого з'єднання-"зонда", яке нічого не пише:
+      значення змінюється після коміту будь-якого іншого з'єднання, зокрема
+      з іншого процесу, що працює з тим самим файлом БД;
+    - лічильник записів процесу (db_writer.get_write_generation), який
+      збільшується після кожного коміту через run_write.
+
+Якщо версія не змінилася, повторне читання повертає збережений результат
+без звернення до таблиць. Кеш обмежений кількістю записів та приблизним
+обсягом пам'яті; найдавніше використані записи витісняються (LRU).
+
+Збережені результати спільні для всіх викликачів, тому їх не можна
+змінювати на місці.
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .db_manager import get_pool
+from .db_writer import get_write_generation
+
+# Межі кешу: кількість записів та приблизний обсяг у байтах
+RESULT_CACHE_ENTRIES = int(os.environ.get("MILITARY_DB_RESULT_CACHE_ENTRIES", "256"))
+RESULT_CACHE_BYTES = int(os.environ.get("MILITARY_DB_RESULT_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# Замінює з'єднання в ключі: результат не залежить від того, через яке
+# з'єднання з тим самим файлом прочитано зафіксовані дані
+_CONN = object()
+
+def _approx_size(value, depth: int = 0) -> int:
+    """Приблизний розмір результату в байтах (контейнери та їх елементи)."""
+    size = sys.getsizeof(value)
+    if depth > 3:
+        return size
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + _approx_size(item, depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset, sqlite3.Row)):
+        for item in value:
+            size += _approx_size(item, depth + 1)
+    return size
+
+def _freeze(value):
+    """Перетворює аргумент на хешовану форму для ключа кешу."""
+    if isinstance(value, sqlite3.Connection):
+        return _CONN
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+class ResultCache:
+    """LRU-кеш результатів функцій читання з перевіркою версії даних."""
+
+    def __init__(self, max_entries=RESULT_CACHE_ENTRIES, max_bytes=RESULT_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._probes = {}
+        self._probe_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def data_version(self, db_file: str) -> tuple:
+        """Версія даних файлу БД: (PRAGMA data_version зонда, лічильник записів)."""
+        generation = get_write_generation()
+        with self._probe_lock:
+            probe = self._probes.get(db_file)
+            if probe is None:
+                probe = self._probes[db_file] = sqlite3.connect(db_file, check_same_thread=False)
+                probe.execute("PRAGMA query_only = ON")
+            return probe.execute("PRAGMA data_version").fetchone()[0], generation
+
+    def call(self, db_file: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Повертає func(*args, **kwargs) з кешу або виконує виклик і кешує результат.
+
+        З'єднання серед аргументів не входять до ключа. Якщо з'єднання має
+        незафіксовану транзакцію, кеш обходиться: воно бачить дані, яких
+        немає в інших з'єднань.
+        """
+        if any(isinstance(arg, sqlite3.Connection) and arg.in_transaction
+               for arg in (*args, *kwargs.values())):
+            return func(*args, **kwargs)
+        try:
+            key = (db_file, func, _freeze(args), _freeze(kwargs))
+            hash(key)
+        except TypeError:
+            # Нехешовані аргументи — виконуємо без кешу
+            return func(*args, **kwargs)
+
+        # Версію беремо до читання: якщо дані зміняться під час виклику,
+        # наступна перевірка побачить нову версію і результат буде перечитано
+        version = self.data_version(db_file)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+
+        value = func(*args, **kwargs)
+        self._store(key, version, value)
+        return value
+
+    def _store(self, key, version: tuple, value):
+        size = _approx_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (version, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def clear(self):
+        """Видаляє всі збережені результати."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def close(self):
+        """Очищає кеш і закриває з'єднання-зонди."""
+        self.clear()
+        with self._probe_lock:
+            probes, self._probes = self._probes, {}
+        for probe in probes.values():
+            probe.close()
+
+    def stats(self) -> dict:
+        """Повертає статистику кешу."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+_result_cache = ResultCache()
+
+def get_result_cache() -> ResultCache:
+    """Повертає спільний для процесу кеш результатів."""
+    return _result_cache
+
+def cached_call(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Виконує функцію читання через кеш для бази даних пулу з'єднань."""
+    return _result_cache.call(get_pool().db_file, func, *args, **kwargs)
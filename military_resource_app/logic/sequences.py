@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Лічильники (послідовності) для номерів документів.
+
+Таблиця sequences зберігає останнє видане значення кожного лічильника.
+Наступне значення видає один оператор UPSERT ... RETURNING, тому читання
+та збільшення атомарні і виконуються в тій самій транзакції запису, що й
+вставка документа: два термінали не можуть отримати однаковий номер, а
+номер не "згорає", якщо транзакцію відкочено.
+
+Номери заявок мають вигляд REQ-YYYYMM-NNNN з окремим лічильником на кожен
+місяць. reserve_requisition_numbers() заздалегідь резервує блок номерів
+для пакетного або автономного створення заявок.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import List, Optional
+
+from .db_writer import run_write
+from .query_registry import execute_query, register_query
+
+QUERY_SEQUENCE_ADVANCE = register_query("sequences.advance", """
+    INSERT INTO sequences (name, value) VALUES (:sequence_name, :count)
+    ON CONFLICT (name) DO UPDATE SET value = value + excluded.value
+    RETURNING value
+""")
+
+REQUISITION_PREFIX = "REQ"
+
+def advance_sequence(conn: sqlite3.Connection, name: str, count: int = 1) -> int:
+    """
+    Збільшує лічильник name на count і повертає перше з виданих значень.
+
+    Викликати всередині транзакції запису (завдання run_write), у якій
+    використовується отримане значення.
+    """
+    if count < 1:
+        raise ValueError("Кількість значень має бути додатною")
+    last = execute_query(conn, QUERY_SEQUENCE_ADVANCE, sequence_name=name, count=count).fetchone()[0]
+    return last - count + 1
+
+def requisition_sequence_name(when: Optional[datetime] = None) -> str:
+    """Назва місячного лічильника номерів заявок."""
+    return f"requisition:{(when or datetime.now()).strftime('%Y%m')}"
+
+def format_requisition_number(when: Optional[datetime], value: int) -> str:
+    """Номер заявки REQ-YYYYMM-NNNN."""
+    return f"{REQUISITION_PREFIX}-{(when or datetime.now()).strftime('%Y%m')}-{value:04d}"
+
+def next_requisition_number(conn: sqlite3.Connection, when: Optional[datetime] = None) -> str:
+    """Наступний номер заявки місяця when (всередині транзакції запису)."""
+    when = when or datetime.now()
+    return format_requisition_number(when, advance_sequence(conn, requisition_sequence_name(when)))
+
+def reserve_requisition_numbers(count: int, conn: Optional[sqlite3.Connection] = None,
+                                when: Optional[datetime] = None) -> List[str]:
+    """
+    Резервує блок з count номерів заявок окремою транзакцією (або в уже
+    відкритій транзакції conn, див. run_write).
+
+    Зарезервовані номери більше нікому не видаються; невикористані
+    лишаються пропусками в нумерації.
+    """
+    when = when or datetime.now()
+    first = run_write(
+        lambda write_conn: advance_sequence(write_conn, requisition_sequence_name(when), count),
+        conn
+    )
+    return [format_requisition_number(when, value) for value in range(first, first + count)]
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Знімки залишків ресурсів та запити залишків "на дату".
+
+resources.quantity зберігає лише поточний залишок. Контрольна точка
+(run_checkpoint) щодня або щомісяця записує в stock_snapshots залишок
+кожного ресурсу на кінець дня. as_of() бере найближчий до потрібної дати
+знімок і довраховує лише денні підсумки (transaction_daily_rollup) між
+знімком і цією датою, тому вартість запиту не залежить від довжини всієї
+історії.
+
+Запуск контрольної точки з планувальника завдань:
+    python -m logic.stock_snapshots [--period daily|monthly]
+"""
+
+import argparse
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from .db_manager import pooled_connection
+from .db_writer import run_write
+from .query_registry import (
+    MAX_EPOCH, date_range, execute_query, optional_filter, parse_day, range_filter, register_query
+)
+
+CHECKPOINT_PERIODS = ("daily", "monthly")
+DEFAULT_CHECKPOINT_PERIOD = "daily"
+
+# Зміна залишку за денним підсумком; знак визначається типом, бо qty_sum —
+# сума модулів кількості. Усі межі тут — початки діб, тому залишки
+# рахуються з transaction_daily_rollup, а не з окремих транзакцій
+SIGNED_ROLLUP_SQL = """CASE WHEN d.transaction_type IN ('надходження', 'повернення')
+             THEN d.qty_sum ELSE -d.qty_sum END"""
+
+QUERY_TAKE_SNAPSHOT = register_query("stock.take_snapshot", f"""
+    INSERT OR REPLACE INTO stock_snapshots (snapshot_date, resource_id, quantity, created_at)
+    SELECT
+        :snapshot_date,
+        r.id,
+        r.quantity - COALESCE((
+            SELECT SUM({SIGNED_ROLLUP_SQL})
+            FROM transaction_daily_rollup d
+            WHERE d.resource_id = r.id AND d.day >= :end_ts
+        ), 0),
+        datetime('now')
+    FROM resources r
+""")
+
+QUERY_SNAPSHOT_EXISTS = register_query("stock.snapshot_exists", """
+    SELECT 1 FROM stock_snapshots WHERE snapshot_date = :snapshot_date LIMIT 1
+""")
+
+QUERY_SNAPSHOT_BEFORE = register_query("stock.snapshot_before", """
+    SELECT MAX(snapshot_date) FROM stock_snapshots WHERE snapshot_date <= :day
+""")
+
+QUERY_SNAPSHOT_AFTER = register_query("stock.snapshot_after", """
+    SELECT MIN(snapshot_date) FROM stock_snapshots WHERE snapshot_date > :day
+""")
+
+QUERY_SNAPSHOT_RESOURCES = register_query("stock.snapshot_resources", f"""
+    SELECT r.id, r.quantity, s.quantity as snapshot_quantity
+    FROM resources r
+    LEFT JOIN stock_snapshots s
+           ON s.resource_id = r.id AND s.snapshot_date = :snapshot_date
+    WHERE {optional_filter("r.id", "resource_id")}
+      AND {optional_filter("r.category_id", "category_id")}
+""")
+
+QUERY_MOVEMENT_TOTALS = register_query("stock.movement_totals", f"""
+    SELECT d.resource_id, SUM({SIGNED_ROLLUP_SQL}) as delta
+    FROM transaction_daily_rollup d
+    JOIN resources r ON d.resource_id = r.id
+    WHERE {range_filter("d.day")}
+      AND {optional_filter("d.resource_id", "resource_id")}
+      AND {optional_filter("r.category_id", "category_id")}
+    GROUP BY d.resource_id
+""")
+
+def _day_end_ts(day: str) -> int:
+    """Початок наступного дня (секунди епохи) — межа 'на кінець дня'."""
+    return date_range(day, day)[1]
+
+def take_stock_snapshot(conn: Optional[sqlite3.Connection] = None,
+                        snapshot_date: Optional[str] = None) -> int:
+    """
+    Записує залишки всіх ресурсів на кінець дня snapshot_date.
+
+    Залишок рахується від поточного resources.quantity з відніманням
+    транзакцій після цього дня, тому знімок за вчора коштує лише
+    сьогоднішні транзакції.
+
+    Returns:
+        int: кількість записаних рядків
+    """
+    snapshot_date = (parse_day(snapshot_date) if snapshot_date
+                     else date.today() - timedelta(days=1)).isoformat()
+
+    def _take(write_conn: sqlite3.Connection) -> int:
+        return execute_query(
+            write_conn, QUERY_TAKE_SNAPSHOT,
+            snapshot_date=snapshot_date, end_ts=_day_end_ts(snapshot_date)
+        ).rowcount
+
+    with pooled_connection(conn) as conn:
+        return run_write(_take, conn)
+
+def checkpoint_date(period: str = DEFAULT_CHECKPOINT_PERIOD,
+                    today: Optional[date] = None) -> date:
+    """День, за який має бути знімок: вчора або останній день минулого місяця."""
+    today = today or date.today()
+    if period == "daily":
+        return today - timedelta(days=1)
+    if period == "monthly":
+        return today.replace(day=1) - timedelta(days=1)
+    raise ValueError(f"Невідомий період '{period}'. Допустимі: {', '.join(CHECKPOINT_PERIODS)}")
+
+def run_checkpoint(conn: Optional[sqlite3.Connection] = None,
+                   period: str = DEFAULT_CHECKPOINT_PERIOD,
+                   today: Optional[date] = None) -> Optional[str]:
+    """
+    Створює знімок за останній завершений день/місяць, якщо його ще немає.
+
+    Returns:
+        Дата створеного знімка або None, якщо він уже існував.
+    """
+    snapshot_date = checkpoint_date(period, today).isoformat()
+    with pooled_connection(conn) as conn:
+        if execute_query(conn, QUERY_SNAPSHOT_EXISTS, snapshot_date=snapshot_date).fetchone():
+            return None
+        take_stock_snapshot(conn, snapshot_date)
+    return snapshot_date
+
+def _nearest_snapshot(conn: sqlite3.Connection, day: str) -> Optional[str]:
+    """Найближча до day дата знімка (за рівної відстані — попередня)."""
+    before = execute_query(conn, QUERY_SNAPSHOT_BEFORE, day=day).fetchone()[0]
+    after = execute_query(conn, QUERY_SNAPSHOT_AFTER, day=day).fetchone()[0]
+    if before is None or after is None:
+        return before or after
+    target = date.fromisoformat(day)
+    if (target - date.fromisoformat(before)) <= (date.fromisoformat(after) - target):
+        return before
+    return after
+
+def as_of(conn: sqlite3.Connection, as_of_date: str,
+          resource_id: Optional[int] = None,
+          category_id: Optional[int] = None) -> Dict[int, int]:
+    """
+    Залишки ресурсів на кінець дня as_of_date.
+
+    Args:
+        conn: З'єднання з базою даних.
+        as_of_date: Дата у форматі 'YYYY-MM-DD'.
+        resource_id: ID ресурсу (якщо None — усі ресурси).
+        category_id: ID категорії для фільтрації.
+
+    Returns:
+        Словник {resource_id: залишок}.
+
+    Raises:
+        ValueError: некоректна дата (див. query_registry.parse_day).
+    """
+    # Дати знімків порівнюються як текст, тому лише у форматі YYYY-MM-DD
+    day = parse_day(as_of_date).isoformat()
+    filters = dict(resource_id=resource_id, category_id=category_id)
+    end_ts = _day_end_ts(day)
+
+    snapshot_date = _nearest_snapshot(conn, day)
+    rows = execute_query(
+        conn, QUERY_SNAPSHOT_RESOURCES, snapshot_date=snapshot_date, **filters
+    ).fetchall()
+
+    def movement(start_ts: int, stop_ts: int) -> Dict[int, int]:
+        return {
+            row["resource_id"]: row["delta"]
+            for row in execute_query(
+                conn, QUERY_MOVEMENT_TOTALS, start_ts=start_ts, end_ts=stop_ts, **filters
+            ).fetchall()
+        }
+
+    result = {}
+    from_snapshot = [row for row in rows if row["snapshot_quantity"] is not None]
+    if from_snapshot:
+        snapshot_end_ts = _day_end_ts(snapshot_date)
+        if snapshot_date <= day:
+            tail, sign = movement(snapshot_end_ts, end_ts), 1
+        else:
+            tail, sign = movement(end_ts, snapshot_end_ts), -1
+        for row in from_snapshot:
+            result[row["id"]] = row["snapshot_quantity"] + sign * tail.get(row["id"], 0)
+
+    # Ресурси без знімка (або знімків ще немає) — від поточного залишку назад
+    from_current = [row for row in rows if row["snapshot_quantity"] is None]
+    if from_current:
+        tail = movement(end_ts, MAX_EPOCH)
+        for row in from_current:
+            result[row["id"]] = row["quantity"] - tail.get(row["id"], 0)
+
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Контрольна точка залишків ресурсів")
+    parser.add_argument("--period", choices=CHECKPOINT_PERIODS, default=DEFAULT_CHECKPOINT_PERIOD)
+    args = parser.parse_args()
+
+    created = run_checkpoint(period=args.period)
+    if created:
+        print(f"Знімок залишків на {created} створено.")
+    else:
+        print("Знімок залишків уже існує.")
@@ -8,6 +8,7 @@ import sqlite3
 from datetime import datetime, timedelta
 import random
 from .db_manager import create_connection, create_tables
+from .sequences import next_requisition_number
 
 def generate_test_data():
     """Генерує тестові дані для бази даних."""
@@ -108,7 +109,7 @@ def generate_test_data():
                     creation_date, status, urgency, notes
                 ) VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (
-                f"REQ-{creation_date.strftime('%Y%m')}-{i+1:04d}",
+                next_requisition_number(conn, creation_date),
                 random.randint(1, 2),  # ID користувачів (1 - admin, 2 - user)
                 random.choice(departments),
                 creation_date.strftime("%Y-%m-%d %H:%M:%S"),
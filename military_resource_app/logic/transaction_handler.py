@@ -16,9 +16,185 @@
 """
 
 import sqlite3
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Union
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from .archive import ARCHIVE_VIEW, archived_years, history_connection, not_archived_filter
 from .db_manager import CATEGORIES  # Відносний імпорт з того ж пакету
+from .db_writer import run_write
+from .query_registry import (
+    DEFAULT_ARRAYSIZE, MAX_EPOCH, date_range, decode_page_token, encode_page_token,
+    execute_query, executemany_query, iter_query, optional_filter, range_filter, register_query
+)
+
+# Канонічні запити: один текст SQL на функцію незалежно від набору фільтрів
+_RESOURCE_TRANSACTIONS_SQL = f"""
+    SELECT 
+        t.*,
+        u.username as issued_by_username,
+        r.name as resource_name,
+        r.unit_of_measure
+    FROM {{source}} t
+    JOIN resources r ON t.resource_id = r.id
+    LEFT JOIN users u ON t.issued_by_user_id = u.id
+    WHERE t.resource_id = :resource_id
+      AND {range_filter("t.transaction_ts")}
+    ORDER BY t.transaction_ts DESC
+"""
+
+_DEPARTMENT_TRANSACTIONS_SQL = f"""
+    SELECT 
+        t.*,
+        u.username as issued_by_username,
+        r.name as resource_name,
+        r.unit_of_measure,
+        c.name as category_name
+    FROM {{source}} t
+    JOIN resources r ON t.resource_id = r.id
+    JOIN categories c ON r.category_id = c.id
+    LEFT JOIN users u ON t.issued_by_user_id = u.id
+    WHERE t.recipient_department = :department
+      AND {range_filter("t.transaction_ts")}
+    ORDER BY t.transaction_ts DESC
+"""
+
+QUERY_RESOURCE_TRANSACTIONS = register_query(
+    "transactions.by_resource", _RESOURCE_TRANSACTIONS_SQL.format(source="resource_transactions")
+)
+QUERY_DEPARTMENT_TRANSACTIONS = register_query(
+    "transactions.by_department", _DEPARTMENT_TRANSACTIONS_SQL.format(source="resource_transactions")
+)
+
+# Повна історія разом з архівами завершених років (див. logic/archive.py)
+QUERY_RESOURCE_TRANSACTIONS_FULL = register_query(
+    "transactions.by_resource_full", _RESOURCE_TRANSACTIONS_SQL.format(source=ARCHIVE_VIEW)
+)
+QUERY_DEPARTMENT_TRANSACTIONS_FULL = register_query(
+    "transactions.by_department_full", _DEPARTMENT_TRANSACTIONS_SQL.format(source=ARCHIVE_VIEW)
+)
+
+QUERY_RECENT_TRANSACTIONS = register_query("transactions.recent", f"""
+    SELECT 
+        t.*,
+        u.username as issued_by_username,
+        r.name as resource_name,
+        r.unit_of_measure,
+        c.name as category_name
+    FROM resource_transactions t
+    JOIN resources r ON t.resource_id = r.id
+    JOIN categories c ON r.category_id = c.id
+    LEFT JOIN users u ON t.issued_by_user_id = u.id
+    WHERE {optional_filter("t.transaction_type", "transaction_type")}
+    ORDER BY t.transaction_ts DESC LIMIT :limit
+""")
+
+# Зведення читає денні підсумки (transaction_daily_rollup), а не всі транзакції
+QUERY_TRANSACTION_SUMMARY = register_query("transactions.summary", f"""
+    SELECT 
+        transaction_type,
+        SUM(count) as count,
+        SUM(qty_sum) as total_quantity
+    FROM transaction_daily_rollup
+    WHERE {optional_filter("resource_id", "resource_id")}
+      AND {range_filter("day")}
+      AND {not_archived_filter("day")}
+    GROUP BY transaction_type
+""")
+
+# Посторінкові варіанти: ключ (transaction_ts, id) замість OFFSET. Індекси
+# *_ts неявно закінчуються rowid (= id), тому сторінка читається з індексу
+# з позиції попереднього ключа без перегляду пропущених рядків. Кінець
+# діапазону дат задається ключем першої сторінки, а не окремою умовою
+# `< :end_ts`: з двома верхніми межами SQLite обирає end_ts і переглядає
+# всі рядки до ключа.
+KEYSET_AFTER = "(t.transaction_ts, t.id) < (:after_ts, :after_id)"
+KEYSET_ORDER = "ORDER BY t.transaction_ts DESC, t.id DESC LIMIT :limit"
+
+QUERY_RESOURCE_TRANSACTIONS_PAGE = register_query("transactions.by_resource_page", f"""
+    SELECT 
+        t.*,
+        u.username as issued_by_username,
+        r.name as resource_name,
+        r.unit_of_measure
+    FROM resource_transactions t
+    JOIN resources r ON t.resource_id = r.id
+    LEFT JOIN users u ON t.issued_by_user_id = u.id
+    WHERE t.resource_id = :resource_id
+      AND t.transaction_ts >= :start_ts
+      AND {KEYSET_AFTER}
+    {KEYSET_ORDER}
+""")
+
+QUERY_DEPARTMENT_TRANSACTIONS_PAGE = register_query("transactions.by_department_page", f"""
+    SELECT 
+        t.*,
+        u.username as issued_by_username,
+        r.name as resource_name,
+        r.unit_of_measure,
+        c.name as category_name
+    FROM resource_transactions t
+    JOIN resources r ON t.resource_id = r.id
+    JOIN categories c ON r.category_id = c.id
+    LEFT JOIN users u ON t.issued_by_user_id = u.id
+    WHERE t.recipient_department = :department
+      AND t.transaction_ts >= :start_ts
+      AND {KEYSET_AFTER}
+    {KEYSET_ORDER}
+""")
+
+QUERY_RECENT_TRANSACTIONS_PAGE = register_query("transactions.recent_page", f"""
+    SELECT 
+        t.*,
+        u.username as issued_by_username,
+        r.name as resource_name,
+        r.unit_of_measure,
+        c.name as category_name
+    FROM resource_transactions t
+    JOIN resources r ON t.resource_id = r.id
+    JOIN categories c ON r.category_id = c.id
+    LEFT JOIN users u ON t.issued_by_user_id = u.id
+    WHERE {optional_filter("t.transaction_type", "transaction_type")}
+      AND {KEYSET_AFTER}
+    {KEYSET_ORDER}
+""")
+
+DEFAULT_PAGE_SIZE = 100
+
+def _ts_range(start_date: Optional[str], end_date: Optional[str]) -> Dict[str, int]:
+    """
+    Параметри start_ts/end_ts для включного діапазону дат.
+
+    Некоректна дата — ValueError (див. date_range), як і пошкоджений токен
+    сторінки, тож методи читання історії мають один тип помилки вхідних
+    даних.
+    """
+    start_ts, end_ts = date_range(start_date, end_date)
+    return {"start_ts": start_ts, "end_ts": end_ts}
+
+def _fetch_page(conn: sqlite3.Connection, query: str, page_size: int,
+                page_token: Optional[str], end_ts: int = MAX_EPOCH,
+                **params) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Читає одну сторінку keyset-запиту.
+
+    Перша сторінка починається з ключа (end_ts, 0), тобто з усіх рядків,
+    молодших за кінець діапазону; наступні — з ключа з токена.
+
+    Returns:
+        (рядки сторінки, токен наступної сторінки або None, якщо це остання)
+    """
+    if page_size <= 0:
+        raise ValueError("Розмір сторінки повинен бути більше 0")
+    after_ts, after_id = decode_page_token(page_token, 2) if page_token else (end_ts, 0)
+    rows = execute_query(
+        conn, query, after_ts=after_ts, after_id=after_id, limit=page_size + 1, **params
+    ).fetchall()
+    next_token = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_token = encode_page_token(rows[-1]["transaction_ts"], rows[-1]["id"])
+    return [dict(row) for row in rows], next_token
 
 class TransactionError(Exception):
     """Базовий клас для помилок транзакцій."""
@@ -32,15 +208,108 @@ class InvalidTransactionTypeError(TransactionError):
     """Помилка: неправильний тип транзакції."""
     pass
 
+# Напрям зміни залишку для кожного типу транзакції
+TRANSACTION_SIGNS = {
+    'надходження': 1,    # Збільшує кількість
+    'видача': -1,        # Зменшує кількість
+    'списання': -1,      # Зменшує кількість
+    'повернення': 1      # Збільшує кількість
+}
+
+# Умовне списання: залишок перевіряється і змінюється одним оператором,
+# тому два термінали не можуть одночасно видати останню одиницю
+QUERY_DECREMENT_STOCK = register_query("stock.decrement", """
+    UPDATE resources SET quantity = quantity - :quantity
+    WHERE id = :resource_id AND quantity >= :quantity
+""")
+
+QUERY_INCREMENT_STOCK = register_query("stock.increment", """
+    UPDATE resources SET quantity = quantity + :quantity
+    WHERE id = :resource_id
+""")
+
+QUERY_INSERT_TRANSACTION = register_query("transactions.insert", """
+    INSERT INTO resource_transactions (
+        resource_id, transaction_type, quantity_changed,
+        transaction_date, recipient_department,
+        issued_by_user_id, notes, requisition_item_id
+    ) VALUES (
+        :resource_id, :transaction_type, :quantity,
+        :transaction_date, :recipient_department,
+        :issued_by_user_id, :notes, :requisition_item_id
+    )
+""")
+
+QUERY_STOCK_BY_IDS = register_query("stock.by_ids", """
+    SELECT r.id, r.quantity
+    FROM resources r
+    JOIN json_each(:resource_ids) j ON r.id = j.value
+""")
+
+QUERY_ADJUST_STOCK = register_query("stock.adjust", """
+    UPDATE resources SET quantity = quantity + :delta
+    WHERE id = :resource_id AND quantity + :delta >= 0
+""")
+
+def apply_stock_movement(
+    conn: sqlite3.Connection,
+    resource_id: int,
+    transaction_type: str,
+    quantity: int,
+    issued_by_user_id: Optional[int] = None,
+    recipient_department: Optional[str] = None,
+    notes: Optional[str] = None,
+    transaction_date: Optional[str] = None,
+    requisition_item_id: Optional[int] = None
+) -> int:
+    """
+    Змінює залишок ресурсу та записує транзакцію.
+
+    Єдине місце, де змінюється resources.quantity при русі майна. Залишок
+    змінюється відносно (quantity = quantity - ?), а для видачі/списання
+    умова `quantity >= ?` перевіряється тим самим UPDATE; changes() = 0
+    означає відмову. Функцію слід викликати всередині транзакції запису
+    (через run_write, який відкриває BEGIN IMMEDIATE).
+
+    Returns:
+        int: ID створеної транзакції
+
+    Raises:
+        InvalidTransactionTypeError: неправильний тип транзакції
+        InsufficientQuantityError: недостатньо ресурсу
+        TransactionError: ресурс не знайдено або кількість не додатна
+    """
+    if transaction_type not in TRANSACTION_SIGNS:
+        raise InvalidTransactionTypeError(
+            f"Неправильний тип транзакції. Допустимі типи: {', '.join(TRANSACTION_SIGNS.keys())}"
+        )
+    if quantity <= 0:
+        raise TransactionError("Кількість повинна бути більше 0")
+
+    query = QUERY_DECREMENT_STOCK if TRANSACTION_SIGNS[transaction_type] < 0 else QUERY_INCREMENT_STOCK
+    if execute_query(conn, query, resource_id=resource_id, quantity=quantity).rowcount == 0:
+        # Повільний шлях лише для відмови: уточнюємо причину
+        row = conn.execute("SELECT quantity FROM resources WHERE id = ?", (resource_id,)).fetchone()
+        if row is None:
+            raise TransactionError("Ресурс не знайдено")
+        raise InsufficientQuantityError(f"Недостатньо ресурсу. Наявно: {row['quantity']}")
+
+    return execute_query(
+        conn, QUERY_INSERT_TRANSACTION,
+        resource_id=resource_id,
+        transaction_type=transaction_type,
+        quantity=quantity,  # Зберігаємо оригінальну (додатню) кількість
+        transaction_date=transaction_date or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        recipient_department=recipient_department,
+        issued_by_user_id=issued_by_user_id,
+        notes=notes,
+        requisition_item_id=requisition_item_id
+    ).lastrowid
+
 class TransactionHandler:
     """Обробник транзакцій ресурсів."""
 
-    VALID_TRANSACTION_TYPES = {
-        'надходження': 1,    # Збільшує кількість
-        'видача': -1,        # Зменшує кількість
-        'списання': -1,      # Зменшує кількість
-        'повернення': 1      # Збільшує кількість
-    }
+    VALID_TRANSACTION_TYPES = TRANSACTION_SIGNS
 
     def __init__(self, conn: sqlite3.Connection):
         self.conn = conn
@@ -82,68 +351,147 @@ class TransactionHandler:
         if quantity_changed <= 0:
             return False, "Кількість повинна бути більше 0"
 
-        # Застосування множника відповідно до типу транзакції
-        actual_change = quantity_changed * self.VALID_TRANSACTION_TYPES[transaction_type]
+        def _apply(conn: sqlite3.Connection):
+            apply_stock_movement(
+                conn, resource_id, transaction_type, quantity_changed,
+                issued_by_user_id=issued_by_user_id,
+                recipient_department=recipient_department,
+                notes=notes,
+                transaction_date=transaction_date
+            )
 
         try:
-            # Перевірка наявності достатньої кількості ресурсу
-            current_quantity = self.conn.execute(
-                "SELECT quantity FROM resources WHERE id = ?",
-                (resource_id,)
-            ).fetchone()
-
-            if not current_quantity:
-                return False, "Ресурс не знайдено"
-
-            new_quantity = current_quantity["quantity"] + actual_change
+            # Запис виконується потоком запису (або на self.conn з комітом)
+            run_write(_apply, self.conn)
+            return True, "Транзакцію успішно виконано"
 
-            if new_quantity < 0:
-                raise InsufficientQuantityError(
-                    f"Недостатньо ресурсу. Наявно: {current_quantity['quantity']}"
-                )
+        except sqlite3.Error as e:
+            return False, f"Помилка бази даних: {str(e)}"
+        except TransactionError as e:
+            return False, str(e)
 
-            # Початок транзакції
-            self.conn.execute("BEGIN TRANSACTION")
+    def add_transactions(self, batch: Iterable[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Додає пакет транзакцій однією транзакцією бази даних.
 
-            # Оновлення кількості ресурсу
-            self.conn.execute(
-                "UPDATE resources SET quantity = ? WHERE id = ?",
-                (new_quantity, resource_id)
-            )
+        Кожен рядок пакета — словник з тими ж ключами, що й параметри
+        add_transaction. Спочатку перевіряється весь пакет, потім зміни
+        кількості підсумовуються по ресурсах: залишок кожного ресурсу
+        оновлюється один раз, а рядки транзакцій вставляються через
+        executemany. Якщо сумарної кількості ресурсу не вистачає, відхиляються
+        всі рядки цього ресурсу; решта пакета застосовується.
 
-            # Додавання запису про транзакцію
-            self.conn.execute(
-                """INSERT INTO resource_transactions (
-                    resource_id, transaction_type, quantity_changed,
-                    transaction_date, recipient_department,
-                    issued_by_user_id, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    resource_id,
-                    transaction_type,
-                    quantity_changed,  # Зберігаємо оригінальну (додатню) кількість
-                    transaction_date or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    recipient_department,
-                    issued_by_user_id,
-                    notes
+        Returns:
+            List[Tuple[bool, str]]: (успіх, повідомлення) для кожного рядка
+        """
+        results = []
+        valid = []
+        for line in batch:
+            transaction_type = line.get("transaction_type")
+            quantity = line.get("quantity_changed")
+            if transaction_type not in self.VALID_TRANSACTION_TYPES:
+                results.append((False, f"Неправильний тип транзакції: {transaction_type}"))
+            # bool — підклас int, тому True/False відхиляються окремо
+            elif not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+                results.append((False, "Кількість повинна бути більше 0"))
+            elif (not isinstance(line.get("resource_id"), int)
+                  or isinstance(line.get("resource_id"), bool)):
+                results.append((False, "Не вказано ресурс"))
+            else:
+                results.append(None)
+                valid.append((len(results) - 1, line))
+
+        if not valid:
+            return results
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        def _apply(conn: sqlite3.Connection) -> List[Tuple[int, bool, str]]:
+            deltas = {}
+            for _, line in valid:
+                resource_id = line["resource_id"]
+                deltas[resource_id] = deltas.get(resource_id, 0) + (
+                    line["quantity_changed"] * self.VALID_TRANSACTION_TYPES[line["transaction_type"]]
                 )
-            )
 
-            self.conn.commit()
-            return True, "Транзакцію успішно виконано"
+            stock = {
+                row["id"]: row["quantity"]
+                for row in execute_query(
+                    conn, QUERY_STOCK_BY_IDS, resource_ids=json.dumps(list(deltas))
+                ).fetchall()
+            }
 
+            refused = {}
+            for resource_id, delta in deltas.items():
+                if resource_id not in stock:
+                    refused[resource_id] = "Ресурс не знайдено"
+                elif stock[resource_id] + delta < 0:
+                    refused[resource_id] = f"Недостатньо ресурсу. Наявно: {stock[resource_id]}"
+
+            executemany_query(conn, QUERY_ADJUST_STOCK, (
+                {"resource_id": resource_id, "delta": delta}
+                for resource_id, delta in deltas.items()
+                if resource_id not in refused and delta != 0
+            ))
+            executemany_query(conn, QUERY_INSERT_TRANSACTION, (
+                {
+                    "resource_id": line["resource_id"],
+                    "transaction_type": line["transaction_type"],
+                    "quantity": line["quantity_changed"],
+                    "transaction_date": line.get("transaction_date") or now,
+                    "recipient_department": line.get("recipient_department"),
+                    "issued_by_user_id": line.get("issued_by_user_id"),
+                    "notes": line.get("notes"),
+                    "requisition_item_id": line.get("requisition_item_id"),
+                }
+                for _, line in valid
+                if line["resource_id"] not in refused
+            ))
+
+            return [
+                (index, False, refused[line["resource_id"]])
+                if line["resource_id"] in refused
+                else (index, True, "Транзакцію успішно виконано")
+                for index, line in valid
+            ]
+
+        try:
+            for index, success, message in run_write(_apply, self.conn):
+                results[index] = (success, message)
         except sqlite3.Error as e:
-            self.conn.rollback()
-            return False, f"Помилка бази даних: {str(e)}"
-        except TransactionError as e:
-            self.conn.rollback()
-            return False, str(e)
+            for index, _ in valid:
+                results[index] = (False, f"Помилка бази даних: {str(e)}")
+        return results
+
+    def _history_connection(self, full_history: bool, start_ts: int, end_ts: int):
+        """
+        З'єднання для запиту історії: self.conn або (для повної історії)
+        з'єднання з приєднаними архівами років діапазону дат.
+        """
+        if not full_history:
+            return nullcontext(self.conn)
+        return history_connection(self.conn, start_ts, end_ts)
+
+    def _history_rows(self, query: str, full_query: str, full_history: bool, **params) -> list:
+        """Рядки запиту по основній таблиці або по повній історії."""
+        with self._history_connection(full_history, params["start_ts"], params["end_ts"]) as conn:
+            rows = execute_query(conn, full_query if full_history else query, **params).fetchall()
+        return [dict(row) for row in rows]
+
+    def _iter_history(self, query: str, full_query: str, full_history: bool,
+                      arraysize: int, as_tuples: bool, **params):
+        """Потоковий варіант _history_rows (з'єднання утримується до кінця обходу)."""
+        with self._history_connection(full_history, params["start_ts"], params["end_ts"]) as conn:
+            yield from iter_query(
+                conn, full_query if full_history else query, arraysize, as_tuples, **params
+            )
 
     def get_resource_transactions(
         self,
         resource_id: int,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        full_history: bool = False
     ) -> List[Dict[str, Union[str, int]]]:
         """
         Отримує історію транзакцій для конкретного ресурсу.
@@ -152,39 +500,26 @@ class TransactionHandler:
             resource_id: ID ресурсу
             start_date: Початкова дата у форматі 'YYYY-MM-DD'
             end_date: Кінцева дата у форматі 'YYYY-MM-DD'
+            full_history: Разом з архівами завершених років
 
         Returns:
             List[Dict]: Список транзакцій
-        """
-        query = """
-            SELECT 
-                t.*,
-                u.username as issued_by_username,
-                r.name as resource_name,
-                r.unit_of_measure
-            FROM resource_transactions t
-            JOIN resources r ON t.resource_id = r.id
-            LEFT JOIN users u ON t.issued_by_user_id = u.id
-            WHERE t.resource_id = ?
-        """
-        params = [resource_id]
-
-        if start_date:
-            query += " AND t.transaction_date >= ?"
-            params.append(f"{start_date} 00:00:00")
-        if end_date:
-            query += " AND t.transaction_date <= ?"
-            params.append(f"{end_date} 23:59:59")
 
-        query += " ORDER BY t.transaction_date DESC"
-
-        return [dict(row) for row in self.conn.execute(query, params).fetchall()]
+        Raises:
+            ValueError: некоректна дата
+        """
+        return self._history_rows(
+            QUERY_RESOURCE_TRANSACTIONS, QUERY_RESOURCE_TRANSACTIONS_FULL, full_history,
+            resource_id=resource_id,
+            **_ts_range(start_date, end_date)
+        )
 
     def get_department_transactions(
         self,
         department: str,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        full_history: bool = False
     ) -> List[Dict[str, Union[str, int]]]:
         """
         Отримує історію транзакцій для конкретного підрозділу.
@@ -193,35 +528,19 @@ class TransactionHandler:
             department: Назва підрозділу
             start_date: Початкова дата у форматі 'YYYY-MM-DD'
             end_date: Кінцева дата у форматі 'YYYY-MM-DD'
+            full_history: Разом з архівами завершених років
 
         Returns:
             List[Dict]: Список транзакцій
-        """
-        query = """
-            SELECT 
-                t.*,
-                u.username as issued_by_username,
-                r.name as resource_name,
-                r.unit_of_measure,
-                c.name as category_name
-            FROM resource_transactions t
-            JOIN resources r ON t.resource_id = r.id
-            JOIN categories c ON r.category_id = c.id
-            LEFT JOIN users u ON t.issued_by_user_id = u.id
-            WHERE t.recipient_department = ?
-        """
-        params = [department]
 
-        if start_date:
-            query += " AND t.transaction_date >= ?"
-            params.append(f"{start_date} 00:00:00")
-        if end_date:
-            query += " AND t.transaction_date <= ?"
-            params.append(f"{end_date} 23:59:59")
-
-        query += " ORDER BY t.transaction_date DESC"
-
-        return [dict(row) for row in self.conn.execute(query, params).fetchall()]
+        Raises:
+            ValueError: некоректна дата
+        """
+        return self._history_rows(
+            QUERY_DEPARTMENT_TRANSACTIONS, QUERY_DEPARTMENT_TRANSACTIONS_FULL, full_history,
+            department=department,
+            **_ts_range(start_date, end_date)
+        )
 
     def get_recent_transactions(
         self,
@@ -238,74 +557,225 @@ class TransactionHandler:
         Returns:
             List[Dict]: Список транзакцій
         """
-        query = """
-            SELECT 
-                t.*,
-                u.username as issued_by_username,
-                r.name as resource_name,
-                r.unit_of_measure,
-                c.name as category_name
-            FROM resource_transactions t
-            JOIN resources r ON t.resource_id = r.id
-            JOIN categories c ON r.category_id = c.id
-            LEFT JOIN users u ON t.issued_by_user_id = u.id
+        rows = execute_query(
+            self.conn, QUERY_RECENT_TRANSACTIONS,
+            transaction_type=transaction_type or None,
+            limit=limit
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_resource_transactions(
+        self,
+        resource_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        arraysize: int = DEFAULT_ARRAYSIZE,
+        as_tuples: bool = False,
+        full_history: bool = False
+    ) -> Iterator[Union[Dict[str, Union[str, int]], tuple]]:
         """
-        params = []
+        Потоковий варіант get_resource_transactions: рядки читаються
+        порціями по arraysize, пам'ять не залежить від довжини історії.
 
-        if transaction_type:
-            query += " WHERE t.transaction_type = ?"
-            params.append(transaction_type)
+        Args:
+            resource_id: ID ресурсу
+            start_date: Початкова дата у форматі 'YYYY-MM-DD'
+            end_date: Кінцева дата у форматі 'YYYY-MM-DD'
+            arraysize: Кількість рядків на один fetchmany
+            as_tuples: Повертати кортежі замість словників
+            full_history: Разом з архівами завершених років
 
-        query += " ORDER BY t.transaction_date DESC LIMIT ?"
-        params.append(limit)
+        Yields:
+            Транзакції від найновіших
+
+        Raises:
+            ValueError: некоректна дата
+        """
+        return self._iter_history(
+            QUERY_RESOURCE_TRANSACTIONS, QUERY_RESOURCE_TRANSACTIONS_FULL, full_history,
+            arraysize, as_tuples,
+            resource_id=resource_id,
+            **_ts_range(start_date, end_date)
+        )
 
-        return [dict(row) for row in self.conn.execute(query, params).fetchall()]
+    def iter_department_transactions(
+        self,
+        department: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        arraysize: int = DEFAULT_ARRAYSIZE,
+        as_tuples: bool = False,
+        full_history: bool = False
+    ) -> Iterator[Union[Dict[str, Union[str, int]], tuple]]:
+        """
+        Потоковий варіант get_department_transactions.
+
+        Args:
+            department: Назва підрозділу
+            start_date: Початкова дата у форматі 'YYYY-MM-DD'
+            end_date: Кінцева дата у форматі 'YYYY-MM-DD'
+            arraysize: Кількість рядків на один fetchmany
+            as_tuples: Повертати кортежі замість словників
+            full_history: Разом з архівами завершених років
+
+        Yields:
+            Транзакції від найновіших
+
+        Raises:
+            ValueError: некоректна дата
+        """
+        return self._iter_history(
+            QUERY_DEPARTMENT_TRANSACTIONS, QUERY_DEPARTMENT_TRANSACTIONS_FULL, full_history,
+            arraysize, as_tuples,
+            department=department,
+            **_ts_range(start_date, end_date)
+        )
+
+    def iter_recent_transactions(
+        self,
+        limit: int = -1,
+        transaction_type: Optional[str] = None,
+        arraysize: int = DEFAULT_ARRAYSIZE,
+        as_tuples: bool = False
+    ) -> Iterator[Union[Dict[str, Union[str, int]], tuple]]:
+        """
+        Потоковий варіант get_recent_transactions.
+
+        Args:
+            limit: Максимальна кількість транзакцій (-1 — без обмеження)
+            transaction_type: Тип транзакції для фільтрації
+            arraysize: Кількість рядків на один fetchmany
+            as_tuples: Повертати кортежі замість словників
+
+        Yields:
+            Транзакції від найновіших
+        """
+        return iter_query(
+            self.conn, QUERY_RECENT_TRANSACTIONS, arraysize, as_tuples,
+            transaction_type=transaction_type or None,
+            limit=limit
+        )
+
+    def get_resource_transactions_page(
+        self,
+        resource_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Union[str, int]]], Optional[str]]:
+        """
+        Отримує одну сторінку історії транзакцій ресурсу (від найновіших).
+
+        Args:
+            resource_id: ID ресурсу
+            start_date: Початкова дата у форматі 'YYYY-MM-DD'
+            end_date: Кінцева дата у форматі 'YYYY-MM-DD'
+            page_size: Кількість транзакцій на сторінці
+            page_token: Токен з попередньої сторінки (None — перша сторінка)
+
+        Returns:
+            Tuple[List[Dict], Optional[str]]: (транзакції, токен наступної сторінки)
+
+        Raises:
+            ValueError: некоректна дата або токен сторінки
+        """
+        return _fetch_page(
+            self.conn, QUERY_RESOURCE_TRANSACTIONS_PAGE, page_size, page_token,
+            resource_id=resource_id,
+            **_ts_range(start_date, end_date)
+        )
+
+    def get_department_transactions_page(
+        self,
+        department: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Union[str, int]]], Optional[str]]:
+        """
+        Отримує одну сторінку історії транзакцій підрозділу (від найновіших).
+
+        Args:
+            department: Назва підрозділу
+            start_date: Початкова дата у форматі 'YYYY-MM-DD'
+            end_date: Кінцева дата у форматі 'YYYY-MM-DD'
+            page_size: Кількість транзакцій на сторінці
+            page_token: Токен з попередньої сторінки (None — перша сторінка)
+
+        Returns:
+            Tuple[List[Dict], Optional[str]]: (транзакції, токен наступної сторінки)
+
+        Raises:
+            ValueError: некоректна дата або токен сторінки
+        """
+        return _fetch_page(
+            self.conn, QUERY_DEPARTMENT_TRANSACTIONS_PAGE, page_size, page_token,
+            department=department,
+            **_ts_range(start_date, end_date)
+        )
+
+    def get_recent_transactions_page(
+        self,
+        transaction_type: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Union[str, int]]], Optional[str]]:
+        """
+        Отримує одну сторінку всіх транзакцій (від найновіших).
+
+        Args:
+            transaction_type: Тип транзакції для фільтрації
+            page_size: Кількість транзакцій на сторінці
+            page_token: Токен з попередньої сторінки (None — перша сторінка)
+
+        Returns:
+            Tuple[List[Dict], Optional[str]]: (транзакції, токен наступної сторінки)
+        """
+        return _fetch_page(
+            self.conn, QUERY_RECENT_TRANSACTIONS_PAGE, page_size, page_token,
+            transaction_type=transaction_type or None
+        )
 
     def get_transaction_summary(
         self,
         resource_id: Optional[int] = None,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        full_history: bool = False
     ) -> Dict[str, int]:
         """
         Отримує зведену інформацію про транзакції.
 
+        Підсумок береться з денних підсумків; без full_history роки, вже
+        перенесені в архіви, не враховуються (як і в get_resource_transactions).
+
         Args:
             resource_id: ID ресурсу (якщо None, для всіх ресурсів)
             start_date: Початкова дата у форматі 'YYYY-MM-DD'
             end_date: Кінцева дата у форматі 'YYYY-MM-DD'
+            full_history: Разом з архівами завершених років
 
         Returns:
             Dict[str, int]: Словник з кількістю транзакцій кожного типу
-        """
-        query = """
-            SELECT 
-                transaction_type,
-                COUNT(*) as count,
-                SUM(quantity_changed) as total_quantity
-            FROM resource_transactions
-            WHERE 1=1
-        """
-        params = []
 
-        if resource_id:
-            query += " AND resource_id = ?"
-            params.append(resource_id)
-        if start_date:
-            query += " AND transaction_date >= ?"
-            params.append(f"{start_date} 00:00:00")
-        if end_date:
-            query += " AND transaction_date <= ?"
-            params.append(f"{end_date} 23:59:59")
-
-        query += " GROUP BY transaction_type"
+        Raises:
+            ValueError: некоректна дата
+        """
+        rows = execute_query(
+            self.conn, QUERY_TRANSACTION_SUMMARY,
+            resource_id=resource_id or None,
+            archived_years=None if full_history else json.dumps(archived_years(self.conn)),
+            **_ts_range(start_date, end_date)
+        ).fetchall()
 
         return {
             row["transaction_type"]: {
                 "count": row["count"],
                 "total_quantity": row["total_quantity"]
             }
-            for row in self.conn.execute(query, params).fetchall()
+            for row in rows
         }
 
 # --- Приклад використання ---
@@ -15,7 +15,12 @@ parent_dir = os.path.dirname(current_dir)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-from logic.db_manager import create_connection, create_tables
+from logic.db_manager import create_connection, create_tables, get_pool, get_report_pool, pooled_connection
+from logic.db_writer import start_writer, stop_writer
+from logic.maintenance import start_maintenance, stop_maintenance
+from logic.reporting import shutdown_report_worker
+from logic.result_cache import get_result_cache
+from logic.stock_snapshots import run_checkpoint
 from ui.login_dialog import LoginDialog
 from ui.main_window import MainWindow
 
@@ -61,6 +66,18 @@ def run_application():
         )
         return -1
 
+    # Єдиний потік запису з груповим комітом
+    start_writer()
+
+    # Фонове резервне копіювання та обслуговування бази за розкладом
+    start_maintenance()
+
+    # Знімок залишків за вчора (якщо ще не створений)
+    try:
+        run_checkpoint()
+    except sqlite3.Error as e:
+        print(f"Помилка створення знімка залишків: {e}")
+
     current_main_window = None
 
     while True:  # Головний цикл: логін -> головне вікно -> логін ...
@@ -76,11 +93,8 @@ def run_application():
                 break
             
             # Отримуємо повні дані користувача
-            conn_main = create_connection()
-            current_user_details = None
-            if conn_main and user_id:
+            with pooled_connection() as conn_main:
                 current_user_details = get_user_details(conn_main, user_id)
-                conn_main.close()
             
             # Видаляємо попереднє головне вікно, якщо воно існує
             if current_main_window:
@@ -111,6 +125,12 @@ def run_application():
             print("Користувач скасував вхід. Завершення програми.")
             break
 
+    stop_maintenance()
+    stop_writer()
+    shutdown_report_worker()
+    get_result_cache().close()
+    get_pool().close_all()
+    get_report_pool().close_all()
     return 0
 
 if __name__ == '__main__':
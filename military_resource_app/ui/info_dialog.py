@@ -8,11 +8,18 @@ import os
 from datetime import datetime
 from PyQt6 import QtCore, QtGui, QtWidgets
 
+from logic.transaction_handler import TransactionHandler
+
+# Кількість транзакцій, що завантажується за одне натискання
+HISTORY_PAGE_SIZE = 100
+
 class InfoDialog(QtWidgets.QDialog):
     def __init__(self, conn, resource_id: int):
         super().__init__()
         self.conn = conn
         self.resource_id = resource_id
+        self.transaction_handler = TransactionHandler(conn)
+        self.history_token = None
         self.data = self.load_resource_data()
         self.setup_ui()
         self.load_data()
@@ -74,6 +81,11 @@ class InfoDialog(QtWidgets.QDialog):
             QtWidgets.QHeaderView.ResizeMode.Stretch
         )
         history_layout.addWidget(self.history_table)
+
+        self.more_history_btn = QtWidgets.QPushButton("Показати ще")
+        self.more_history_btn.clicked.connect(self.load_history_page)
+        self.more_history_btn.setVisible(False)
+        history_layout.addWidget(self.more_history_btn)
         
         left_layout.addWidget(history_group)
         layout.addWidget(left_widget)
@@ -142,19 +154,21 @@ class InfoDialog(QtWidgets.QDialog):
         else:
             self.preview.setText("Фото відсутнє")
 
-        # Історія транзакцій
-        transactions = self.conn.execute("""
-            SELECT t.transaction_date, t.transaction_type,
-                   t.quantity_changed, t.recipient_department,
-                   t.notes, u.username as issued_by
-            FROM resource_transactions t
-            LEFT JOIN users u ON t.issued_by_user_id = u.id
-            WHERE t.resource_id = ?
-            ORDER BY t.transaction_date DESC
-        """, (self.resource_id,)).fetchall()
-
-        self.history_table.setRowCount(len(transactions))
-        for row, t in enumerate(transactions):
+        # Історія транзакцій (перша сторінка)
+        self.history_table.setRowCount(0)
+        self.history_token = None
+        self.load_history_page()
+
+    def load_history_page(self):
+        """Дозавантажує наступну сторінку історії транзакцій у таблицю."""
+        transactions, self.history_token = self.transaction_handler.get_resource_transactions_page(
+            self.resource_id, page_size=HISTORY_PAGE_SIZE, page_token=self.history_token
+        )
+        self.more_history_btn.setVisible(self.history_token is not None)
+
+        first_row = self.history_table.rowCount()
+        self.history_table.setRowCount(first_row + len(transactions))
+        for row, t in enumerate(transactions, start=first_row):
             self.history_table.setItem(
                 row, 0,
                 QtWidgets.QTableWidgetItem(
@@ -177,8 +191,8 @@ class InfoDialog(QtWidgets.QDialog):
             notes = []
             if t["notes"]:
                 notes.append(t["notes"])
-            if t["issued_by"]:
-                notes.append(f"Виконав: {t['issued_by']}")
+            if t["issued_by_username"]:
+                notes.append(f"Виконав: {t['issued_by_username']}")
             self.history_table.setItem(
                 row, 4,
                 QtWidgets.QTableWidgetItem(" | ".join(notes) if notes else "-")
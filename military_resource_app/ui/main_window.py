@@ -11,8 +11,13 @@ from PyQt6 import QtCore, QtGui, QtWidgets
 
 # Налаштування шляху для імпорту модулів
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from logic.db_manager import create_connection
+from logic.allocation import allocate_stock, format_allocation
+from logic.catalog_search import (
+    MIN_SEARCH_CHARS, RESULT_LIMIT, catalog_match, search_category_facets, search_resource_ids
+)
+from logic.db_manager import fetch_categories, fetch_resource_list, pooled_connection
 from logic.requisition_handler import get_requisitions
+from logic.result_cache import cached_call
 from .requisition_dialog import RequisitionDialog
 from .transaction_dialog import TransactionDialog
 
@@ -222,6 +227,11 @@ class MainWindow(QtWidgets.QMainWindow):
             if hasattr(self, 'show_transaction_dialog'):
                 admin_add_trans_button.clicked.connect(self.show_transaction_dialog)
             header_layout.addWidget(admin_add_trans_button)
+
+            admin_allocate_button = QtWidgets.QPushButton("Розподіл залишків")
+            admin_allocate_button.setObjectName("ActionButton")
+            admin_allocate_button.clicked.connect(self.show_allocation_dialog)
+            header_layout.addWidget(admin_allocate_button)
             
             header_layout.addStretch(1)
             
@@ -336,10 +346,28 @@ class MainWindow(QtWidgets.QMainWindow):
         self.stock_filter.currentTextChanged.connect(self.on_stock_filter_changed)
         filters_layout.addWidget(QtWidgets.QLabel("Наявність:"))
         filters_layout.addWidget(self.stock_filter)
+
+        # Пошук у каталозі (назва, опис, постачальник, походження); запит
+        # виконується після паузи у введенні, а не на кожну літеру
+        self.resource_search = QtWidgets.QLineEdit()
+        self.resource_search.setPlaceholderText(f"від {MIN_SEARCH_CHARS} символів")
+        self.resource_search_timer = QtCore.QTimer(self)
+        self.resource_search_timer.setSingleShot(True)
+        self.resource_search_timer.setInterval(250)
+        self.resource_search_timer.timeout.connect(self.on_resource_search_changed)
+        self.resource_search.textChanged.connect(lambda _text: self.resource_search_timer.start())
+        filters_layout.addWidget(QtWidgets.QLabel("Пошук:"))
+        filters_layout.addWidget(self.resource_search)
         
         filters_group.setLayout(filters_layout)
         self.resources_layout.addWidget(filters_group)
 
+        # Кількість знайдених ресурсів по категоріях
+        self.resource_search_summary = QtWidgets.QLabel()
+        self.resource_search_summary.setWordWrap(True)
+        self.resource_search_summary.hide()
+        self.resources_layout.addWidget(self.resource_search_summary)
+
         # Таблиця ресурсів
         self.resources_table = QtWidgets.QTableView()
         self.resources_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
@@ -373,20 +401,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self.category_filter.clear()
         self.category_filter.addItem("Всі категорії", None)
         
-        conn = None
         try:
-            conn = create_connection()
-            if conn:
-                cur = conn.cursor()
-                cur.execute("SELECT id, name FROM categories ORDER BY name")
-                categories = cur.fetchall()
-                for category in categories:
-                    self.category_filter.addItem(category['name'], category['id'])
+            with pooled_connection() as conn:
+                categories = cached_call(fetch_categories, conn)
+            for category in categories:
+                self.category_filter.addItem(category['name'], category['id'])
         except sqlite3.Error as e:
             print(f"Помилка завантаження категорій: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     def on_resource_category_changed(self, selected_category: str):
         """Обробник зміни вибраної категорії ресурсів."""
@@ -399,45 +420,36 @@ class MainWindow(QtWidgets.QMainWindow):
         category_id = self.category_filter.currentData()
         self.load_resources_data(category_id, selected_status)
 
+    def on_resource_search_changed(self):
+        """Обробник зміни пошукового рядка ресурсів (після паузи у введенні)."""
+        category_id = self.category_filter.currentData()
+        stock_status = self.stock_filter.currentText()
+        self.load_resources_data(category_id, stock_status)
+
     def load_resources_data(self, category_id=None, stock_status="Всі"):
-        """Завантажує дані про ресурси з урахуванням фільтрів."""
+        """Завантажує дані про ресурси з урахуванням фільтрів і пошуку."""
         print(f"Завантаження ресурсів для категорії ID: {category_id}, статус: {stock_status}")
         
         # Очищаємо модель перед завантаженням нових даних
         self.resources_table_model.setRowCount(0)
+        search_term = self.resource_search.text()
         
-        conn = None
         try:
-            conn = create_connection()
-            if not conn:
-                return
-
-            query = """
-                SELECT r.id, r.name, c.name as category_name, r.quantity, 
-                       r.unit_of_measure, r.low_stock_threshold, r.supplier, 
-                       r.description
-                FROM resources r
-                JOIN categories c ON r.category_id = c.id
-                WHERE 1=1
-            """
-            params = []
-
-            if category_id is not None:
-                query += " AND r.category_id = ?"
-                params.append(category_id)
-
-            if stock_status == "В наявності":
-                query += " AND r.quantity > r.low_stock_threshold"
-            elif stock_status == "Закінчується":
-                query += " AND r.quantity <= r.low_stock_threshold AND r.quantity > 0"
-            elif stock_status == "Відсутні":
-                query += " AND r.quantity = 0"
-
-            query += " ORDER BY c.name, r.name"
-
-            cur = conn.cursor()
-            cur.execute(query, params)
-            resources = cur.fetchall()
+            # Повторне завантаження без змін у БД береться з кешу результатів
+            with pooled_connection() as conn:
+                if catalog_match(search_term):
+                    # Таблиця отримує лише знайдені ресурси, від найрелевантніших
+                    resource_ids = cached_call(
+                        search_resource_ids, search_term, category_id, RESULT_LIMIT, conn
+                    )
+                    facets = cached_call(search_category_facets, search_term, conn)
+                    resources = cached_call(
+                        fetch_resource_list, conn, category_id, stock_status, tuple(resource_ids)
+                    )
+                    self.show_resource_search_summary(facets)
+                else:
+                    resources = cached_call(fetch_resource_list, conn, category_id, stock_status)
+                    self.resource_search_summary.hide()
 
             for resource in resources:
                 row_items = [
@@ -459,9 +471,19 @@ class MainWindow(QtWidgets.QMainWindow):
                 "Помилка",
                 f"Не вдалося завантажити дані ресурсів: {str(e)}"
             )
-        finally:
-            if conn:
-                conn.close()
+
+    def show_resource_search_summary(self, facets: list):
+        """Показує кількість знайдених ресурсів по категоріях."""
+        total = sum(facet['count'] for facet in facets)
+        text = f"Знайдено: {total}"
+        if facets:
+            text += " (" + ", ".join(
+                f"{facet['category_name']} — {facet['count']}" for facet in facets
+            ) + ")"
+        if total > RESULT_LIMIT:
+            text += f"; показано {RESULT_LIMIT} найрелевантніших, уточніть запит"
+        self.resource_search_summary.setText(text)
+        self.resource_search_summary.show()
 
     def setup_requisitions_tab(self):
         """Налаштування вкладки заявок."""
@@ -601,6 +623,45 @@ class MainWindow(QtWidgets.QMainWindow):
             )
             print(f"Помилка при створенні транзакції: {e}")
 
+    def show_allocation_dialog(self):
+        """Показує план розподілу залишків між схваленими заявками та застосовує його."""
+        try:
+            plan = allocate_stock(dry_run=True)
+        except sqlite3.Error as e:
+            QtWidgets.QMessageBox.critical(self, "Помилка", f"Не вдалося побудувати план: {e}")
+            return
+        if not plan["issued_items"]:
+            QtWidgets.QMessageBox.information(
+                self, "Розподіл залишків", "Немає позицій, які можна видати з наявних залишків."
+            )
+            return
+
+        summary, _, details = format_allocation(plan).partition("\n")
+        confirm = QtWidgets.QMessageBox(self)
+        confirm.setWindowTitle("Розподіл залишків")
+        confirm.setText(f"{summary}\n\nВиконати видачу?")
+        confirm.setDetailedText(details)
+        confirm.setStandardButtons(
+            QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No
+        )
+        if confirm.exec() != QtWidgets.QMessageBox.StandardButton.Yes:
+            return
+
+        try:
+            # План будується заново в транзакції запису за поточними залишками
+            result = allocate_stock(issued_by_user_id=self.user_id)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Помилка", f"Розподіл не виконано: {e}")
+            return
+        QtWidgets.QMessageBox.information(
+            self, "Розподіл залишків", format_allocation(result).partition("\n")[0]
+        )
+        current_widget = self.tab_widget.currentWidget()
+        if current_widget == self.requisitions_tab:
+            self.load_requisitions_data()
+        elif current_widget == self.resources_tab:
+            self.load_resources_data(self.category_filter.currentData(), self.stock_filter.currentText())
+
     # Методи для завантаження даних
     def load_requisitions_data(self):
         """Завантажує дані про заявки з бази даних."""
@@ -615,7 +676,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 print(f"[DEBUG] Встановлено фільтр по користувачу: {current_user_filter_id_for_query}")
             
             # Отримуємо заявки
-            requisitions_list = get_requisitions(
+            requisitions_list = cached_call(
+                get_requisitions,
                 created_by_user_id=current_user_filter_id_for_query,
                 limit=100
             )
@@ -5,8 +5,8 @@ import sqlite3
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) # Додаємо корінь проєкту
-from logic.db_manager import create_connection # Для завантаження списку ресурсів
-from logic.requisition_handler import (create_requisition, add_item_to_requisition,
+from logic.db_manager import get_pool, pooled_connection # Для завантаження списку ресурсів
+from logic.requisition_handler import (create_requisition,
                                        get_requisition_details, update_requisition_status,
                                        process_requisition_item_execution)
 
@@ -156,12 +156,9 @@ class RequisitionDialog(QtWidgets.QDialog):
         self.resource_search_combo.clear()
         self.resource_search_combo.addItem("", None) # Порожній елемент для можливості ввести нову назву
 
-        conn = create_connection()
-        if not conn: return
         try:
-            cur = conn.cursor()
-            cur.execute("SELECT id, name, unit_of_measure FROM resources ORDER BY name")
-            resources = cur.fetchall()
+            with pooled_connection() as conn:
+                resources = conn.execute("SELECT id, name, unit_of_measure FROM resources ORDER BY name").fetchall()
             for resource in resources:
                 # Зберігаємо id та unit_of_measure в userData
                 self.resource_search_combo.addItem(
@@ -170,8 +167,6 @@ class RequisitionDialog(QtWidgets.QDialog):
                 )
         except sqlite3.Error as e:
             print(f"Помилка завантаження ресурсів для комбо-боксу: {e}")
-        finally:
-            if conn: conn.close()
 
 
     def add_item_to_table(self):
@@ -250,21 +245,33 @@ class RequisitionDialog(QtWidgets.QDialog):
                                             "Додайте хоча б одну позицію до заявки")
                 return
 
-            # Створюємо з'єднання з БД
-            conn = create_connection()
-            if not conn:
-                QtWidgets.QMessageBox.critical(self, "Помилка з'єднання",
-                                             "Не вдалося підключитися до бази даних")
-                return
+            # Отримуємо з'єднання з пулу
+            pool = get_pool()
+            conn = pool.acquire()
 
             try:
-                # Створюємо заявку
+                # Позиції з UserRole першої колонки таблиці
+                items = []
+                for row in range(self.items_table.rowCount()):
+                    item_data = self.items_table.item(row, 0).data(QtCore.Qt.ItemDataRole.UserRole)
+                    if not item_data:
+                        raise Exception(f"Помилка отримання даних для позиції {row + 1}")
+                    items.append({
+                        'resource_id': item_data['id_linked'],
+                        'requested_resource_name': item_data['name'],
+                        'quantity_requested': item_data['qty'],
+                        'unit_of_measure': item_data['unit'],
+                        'justification': item_data['just'],
+                    })
+
+                # Заявка та всі позиції створюються однією транзакцією
                 requisition_id = create_requisition(
                     conn=conn,
                     user_id=self.current_user_id,
                     department=department,
                     urgency=self.urgency_combo.currentText(),
-                    purpose_description=self.purpose_description_edit.toPlainText().strip()
+                    purpose_description=self.purpose_description_edit.toPlainText().strip(),
+                    items=items
                 )
 
                 if not requisition_id:
@@ -272,29 +279,6 @@ class RequisitionDialog(QtWidgets.QDialog):
                                                  "Не вдалося створити заявку")
                     return
 
-                # Додаємо позиції до заявки
-                for row in range(self.items_table.rowCount()):
-                    # Отримуємо дані з UserRole першої колонки
-                    item_data = self.items_table.item(row, 0).data(QtCore.Qt.ItemDataRole.UserRole)
-                    if not item_data:
-                        raise Exception(f"Помилка отримання даних для позиції {row + 1}")
-
-                    print(f"[DEBUG] Дані позиції для додавання:")
-                    print(f"[DEBUG] {item_data}")
-
-                    success = add_item_to_requisition(
-                        conn=conn,
-                        requisition_id=requisition_id,
-                        resource_id=item_data['id_linked'],
-                        resource_name=item_data['name'],
-                        quantity_requested=item_data['qty'],
-                        notes=item_data['just']
-                    )
-
-                    if not success:
-                        raise Exception(f"Не вдалося додати позицію '{item_data['name']}' до заявки")
-
-                conn.commit()
                 self.new_requisition_id = requisition_id
                 self.successfully_saved_status = True
                 QtWidgets.QMessageBox.information(self, "Успіх", 
@@ -308,8 +292,7 @@ class RequisitionDialog(QtWidgets.QDialog):
                     conn.rollback()
                 return
             finally:
-                if conn:
-                    conn.close()
+                pool.release(conn)
 
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Помилка",
@@ -12,7 +12,9 @@ import sqlite3
 
 # Налаштування шляху для імпорту модулів
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from logic.db_manager import create_connection
+from logic.db_manager import pooled_connection
+from logic.db_writer import run_write
+from logic.transaction_handler import TransactionError, apply_stock_movement
 
 class TransactionDialog(QtWidgets.QDialog):
     def __init__(self, current_user_id: int, parent=None):
@@ -104,19 +106,15 @@ class TransactionDialog(QtWidgets.QDialog):
 
     def _load_resources_data(self):
         """Завантажує дані про категорії та ресурси."""
-        conn = None
         try:
-            conn = create_connection()
-            if conn:
-                # Завантаження категорій
-                cur = conn.cursor()
-                cur.execute("SELECT id, name FROM categories ORDER BY name")
-                categories = cur.fetchall()
-                
-                self.category_combo.clear()
-                self.category_combo.addItem("Оберіть категорію", None)
-                for category in categories:
-                    self.category_combo.addItem(category['name'], category['id'])
+            # Завантаження категорій
+            with pooled_connection() as conn:
+                categories = conn.execute("SELECT id, name FROM categories ORDER BY name").fetchall()
+            
+            self.category_combo.clear()
+            self.category_combo.addItem("Оберіть категорію", None)
+            for category in categories:
+                self.category_combo.addItem(category['name'], category['id'])
                 
         except Exception as e:
             QtWidgets.QMessageBox.critical(
@@ -124,9 +122,6 @@ class TransactionDialog(QtWidgets.QDialog):
                 "Помилка",
                 f"Помилка завантаження даних: {str(e)}"
             )
-        finally:
-            if conn:
-                conn.close()
 
     def _on_category_changed(self, index):
         """Обробник зміни вибраної категорії."""
@@ -139,24 +134,20 @@ class TransactionDialog(QtWidgets.QDialog):
             self.resource_combo.clear()
             return
 
-        conn = None
         try:
-            conn = create_connection()
-            if conn:
-                cur = conn.cursor()
-                cur.execute("""
+            with pooled_connection() as conn:
+                resources = conn.execute("""
                     SELECT id, name, quantity, unit_of_measure 
                     FROM resources 
                     WHERE category_id = ?
                     ORDER BY name
-                """, (category_id,))
-                resources = cur.fetchall()
-                
-                self.resource_combo.clear()
-                self.resource_combo.addItem("Оберіть ресурс", None)
-                for resource in resources:
-                    display_text = f"{resource['name']} ({resource['quantity']} {resource['unit_of_measure']})"
-                    self.resource_combo.addItem(display_text, resource['id'])
+                """, (category_id,)).fetchall()
+            
+            self.resource_combo.clear()
+            self.resource_combo.addItem("Оберіть ресурс", None)
+            for resource in resources:
+                display_text = f"{resource['name']} ({resource['quantity']} {resource['unit_of_measure']})"
+                self.resource_combo.addItem(display_text, resource['id'])
                 
         except Exception as e:
             QtWidgets.QMessageBox.critical(
@@ -164,9 +155,6 @@ class TransactionDialog(QtWidgets.QDialog):
                 "Помилка",
                 f"Помилка завантаження ресурсів: {str(e)}"
             )
-        finally:
-            if conn:
-                conn.close()
 
     def _on_transaction_type_changed(self, index):
         """Обробник зміни типу транзакції."""
@@ -232,97 +220,46 @@ class TransactionDialog(QtWidgets.QDialog):
 
     def _save_transaction(self) -> bool:
         """Зберігає транзакцію в базу даних."""
-        conn = None
-        try:
-            conn = create_connection()
-            if not conn:
-                QtWidgets.QMessageBox.critical(
-                    self,
-                    "Помилка з'єднання",
-                    "Не вдалося підключитися до бази даних"
-                )
-                return False
+        # Отримуємо дані для транзакції
+        resource_id = self.resource_combo.currentData()
+        quantity = self.quantity_spin.value()
+        transaction_type = self.transaction_type_combo.currentText().lower()
+        department = self.department_edit.text().strip()
+        notes = f"{self.document_edit.text().strip()} - {self.notes_edit.toPlainText().strip()}"
 
-            cur = conn.cursor()
-            
-            # Отримуємо дані для транзакції
-            resource_id = self.resource_combo.currentData()
-            quantity = self.quantity_spin.value()
-            transaction_type = self.transaction_type_combo.currentText().lower()
-            
-            # Перевіряємо наявність достатньої кількості ресурсу для видачі/списання
-            if transaction_type in ['видача', 'списання']:
-                cur.execute("SELECT quantity FROM resources WHERE id = ?", (resource_id,))
-                current_quantity = cur.fetchone()['quantity']
-                if current_quantity < quantity:
-                    QtWidgets.QMessageBox.warning(
-                        self,
-                        "Помилка",
-                        f"Недостатньо ресурсу. Доступно: {current_quantity}"
-                    )
-                    return False
+        def _apply(conn):
+            apply_stock_movement(
+                conn, resource_id, transaction_type, quantity,
+                issued_by_user_id=self.current_user_id,
+                recipient_department=department,
+                notes=notes
+            )
 
-            try:
-                # Зберігаємо транзакцію
-                cur.execute("""
-                    INSERT INTO resource_transactions (
-                        resource_id, transaction_type, quantity_changed, 
-                        transaction_date, recipient_department, issued_by_user_id,
-                        notes
-                    ) VALUES (?, ?, ?, datetime('now'), ?, ?, ?)
-                """, (
-                    resource_id,
-                    transaction_type,
-                    quantity if transaction_type == 'надходження' else -quantity,
-                    self.department_edit.text().strip(),
-                    self.current_user_id,
-                    f"{self.document_edit.text().strip()} - {self.notes_edit.toPlainText().strip()}"
-                ))
-                
-                # Оновлюємо кількість ресурсу
-                if transaction_type == 'надходження':
-                    cur.execute("""
-                        UPDATE resources 
-                        SET quantity = quantity + ? 
-                        WHERE id = ?
-                    """, (quantity, resource_id))
-                else:  # видача або списання
-                    cur.execute("""
-                        UPDATE resources 
-                        SET quantity = quantity - ? 
-                        WHERE id = ?
-                    """, (quantity, resource_id))
-                
-                conn.commit()
-                QtWidgets.QMessageBox.information(
-                    self,
-                    "Успіх",
-                    "Транзакцію успішно створено"
-                )
-                return True
-                
-            except sqlite3.Error as e:
-                if conn:
-                    conn.rollback()
-                QtWidgets.QMessageBox.critical(
-                    self,
-                    "Помилка бази даних",
-                    f"Помилка при збереженні транзакції: {str(e)}"
-                )
-                return False
-                
+        try:
+            # Запис через потік запису; з'єднання з пулу - лише запасний варіант
+            with pooled_connection() as conn:
+                run_write(_apply, conn)
+            QtWidgets.QMessageBox.information(
+                self,
+                "Успіх",
+                "Транзакцію успішно створено"
+            )
+            return True
+
+        except TransactionError as e:
+            QtWidgets.QMessageBox.warning(self, "Помилка", str(e))
+            return False
+        except sqlite3.Error as e:
+            QtWidgets.QMessageBox.critical(
+                self,
+                "Помилка бази даних",
+                f"Помилка при збереженні транзакції: {str(e)}"
+            )
+            return False
         except Exception as e:
-            if conn:
-                conn.rollback()
             QtWidgets.QMessageBox.critical(
                 self,
                 "Помилка",
                 f"Неочікувана помилка: {str(e)}"
             )
             return False
-            
-        finally:
-            if conn:
-                conn.close()
-            
-        return False 
\ No newline at end of file
@@ -5,18 +5,28 @@ Resource Management App (olive‑yellow UI) + звіти, повернення 
 та pop‑up попередження (кількість <10 або строк придатності завтра).
 """
 
+import json
 import os
 import sys
 import sqlite3
 import shutil
 import time
 from datetime import datetime, date, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any
 import traceback
 
 from PIL import Image, ImageQt   # резерв
 from PyQt6 import QtCore, QtGui, QtWidgets
 
+from military_resource_app.logic.catalog_search import (
+    MIN_SEARCH_CHARS, RESULT_LIMIT, catalog_match, search_resource_ids
+)
+from military_resource_app.logic.db_manager import apply_pragma_profile
+from military_resource_app.logic.migrations import run_migrations
+from military_resource_app.logic.requisition_handler import add_items_to_requisition
+from military_resource_app.logic.result_cache import get_result_cache
+from military_resource_app.logic.sequences import next_requisition_number
+
 # =============================================================
 # --------------------------- STYLE ---------------------------
 # =============================================================
@@ -65,157 +75,28 @@ CATEGORIES = [
     "Ремонтні засоби та запчастини"
 ]
 
-def create_connection(db_file=DB_NAME):
+def create_connection(db_file=DB_NAME, profile=None):
     conn = None
     try:
         conn = sqlite3.connect(db_file)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON;")
+        apply_pragma_profile(conn, profile)
         return conn
     except sqlite3.Error as e:
         print(f"Помилка підключення до БД: {e}")
     return conn
 
-def migrate_requisition_items(conn):
-    """Міграція таблиці requisition_items для виправлення структури"""
-    try:
-        cur = conn.cursor()
-        
-        # Створюємо тимчасову таблицю з правильною структурою
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS requisition_items_new (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                requisition_id INTEGER NOT NULL,
-                resource_id INTEGER,
-                requested_resource_name TEXT NOT NULL,
-                quantity_requested INTEGER NOT NULL,
-                unit_of_measure TEXT,
-                justification TEXT,
-                item_status TEXT DEFAULT 'очікує',
-                FOREIGN KEY (requisition_id) REFERENCES requisitions (id),
-                FOREIGN KEY (resource_id) REFERENCES resources (id)
-            )
-        """)
-        
-        # Копіюємо дані
-        cur.execute("""
-            INSERT INTO requisition_items_new (
-                id, requisition_id, resource_id, requested_resource_name,
-                quantity_requested, unit_of_measure, justification, item_status
-            )
-            SELECT 
-                id, requisition_id, resource_id, requested_resource_name,
-                quantity_requested, unit_of_measure, justification, item_status
-            FROM requisition_items
-        """)
-        
-        # Видаляємо стару таблицю
-        cur.execute("DROP TABLE requisition_items")
-        
-        # Перейменовуємо нову таблицю
-        cur.execute("ALTER TABLE requisition_items_new RENAME TO requisition_items")
-        
-        conn.commit()
-        print("Міграцію таблиці requisition_items успішно завершено")
-        
-    except sqlite3.Error as e:
-        print(f"Помилка під час міграції: {e}")
-        conn.rollback()
-        raise
-
 def create_tables(conn):
     if conn is None:
         print("Немає з'єднання з БД")
         return
 
     try:
+        # Схема та міграції спільні з military_resource_app
+        run_migrations(conn)
         cur = conn.cursor()
-        
-        # Спочатку створюємо всі таблиці
-        cur.executescript("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                role TEXT NOT NULL CHECK(role IN ('admin', 'user'))
-            );
-
-            CREATE TABLE IF NOT EXISTS categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                parent_id INTEGER,
-                FOREIGN KEY (parent_id) REFERENCES categories (id)
-            );
-
-            CREATE TABLE IF NOT EXISTS resources (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                category_id INTEGER NOT NULL,
-                quantity INTEGER NOT NULL DEFAULT 0,
-                unit_of_measure TEXT,
-                description TEXT,
-                image_path TEXT,
-                supplier TEXT,
-                phone TEXT,
-                origin TEXT,
-                arrival_date TEXT,
-                cost REAL,
-                expiration_date TEXT,
-                low_stock_threshold INTEGER DEFAULT 10,
-                FOREIGN KEY (category_id) REFERENCES categories (id)
-            );
-
-            CREATE TABLE IF NOT EXISTS resource_transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                resource_id INTEGER NOT NULL,
-                transaction_type TEXT NOT NULL CHECK(transaction_type IN ('надходження', 'видача', 'списання', 'повернення')),
-                quantity_changed INTEGER NOT NULL,
-                transaction_date TEXT NOT NULL,
-                recipient_department TEXT,
-                issued_by_user_id INTEGER,
-                notes TEXT,
-                FOREIGN KEY (resource_id) REFERENCES resources (id),
-                FOREIGN KEY (issued_by_user_id) REFERENCES users (id)
-            );
-
-            CREATE TABLE IF NOT EXISTS requisitions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                requisition_number TEXT UNIQUE NOT NULL,
-                created_by_user_id INTEGER NOT NULL,
-                department_requesting TEXT,
-                creation_date TEXT NOT NULL,
-                status TEXT NOT NULL DEFAULT 'нова' CHECK(status IN ('нова', 'на розгляді', 'схвалено', 'відхилено', 'частково виконано', 'виконано')),
-                urgency TEXT DEFAULT 'планова' CHECK(urgency IN ('планова', 'термінова', 'критична')),
-                notes TEXT,
-                FOREIGN KEY (created_by_user_id) REFERENCES users (id)
-            );
-
-            CREATE TABLE IF NOT EXISTS requisition_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                requisition_id INTEGER NOT NULL,
-                resource_id INTEGER,
-                requested_resource_name TEXT NOT NULL,
-                quantity_requested INTEGER NOT NULL,
-                unit_of_measure TEXT,
-                justification TEXT,
-                item_status TEXT DEFAULT 'очікує' CHECK(item_status IN ('очікує', 'схвалено', 'замовлено', 'отримано', 'відхилено')),
-                FOREIGN KEY (requisition_id) REFERENCES requisitions (id),
-                FOREIGN KEY (resource_id) REFERENCES resources (id)
-            );
-        """)
-        conn.commit()
         print("Таблиці успішно створено/перевірено.")
-        
-        # Перевіряємо чи потрібна міграція
-        try:
-            cur.execute("SELECT quantity_executed FROM requisition_items LIMIT 1")
-            print("Знайдено колонку quantity_executed - потрібна міграція")
-            migrate_requisition_items(conn)
-        except sqlite3.OperationalError as e:
-            if "no such column" in str(e):
-                print("Структура таблиці requisition_items коректна")
-            else:
-                raise
 
         # Початкове заповнення категорій
         cur.execute("SELECT COUNT(*) FROM categories")
@@ -253,6 +134,19 @@ fetch_resources = lambda c,cat: c.execute(
     WHERE c.name=?""", (cat,)
 ).fetchall()
 
+def search_resources(c, cat, text):
+    """Ресурси категорії cat, знайдені пошуком у каталозі, від найрелевантніших."""
+    cat_row = c.execute("SELECT id FROM categories WHERE name=?", (cat,)).fetchone()
+    if not cat_row:
+        return []
+    ids = search_resource_ids(text, cat_row["id"], RESULT_LIMIT, conn=c)
+    return c.execute(
+        """SELECT r.id, r.name, r.quantity, r.description, r.image_path, r.expiration_date
+        FROM json_each(?) j
+        JOIN resources r ON r.id = j.value
+        ORDER BY j.key""", (json.dumps(ids),)
+    ).fetchall()
+
 def add_resource_db(c,n,q,d,img,cat):
     cat_id = c.execute("SELECT id FROM categories WHERE name=?", (cat,)).fetchone()["id"]
     cur = c.execute(
@@ -584,7 +478,7 @@ class RequisitionDialog(QtWidgets.QDialog):
             # Створення заявки
             cur = self.conn.cursor()
             
-            req_number = f"REQ-{int(time.time())}"
+            req_number = next_requisition_number(self.conn)
             department = self.department.text().strip()
             creation_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             urgency = self.urgency.currentText()
@@ -621,53 +515,29 @@ class RequisitionDialog(QtWidgets.QDialog):
             self.new_requisition_id = cur.lastrowid
             print(f"\nСтворено заявку з ID: {self.new_requisition_id}")
             
-            # Додавання позицій
-            print("\nПочинаємо додавання позицій:")
-            
+            # Додавання позицій одним пакетом у тій самій транзакції
+            items = []
             for row in range(self.items_table.rowCount()):
-                try:
-                    name_item = self.items_table.item(row, 0)
-                    qty_item = self.items_table.item(row, 1)
-                    unit_item = self.items_table.item(row, 2)
-                    note_item = self.items_table.item(row, 3)
-                    
-                    if not all([name_item, qty_item, unit_item]):
-                        raise ValueError(f"Неповні дані в рядку {row + 1}")
-                    
-                    name = name_item.text().strip()
-                    qty = int(qty_item.text())
-                    unit = unit_item.text().strip()
-                    note = note_item.text().strip() if note_item else ""
-                    resource_id = name_item.data(QtCore.Qt.ItemDataRole.UserRole)
-                    
-                    print(f"""
-                    Додавання позиції {row + 1}:
-                    - Назва: '{name}'
-                    - Кількість: {qty}
-                    - Од.вим.: {unit}
-                    - ID ресурсу: {resource_id}
-                    - Примітка: {note}
-                    """)
-                    
-                    success = add_item_to_requisition(
-                        conn=self.conn,
-                        requisition_id=self.new_requisition_id,
-                        requested_resource_name=name,
-                        quantity_requested=qty,
-                        unit_of_measure=unit,
-                        resource_id=resource_id,
-                        justification=note
-                    )
-                    
-                    if not success:
-                        raise Exception(f"Не вдалося додати позицію '{name}'")
-                        
-                except Exception as e:
-                    print(f"ПОМИЛКА при додаванні позиції {row + 1}:")
-                    print(f"- Тип помилки: {type(e).__name__}")
-                    print(f"- Повідомлення: {str(e)}")
-                    traceback.print_exc()
-                    raise Exception(f"Помилка додавання позиції {row + 1}: {str(e)}")
+                name_item = self.items_table.item(row, 0)
+                qty_item = self.items_table.item(row, 1)
+                unit_item = self.items_table.item(row, 2)
+                note_item = self.items_table.item(row, 3)
+
+                if not all([name_item, qty_item, unit_item]):
+                    raise ValueError(f"Неповні дані в рядку {row + 1}")
+                if not unit_item.text().strip():
+                    raise ValueError(f"Вкажіть одиницю виміру в рядку {row + 1}")
+
+                items.append({
+                    'requested_resource_name': name_item.text(),
+                    'quantity_requested': int(qty_item.text()),
+                    'unit_of_measure': unit_item.text(),
+                    'resource_id': name_item.data(QtCore.Qt.ItemDataRole.UserRole),
+                    'justification': note_item.text() if note_item else None,
+                })
+
+            add_items_to_requisition(self.conn, self.new_requisition_id, items)
+            print(f"Додано позицій: {len(items)}")
             
             self.conn.commit()
             print("\nЗаявку успішно створено!")
@@ -805,144 +675,6 @@ class AddItemDialog(QtWidgets.QDialog):
             traceback.print_exc()
             QtWidgets.QMessageBox.warning(self, "Помилка", str(e))
 
-def add_item_to_requisition(
-    conn: sqlite3.Connection,
-    requisition_id: int,
-    requested_resource_name: str,
-    quantity_requested: int,
-    unit_of_measure: str,
-    resource_id: Optional[int] = None,
-    justification: Optional[str] = None
-) -> bool:
-    """
-    Додає позицію до заявки з розширеною діагностикою та обробкою помилок.
-    """
-    print("\n" + "="*50)
-    print("ДІАГНОСТИКА ДОДАВАННЯ ПОЗИЦІЇ ДО ЗАЯВКИ")
-    print("="*50)
-    
-    print("\nВхідні параметри:")
-    print(f"- requisition_id: {requisition_id} (тип: {type(requisition_id)})")
-    print(f"- requested_resource_name: '{requested_resource_name}' (тип: {type(requested_resource_name)})")
-    print(f"- quantity_requested: {quantity_requested} (тип: {type(quantity_requested)})")
-    print(f"- unit_of_measure: '{unit_of_measure}' (тип: {type(unit_of_measure)})")
-    print(f"- resource_id: {resource_id} (тип: {type(resource_id)})")
-    print(f"- justification: '{justification}' (тип: {type(justification)})")
-    
-    try:
-        cur = conn.cursor()
-        
-        # 1. Перевірка структури таблиці
-        print("\nПеревірка структури таблиці requisition_items:")
-        table_info = cur.execute("PRAGMA table_info(requisition_items)").fetchall()
-        for col in table_info:
-            print(f"- Колонка: {col['name']}, Тип: {col['type']}, NotNull: {col['notnull']}")
-        
-        # 2. Перевірка існування заявки
-        print("\nПеревірка існування заявки:")
-        cur.execute("SELECT * FROM requisitions WHERE id = ?", (requisition_id,))
-        requisition = cur.fetchone()
-        if not requisition:
-            raise ValueError(f"Заявка з ID {requisition_id} не існує")
-        print(f"- Знайдено заявку: {dict(requisition)}")
-        
-        # 3. Валідація даних
-        print("\nВалідація даних:")
-        if not isinstance(requisition_id, int) or requisition_id <= 0:
-            raise ValueError(f"Некоректний ID заявки: {requisition_id}")
-        print("- ID заявки валідний")
-        
-        clean_name = requested_resource_name.strip()
-        if not clean_name:
-            raise ValueError("Назва ресурсу не може бути порожньою")
-        print(f"- Назва ресурсу валідна: '{clean_name}'")
-        
-        if not isinstance(quantity_requested, int) or quantity_requested <= 0:
-            raise ValueError(f"Некоректна кількість: {quantity_requested}")
-        print("- Кількість валідна")
-        
-        clean_unit = unit_of_measure.strip()
-        if not clean_unit:
-            raise ValueError("Одиниця виміру не може бути порожньою")
-        print(f"- Одиниця виміру валідна: '{clean_unit}'")
-        
-        # 4. Перевірка resource_id
-        if resource_id is not None:
-            print("\nПеревірка існування ресурсу:")
-            cur.execute("""
-                SELECT r.*, c.name as category_name 
-                FROM resources r 
-                JOIN categories c ON r.category_id = c.id 
-                WHERE r.id = ?
-            """, (resource_id,))
-            resource = cur.fetchone()
-            if not resource:
-                print(f"- Попередження: Ресурс з ID {resource_id} не знайдено")
-                resource_id = None
-            else:
-                print(f"- Знайдено ресурс: {dict(resource)}")
-        
-        # 5. Додавання позиції
-        print("\nДодавання позиції до БД:")
-        insert_query = """
-            INSERT INTO requisition_items (
-                requisition_id,
-                resource_id,
-                requested_resource_name,
-                quantity_requested,
-                unit_of_measure,
-                justification,
-                item_status
-            ) VALUES (?, ?, ?, ?, ?, ?, 'очікує')
-        """
-        
-        params = (
-            requisition_id,
-            resource_id,
-            clean_name,
-            quantity_requested,
-            clean_unit,
-            justification.strip() if justification else None
-        )
-        
-        print("SQL запит:", insert_query)
-        print("Параметри:", params)
-        
-        cur.execute(insert_query, params)
-        
-        # 6. Перевірка результату
-        item_id = cur.lastrowid
-        print(f"\nПозицію додано успішно! ID нової позиції: {item_id}")
-        
-        conn.commit()
-        print("\nТранзакцію підтверджено (commit)")
-        return True
-        
-    except sqlite3.Error as e:
-        print("\nПОМИЛКА SQL:")
-        print(f"- Тип помилки: {type(e).__name__}")
-        print(f"- Повідомлення: {str(e)}")
-        print("- Деталі:")
-        traceback.print_exc()
-        conn.rollback()
-        print("- Транзакцію скасовано (rollback)")
-        return False
-        
-    except Exception as e:
-        print("\nЗАГАЛЬНА ПОМИЛКА:")
-        print(f"- Тип помилки: {type(e).__name__}")
-        print(f"- Повідомлення: {str(e)}")
-        print("- Деталі:")
-        traceback.print_exc()
-        conn.rollback()
-        print("- Транзакцію скасовано (rollback)")
-        return False
-    
-    finally:
-        print("\n" + "="*50)
-        print("КІНЕЦЬ ДІАГНОСТИКИ")
-        print("="*50 + "\n")
-
 # =============================================================
 # --------------------------- MAIN UI -------------------------
 # =============================================================
@@ -997,7 +729,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self.addToolBar(tb)
         tb.addWidget(QtWidgets.QLabel("Пошук:"))
         self.search = QtWidgets.QLineEdit()
-        self.search.textChanged.connect(self.filter)
+        self.search.setPlaceholderText(f"від {MIN_SEARCH_CHARS} символів")
+        # Пошук виконується після паузи у введенні, а не на кожну літеру
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.filter)
+        self.search.textChanged.connect(lambda _text: self.search_timer.start())
         tb.addWidget(self.search)
         tb.addSeparator()
 
@@ -1045,7 +783,7 @@ class MainWindow(QtWidgets.QMainWindow):
         for c in CATEGORIES:
             m = self.models[c]
             m.removeRows(0, m.rowCount())
-            for r in fetch_resources(self.conn, c):
+            for r in get_result_cache().call(DB_NAME, fetch_resources, self.conn, c):
                 m.appendRow(row_items(r))
 
     # ---------- ui slots ----------
@@ -1054,11 +792,17 @@ class MainWindow(QtWidgets.QMainWindow):
         self.filter()
 
     def filter(self):
-        txt = self.search.text().lower()
-        view, model = self.view_model()
-        for i in range(model.rowCount()):
-            hidden = txt not in model.item(i,1).text().lower()
-            view.setRowHidden(i, hidden)
+        # Без пошуку — усі ресурси категорії (з кешу, як у load_all); з пошуком
+        # таблиця отримує лише знайдені індексом ресурси, від найрелевантніших
+        txt = self.search.text()
+        _, model = self.view_model()
+        if catalog_match(txt):
+            rows = get_result_cache().call(DB_NAME, search_resources, self.conn, self.cur_cat(), txt)
+        else:
+            rows = get_result_cache().call(DB_NAME, fetch_resources, self.conn, self.cur_cat())
+        model.removeRows(0, model.rowCount())
+        for r in rows:
+            model.appendRow(row_items(r))
 
     def selected_id(self):
         view, model = self.view_model()
@@ -1192,12 +936,8 @@ class MainWindow(QtWidgets.QMainWindow):
         alerts = []
         tomorrow = date.today() + timedelta(days=1)
         for cat in CATEGORIES:
-            for r in self.conn.execute(
-                """SELECT r.name, r.quantity, r.expiration_date 
-                FROM resources r 
-                JOIN categories c ON r.category_id = c.id 
-                WHERE c.name = ?""", (cat,)
-            ).fetchall():
+            # Ті самі рядки, що й у load_all: без змін у БД — з кешу
+            for r in get_result_cache().call(DB_NAME, fetch_resources, self.conn, cat):
                 if r["quantity"] is not None and r["quantity"] < 10:
                     alerts.append(f"Мало залишилось (<10): {r['name']} ({r['quantity']})")
                 if r["expiration_date"]: